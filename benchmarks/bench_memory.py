@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória de um rerun do dashboard WBR.
+
+Compara o pipeline de uma tabela (preparar_dados_wbr, calcular_kpis,
+calcular_metricas_wbr e compute_trailing_weeks) alimentado com:
+
+- raw: o DataFrame como sai da query (ORDER BY data DESC, datas como objetos
+  date), convertido e ordenado de novo a cada chamada;
+- preparado: o frame preparado uma única vez na carga (ver src.core.prepared_frame),
+  como o DataService entrega hoje.
+
+Cada modo roda num subprocesso próprio, para que o pico de RSS (ru_maxrss) de um
+não contamine o outro. Reporta o crescimento do pico de RSS ao longo dos reruns e
+o pico de alocações (tracemalloc) de um rerun.
+
+Uso:
+    python benchmarks/bench_memory.py                     # escalas 1 10 100
+    python benchmarks/bench_memory.py --scales 1 10 --reruns 5
+"""
+
+import argparse
+import gc
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from benchmarks.synthetic import gerar_fluxo
+from src.config.settings import WBRConfig
+from src.core.prepared_frame import preparar_frame
+from src.core.processing import compute_trailing_weeks
+from src.core.wbr import preparar_dados_wbr, calcular_metricas_wbr
+from src.core.wbr_metrics import calcular_kpis
+
+# Volume atual: 3 shoppings com uma linha por dia
+SHOPPINGS_1X = 3
+
+MODOS = ('raw', 'preparado')
+
+
+def _pico_rss_mb() -> float:
+    """Pico de RSS do processo (ru_maxrss é KB no Linux e bytes no macOS)"""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def _rerun(df: pd.DataFrame, ref: pd.Timestamp, cfg: WBRConfig):
+    """Trabalho de uma tabela num rerun do dashboard (gráfico + KPIs + métricas)"""
+    preparar_dados_wbr(df, data_referencia=ref)
+    calcular_kpis(df, data_referencia=ref)
+    calcular_metricas_wbr(df, data_referencia=ref)
+    diario = df.groupby('date', as_index=False)['metric_value'].sum()
+    compute_trailing_weeks(diario, cfg)
+
+
+def worker(modo: str, scale: int, anos: int, reruns: int) -> Dict[str, Any]:
+    """
+    Mede um modo numa escala (executado no subprocesso)
+
+    Returns:
+        Dicionário com rows, rss_base_mb, rss_delta_mb e traced_peak_mb
+    """
+    gerado = gerar_fluxo(n_shoppings=SHOPPINGS_1X * scale, anos=anos)
+    ref = gerado['date'].max().normalize()
+    cfg = WBRConfig(week_ending=ref.to_pydatetime(), trailing_weeks=6, aggf={'metric_value': 'sum'})
+
+    # Formato de fetch_wbr_data: mais recente primeiro, datas vindas do driver
+    df = gerado.sort_values('date', ascending=False, kind='stable').reset_index(drop=True)
+    df = df.assign(date=df['date'].dt.date)
+    del gerado
+    if modo == 'preparado':
+        df = preparar_frame(df)
+
+    # Primeiro rerun fora da medição: imports tardios e caches de módulo
+    _rerun(df, ref, cfg)
+    gc.collect()
+    base = _pico_rss_mb()
+
+    for _ in range(reruns):
+        _rerun(df, ref, cfg)
+    delta = _pico_rss_mb() - base
+
+    tracemalloc.start()
+    try:
+        _rerun(df, ref, cfg)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'rows': len(df),
+        'rss_base_mb': base,
+        'rss_delta_mb': delta,
+        'traced_peak_mb': pico / (1024 * 1024)
+    }
+
+
+def run(scales: List[int], anos: int, reruns: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Mede cada modo em cada escala, um subprocesso por medição
+
+    Returns:
+        Dicionário {"<modo>@<escala>x": resultado de worker}
+    """
+    results = {}
+    for scale in scales:
+        print(f"\n📦 Escala {scale}x ({SHOPPINGS_1X * scale} shoppings, {anos} anos, {reruns} reruns)")
+        for modo in MODOS:
+            saida = subprocess.run(
+                [sys.executable, __file__, '--worker', modo, '--scales', str(scale),
+                 '--years', str(anos), '--reruns', str(reruns)],
+                check=True, capture_output=True, text=True
+            )
+            resultado = json.loads(saida.stdout.strip().splitlines()[-1])
+            results[f"{modo}@{scale}x"] = resultado
+            print(f"   {modo:<10} {resultado['rows']:>10,} linhas  "
+                  f"RSS base {resultado['rss_base_mb']:>8.1f} MB  "
+                  f"pico +{resultado['rss_delta_mb']:>7.1f} MB  "
+                  f"alocado/rerun {resultado['traced_peak_mb']:>7.1f} MB")
+
+        raw, prep = results[f"raw@{scale}x"], results[f"preparado@{scale}x"]
+        if raw['traced_peak_mb'] > 0:
+            reducao = (1 - prep['traced_peak_mb'] / raw['traced_peak_mb']) * 100
+            print(f"   ↳ pico alocado por rerun {reducao:.0f}% menor com o frame preparado")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memória por rerun do WBR")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="Multiplicadores do volume atual (default: 1 10 100)")
+    parser.add_argument("--years", type=int, default=3, help="Anos de histórico (default: 3)")
+    parser.add_argument("--reruns", type=int, default=3, help="Reruns medidos por modo (default: 3)")
+    parser.add_argument("--worker", choices=MODOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Os avisos das funções de WBR poluem a saída do benchmark
+    logging.disable(logging.WARNING)
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.scales[0], args.years, args.reruns)))
+        return 0
+
+    run(args.scales, args.years, args.reruns)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Benchmark do pipeline WBR com dados sintéticos de fluxo.
+
+Mede tempo de parede (melhor de N execuções, após uma execução de aquecimento) e
+pico de memória (tracemalloc) de cada etapa em 1x, 10x e 100x o volume atual
+(3 shoppings, dados diários, 3 anos; a escala multiplica o número de shoppings).
+Compara com os baselines gravados em benchmarks/baselines.json e termina com
+código 1 se alguma etapa regredir: acima da tolerância relativa E do piso absoluto
+(5 ms / 1 MB), para que etapas de poucos milissegundos não acusem ruído.
+
+Uso:
+    python benchmarks/bench_wbr.py                        # compara com o baseline
+    python benchmarks/bench_wbr.py --scales 1 10          # só algumas escalas
+    python benchmarks/bench_wbr.py --hourly               # dados horários (sensores)
+    python benchmarks/bench_wbr.py --save-baseline        # grava/atualiza o baseline
+    python benchmarks/bench_wbr.py --min-delta-ms 20      # piso absoluto maior (máquina ruidosa)
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Tuple
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from benchmarks.synthetic import gerar_fluxo
+from src.config.settings import WBRConfig
+from src.core.processing import processar_dados_wbr, compute_trailing_weeks
+from src.core.wbr_charts_modular import criar_grafico_wbr_modular
+from src.core.wbr_metrics import WBRCalculator, IncrementalWBRCalculator, calcular_kpis
+
+BASELINE_PATH = Path(__file__).parent / "baselines.json"
+
+# Volume atual: 3 shoppings com uma linha por dia
+SHOPPINGS_1X = 3
+
+
+def _etapas(df: pd.DataFrame, ref: pd.Timestamp) -> List[Tuple[str, Callable[[], Any]]]:
+    """Etapas medidas, cada uma isolada (recebe as entradas já prontas)"""
+    dados = processar_dados_wbr(df, ref)
+    cfg = WBRConfig(week_ending=ref.to_pydatetime(), trailing_weeks=6, aggf={'metric_value': 'sum'})
+    diario = df.groupby('date', as_index=False)['metric_value'].sum()
+
+    def _calculator():
+        calc = WBRCalculator(
+            df, ref, {'metric_value': 'sum'},
+            value_metrics=['metric_value'],
+            validate_data=False,
+            cache_enabled=False
+        )
+        return calc.get_dashboard_kpis()
+
+    # Navegação de datas: índice montado uma vez, cada consulta é só a data nova
+    incremental = IncrementalWBRCalculator(df, ref)
+
+    return [
+        ('processar_dados_wbr', lambda: processar_dados_wbr(df, ref)),
+        ('WBRCalculator', _calculator),
+        ('compute_trailing_weeks', lambda: compute_trailing_weeks(diario, cfg)),
+        ('calcular_kpis', lambda: calcular_kpis(df, data_referencia=ref)),
+        ('IncrementalWBRCalculator.at', lambda: incremental.at(ref - pd.Timedelta(weeks=1))),
+        ('criar_grafico_wbr_modular', lambda: criar_grafico_wbr_modular(
+            dados, titulo="Benchmark", unidade="pessoas", data_referencia=ref)),
+    ]
+
+
+def _medir(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Melhor tempo de `repeat` execuções e pico de memória de uma execução extra"""
+    # Aquecimento fora da medição: imports tardios, caches de módulo e alocador
+    func()
+
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - inicio)
+
+    # Medição de memória separada: tracemalloc deixa a execução mais lenta
+    tracemalloc.start()
+    try:
+        func()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds': min(tempos), 'peak_mb': pico / (1024 * 1024)}
+
+
+def run(scales: List[int], anos: int, horario: bool, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Executa todas as etapas em cada escala
+
+    Returns:
+        Dicionário {"<etapa>@<escala>x[-horario]": {seconds, peak_mb, rows}}
+    """
+    results = {}
+    for scale in scales:
+        df = gerar_fluxo(n_shoppings=SHOPPINGS_1X * scale, anos=anos, horario=horario)
+        ref = df['date'].max().normalize()
+        sufixo = f"@{scale}x" + ("-horario" if horario else "")
+        print(f"\n📦 Escala {scale}x: {len(df):,} linhas ({SHOPPINGS_1X * scale} shoppings, {anos} anos)")
+
+        for nome, func in _etapas(df, ref):
+            resultado = _medir(func, repeat)
+            resultado['rows'] = len(df)
+            results[nome + sufixo] = resultado
+            print(f"   {nome:<28} {resultado['seconds'] * 1000:>10.1f} ms {resultado['peak_mb']:>9.1f} MB")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], tolerance: float,
+            min_delta_ms: float = 5.0, min_delta_mb: float = 1.0) -> List[str]:
+    """
+    Compara com o baseline
+
+    Args:
+        results: Resultados desta execução
+        baseline: Conteúdo de baselines.json
+        tolerance: Regressão relativa tolerada (0.25 = 25%)
+        min_delta_ms: Diferenças de tempo abaixo deste piso são ignoradas (ruído)
+        min_delta_mb: Diferenças de memória abaixo deste piso são ignoradas
+
+    Returns:
+        Lista de regressões (acima de baseline * (1 + tolerance) e do piso absoluto)
+    """
+    pisos = {'seconds': min_delta_ms / 1000, 'peak_mb': min_delta_mb}
+    regressions = []
+    for key, atual in results.items():
+        base = baseline.get('results', {}).get(key)
+        if not base:
+            continue
+        for campo, rotulo in (('seconds', 'tempo'), ('peak_mb', 'memória')):
+            if atual[campo] - base[campo] < pisos[campo]:
+                continue
+            if base[campo] > 0 and atual[campo] > base[campo] * (1 + tolerance):
+                regressions.append(
+                    f"{key}: {rotulo} {atual[campo]:.3f} vs baseline {base[campo]:.3f} "
+                    f"(+{(atual[campo] / base[campo] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline WBR")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="Multiplicadores do volume atual (default: 1 10 100)")
+    parser.add_argument("--years", type=int, default=3, help="Anos de histórico (default: 3)")
+    parser.add_argument("--hourly", action="store_true", help="Uma linha por hora em vez de por dia")
+    parser.add_argument("--repeat", type=int, default=7,
+                        help="Execuções medidas por etapa, após uma de aquecimento (default: 7)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Regressão tolerada sobre o baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="Ignora diferenças de tempo menores que isto (default: 5 ms)")
+    parser.add_argument("--min-delta-mb", type=float, default=1.0,
+                        help="Ignora diferenças de memória menores que isto (default: 1 MB)")
+    parser.add_argument("--save-baseline", action="store_true", help="Grava os resultados como baseline")
+    args = parser.parse_args()
+
+    # Os avisos das funções de WBR poluem a saída do benchmark
+    logging.disable(logging.WARNING)
+
+    results = run(args.scales, args.years, args.hourly, args.repeat)
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+
+    if args.save_baseline:
+        baseline.setdefault('results', {}).update(results)
+        baseline['machine'] = {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine()
+        }
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\n📝 Baseline gravado em {BASELINE_PATH}")
+        return 0
+
+    if not baseline:
+        print("\n⚠️  Sem baseline; rode com --save-baseline para criar")
+        return 0
+
+    if baseline.get('machine', {}).get('platform') != platform.platform():
+        print("\n⚠️  Baseline gravado em outra máquina; compare com cautela")
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms, args.min_delta_mb)
+    if regressions:
+        print("\n❌ Regressões:")
+        for linha in regressions:
+            print(f"   {linha}")
+        return 1
+
+    print("\n✅ Sem regressões em relação ao baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Gerador de dados sintéticos de fluxo de shopping para os benchmarks do WBR.
+
+Produz o mesmo formato de fetch_wbr_data (date, metric_value, shopping), com
+sazonalidade semanal (fins de semana mais cheios), anual (pico em dezembro),
+crescimento ano a ano, ruído e, no modo horário, o perfil de horas de um shopping.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Peso relativo de cada dia da semana (segunda = 0)
+PESO_DIA_SEMANA = np.array([0.85, 0.85, 0.9, 0.95, 1.1, 1.35, 1.2])
+
+# Perfil horário (0h-23h): fechado de madrugada, picos no almoço e à noite
+PERFIL_HORA = np.array([
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0.01,
+    0.04, 0.06, 0.09, 0.10, 0.08, 0.07, 0.07, 0.08, 0.10, 0.10,
+    0.07, 0.04, 0.01, 0
+])
+PERFIL_HORA = PERFIL_HORA / PERFIL_HORA.sum()
+
+
+def gerar_fluxo(n_shoppings: int = 3, anos: int = 3, horario: bool = False,
+                fim: Optional[pd.Timestamp] = None, seed: int = 0) -> pd.DataFrame:
+    """
+    Gera fluxo de pessoas sintético por shopping
+
+    Args:
+        n_shoppings: Número de shoppings
+        anos: Anos de histórico até `fim`
+        horario: Uma linha por hora (sensores) em vez de uma por dia
+        fim: Última data (default: hoje)
+        seed: Semente do gerador aleatório
+
+    Returns:
+        DataFrame com colunas date, metric_value, shopping (ordem decrescente de data)
+    """
+    rng = np.random.default_rng(seed)
+    fim = pd.Timestamp(fim or pd.Timestamp.today()).normalize()
+    dias = pd.date_range(fim - pd.DateOffset(years=anos) + pd.Timedelta(days=1), fim, freq='D')
+
+    dia_ano = dias.dayofyear.to_numpy()
+    sazonal = 1 + 0.15 * np.cos(2 * np.pi * (dia_ano - 355) / 365.25)
+    crescimento = 1.05 ** ((dias - dias[0]).days.to_numpy() / 365.25)
+    perfil_dia = PESO_DIA_SEMANA[dias.dayofweek.to_numpy()] * sazonal * crescimento
+
+    frames = []
+    for i in range(n_shoppings):
+        base = rng.uniform(8_000, 40_000)
+        diario = base * perfil_dia * rng.normal(1, 0.08, len(dias))
+
+        if horario:
+            valores = np.outer(diario, PERFIL_HORA).ravel()
+            valores = valores * rng.normal(1, 0.1, len(valores))
+            datas = (dias.values[:, None] + np.arange(24) * np.timedelta64(1, 'h')).ravel()
+        else:
+            valores = diario
+            datas = dias.values
+
+        frames.append(pd.DataFrame({
+            'date': datas,
+            'metric_value': np.clip(np.round(valores), 0, None),
+            'shopping': f"S{i:03d}"
+        }))
+
+    df = pd.concat(frames, ignore_index=True)
+    return df.sort_values('date', ascending=False, kind='stable').reset_index(drop=True)
@@ -2,22 +2,35 @@
 """
 Script para verificar e descobrir automaticamente tabelas e colunas no PostgreSQL.
 Execute este script para ver o que está disponível no seu banco.
+
+Também funciona como assistente de índices: roda EXPLAIN (ANALYZE, BUFFERS) nas
+mesmas queries que o dashboard gera (fetch_wbr_data, get_engagement_data e
+get_post_count_data) e propõe, grava como migração ou aplica os índices que faltam.
+
+Uso:
+    python scripts/check_database.py                               # estrutura do banco
+    python scripts/check_database.py --advise                      # planos + índices propostos
+    python scripts/check_database.py --advise --migration idx.sql  # grava a migração
+    python scripts/check_database.py --advise --apply              # cria os índices
 """
 
+import argparse
+import json
 import os
 import sys
 from pathlib import Path
 
 # Adiciona o diretório raiz ao path
-sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.utils.env import load_environment_variables
-from src.data.postgresql_client import PostgreSQLClient
 
 # Carrega variáveis de ambiente
 load_environment_variables()
 
-def main():
+def check_structure():
+    from src.clients.database.postgresql import PostgreSQLClient
+
     print("=" * 60)
     print("🔍 VERIFICADOR DE ESTRUTURA POSTGRESQL")
     print("=" * 60)
@@ -127,5 +140,207 @@ def main():
     
     return 0
 
+
+def explain(engine, sql_query: str, params=None, analyze: bool = True) -> dict:
+    """
+    Executa EXPLAIN na query (com ANALYZE e BUFFERS por padrão) e retorna o plano
+
+    A transação é descartada ao fechar a conexão (rollback), sem efeitos no banco.
+    """
+    from sqlalchemy import text
+
+    options = "ANALYZE, BUFFERS, VERBOSE, FORMAT JSON" if analyze else "VERBOSE, FORMAT JSON"
+    with engine.connect() as conn:
+        plan = conn.execute(text(f"EXPLAIN ({options}) {sql_query}"), params or {}).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]
+
+
+def summarize_plan(plan: dict) -> dict:
+    """
+    Resume um plano JSON: tempos, buffers e Seq Scans por tabela
+
+    Returns:
+        Dicionário com execution_ms, planning_ms, shared_hit, shared_read e
+        seq_scans (lista de (schema, tabela, linhas removidas pelo filtro))
+    """
+    seq_scans = []
+
+    def _walk(node):
+        if node.get('Node Type') == 'Seq Scan':
+            seq_scans.append((
+                node.get('Schema'),
+                node.get('Relation Name'),
+                node.get('Rows Removed by Filter', 0)
+            ))
+        for child in node.get('Plans', []):
+            _walk(child)
+
+    root = plan['Plan']
+    _walk(root)
+    return {
+        'execution_ms': plan.get('Execution Time'),
+        'planning_ms': plan.get('Planning Time'),
+        'shared_hit': root.get('Shared Hit Blocks'),
+        'shared_read': root.get('Shared Read Blocks'),
+        'seq_scans': seq_scans
+    }
+
+
+def dashboard_queries(client):
+    """
+    Queries exatamente como o dashboard gera: uma por tabela WBR e as do Instagram
+    (todos os shoppings e o shopping padrão, SCIB)
+
+    Com WBR_SUPERSET_WINDOW (padrão) as tabelas WBR são buscadas uma vez desde
+    janeiro de dois anos antes da última data: o EXPLAIN usa o mesmo date_start.
+
+    Returns:
+        Lista de (descrição, sql, params)
+    """
+    from src.clients.database.factory import get_table_config, inicio_janela_completa
+    from src.services.data_service import superset_window_enabled
+
+    queries = []
+    for name, config in get_table_config().items():
+        date_start = None
+        if superset_window_enabled():
+            # Mesmo início de DataService._fetch_table_window
+            date_start = inicio_janela_completa(client, config).strftime('%Y-%m-%d')
+        table_name = config['table']
+        if config.get('schema'):
+            table_name = f"{config['schema']}.{config['table']}"
+        sql_query, params = client.wbr_queries.get_wbr_data_query(
+            table_name=table_name,
+            date_col=config['date_col'],
+            metric_col=config['metric_col'],
+            shopping_col=config.get('shopping_col'),
+            date_start=date_start
+        )
+        queries.append((f"fetch_wbr_data[{name}]", sql_query, params))
+
+    if client._use_instagram_rollup():
+        instagram = client.instagram_rollups
+        engagement = instagram.get_engagement_query
+    else:
+        instagram = client.instagram_queries
+        engagement = instagram.get_engagement_daily_query
+    for shopping in (None, 'SCIB'):
+        label = shopping or 'todos'
+        sql_query, params = engagement(shopping_filter=shopping)
+        queries.append((f"get_engagement_data[{label}]", sql_query, params))
+        sql_query, params = instagram.get_post_count_query(shopping_filter=shopping)
+        queries.append((f"get_post_count_data[{label}]", sql_query, params))
+
+    return queries
+
+
+def advise_indexes(analyze: bool = True, apply: bool = False, migration: str = None) -> int:
+    from sqlalchemy import text
+    from src.clients.database.factory import get_database_client, get_table_config
+    from src.clients.sql.index_queries import IndexQueries
+
+    print("=" * 60)
+    print("🔎 ASSISTENTE DE ÍNDICES")
+    print("=" * 60)
+
+    try:
+        client = get_database_client()
+        engine = client.engine
+
+        # 1. Planos das queries do dashboard
+        scanned = set()
+        for label, sql_query, params in dashboard_queries(client):
+            try:
+                resumo = summarize_plan(explain(engine, sql_query, params, analyze=analyze))
+            except Exception as e:
+                print(f"\n⚠️  {label}: erro no EXPLAIN: {e}")
+                continue
+
+            print(f"\n📊 {label}")
+            if resumo['execution_ms'] is not None:
+                print(f"   ├─ Execução: {resumo['execution_ms']:.1f} ms "
+                      f"(planejamento {resumo['planning_ms']:.1f} ms)")
+                print(f"   ├─ Buffers: {resumo['shared_hit'] or 0} em cache, {resumo['shared_read'] or 0} lidos do disco")
+            if resumo['seq_scans']:
+                for schema, table, removed in resumo['seq_scans']:
+                    scanned.add((schema, table))
+                    print(f"   └─ Seq Scan em {schema}.{table} ({removed:,} linhas descartadas pelo filtro)")
+            else:
+                print("   └─ Sem Seq Scan")
+
+        # 2. Índices recomendados que ainda não existem
+        index_queries = IndexQueries()
+        with engine.connect() as conn:
+            existing = [dict(row._mapping) for row in conn.execute(text(index_queries.get_existing_indexes_sql()))]
+
+        recommended = index_queries.get_wbr_indexes(get_table_config()) + index_queries.get_instagram_indexes()
+        missing = []
+        print("\n" + "=" * 60)
+        print("💡 ÍNDICES RECOMENDADOS:")
+        print("-" * 40)
+        for index in recommended:
+            found = IndexQueries.find_existing(index, existing)
+            if found:
+                print(f"✅ {index['schema']}.{index['table']} ({index['columns']}): já existe ({found})")
+                continue
+            seq = " — Seq Scan observado" if (index['schema'], index['table']) in scanned else ""
+            print(f"➕ {index['schema']}.{index['table']} ({index['columns']}): {index['reason']}{seq}")
+            missing.append(index)
+
+        if not missing:
+            print("\nNenhum índice faltando.")
+            return 0
+
+        # 3. Migração e/ou aplicação
+        if migration:
+            linhas = [f"-- {index['reason']}\n{index['sql']};\n" for index in missing]
+            Path(migration).write_text(
+                "-- Índices gerados por scripts/check_database.py --advise\n"
+                "-- CREATE INDEX CONCURRENTLY não roda dentro de transação (psql sem --single-transaction)\n\n"
+                + "\n".join(linhas)
+            )
+            print(f"\n📝 Migração gravada em {migration}")
+
+        if apply:
+            # CONCURRENTLY exige autocommit; não bloqueia escritas durante a criação
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                for index in missing:
+                    print(f"⏳ Criando {index['name']}...")
+                    conn.execute(text(index['sql']))
+                    conn.execute(text(f'ANALYZE "{index["schema"]}"."{index["table"]}"'))
+            print(f"\n✅ {len(missing)} índice(s) criado(s). Rode --advise de novo para comparar os planos.")
+        elif not migration:
+            print("\nSQL:")
+            for index in missing:
+                print(f"  {index['sql']};")
+            print("\nUse --apply para criar ou --migration ARQUIVO para gravar a migração.")
+
+    except Exception as e:
+        print(f"\n❌ Erro: {e}")
+        print("\nVerifique SUPABASE_DATABASE_URL no arquivo .env")
+        return 1
+
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica a estrutura do banco e recomenda índices")
+    parser.add_argument("--advise", action="store_true",
+                        help="Roda EXPLAIN nas queries do dashboard e propõe índices")
+    parser.add_argument("--no-analyze", action="store_true",
+                        help="EXPLAIN sem ANALYZE (não executa as queries)")
+    parser.add_argument("--apply", action="store_true",
+                        help="Cria os índices que faltam (CREATE INDEX CONCURRENTLY)")
+    parser.add_argument("--migration", metavar="ARQUIVO", default=None,
+                        help="Grava os índices que faltam em um arquivo .sql")
+    args = parser.parse_args()
+
+    if args.advise or args.apply or args.migration:
+        return advise_indexes(analyze=not args.no_analyze, apply=args.apply, migration=args.migration)
+    return check_structure()
+
+
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
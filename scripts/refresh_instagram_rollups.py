@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Cria e atualiza os rollups diários do Instagram (um por schema de shopping).
+Execute periodicamente (ex.: cron a cada hora) e habilite a leitura com
+INSTAGRAM_USE_ROLLUP=true no .env.
+
+Uso:
+    python scripts/refresh_instagram_rollups.py            # incremental
+    python scripts/refresh_instagram_rollups.py --days 14  # re-sincroniza 14 dias
+    python scripts/refresh_instagram_rollups.py --full     # recalcula tudo
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.env import load_environment_variables
+from src.clients.database.supabase_postgres import SupabaseClient
+
+# Carrega variáveis de ambiente
+load_environment_variables()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Atualiza os rollups diários do Instagram")
+    parser.add_argument("--days", type=int, default=None,
+                        help="Dias recalculados antes da última data do rollup")
+    parser.add_argument("--full", action="store_true",
+                        help="Recalcula todo o histórico")
+    args = parser.parse_args()
+
+    try:
+        client = SupabaseClient()
+        result = client.refresh_instagram_rollups(days=args.days, full=args.full)
+    except Exception as e:
+        print(f"❌ Erro ao atualizar rollups: {e}")
+        return 1
+
+    for shopping, rows in result.items():
+        print(f"✅ {shopping}: {rows} dias atualizados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Pré-aquece os caches do dashboard WBR antes do horário comercial.
+
+Carrega a última data de referência para cada (tabela, shopping, método de semana),
+monta as figuras e busca os dados do Instagram, reportando o tempo por etapa.
+
+Os caches em memória (janelas, figuras) são do processo: para aquecer o servidor
+Streamlit use WBR_WARMUP=true, que inicia a mesma rotina numa thread dentro dele.
+Rodado à parte (cron), este script aquece o que é compartilhado entre processos:
+o cache local em Parquet (WBR_LOCAL_CACHE=true) e os buffers do banco, e mede
+quanto custa uma carga fria.
+
+Uso:
+    python scripts/warmup_caches.py                            # uma vez, agora
+    python scripts/warmup_caches.py --methods travelling       # só um método de semana
+    python scripts/warmup_caches.py --shoppings SCIB Todos     # só alguns shoppings
+    python scripts/warmup_caches.py --schedule                 # fica rodando nos horários de WBR_WARMUP_TIMES
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.env import load_environment_variables
+
+# Carrega variáveis de ambiente
+load_environment_variables()
+
+from src.services.data_service import DataService
+from src.services.warmup import WarmupScheduler, run_warmup
+from src.utils.timing import get_timing_registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-aquece os caches do dashboard WBR")
+    parser.add_argument("--methods", nargs="+", choices=["iso", "travelling"], default=None,
+                        help="Métodos de semana (default: WBR_WARMUP_WEEK_METHODS)")
+    parser.add_argument("--shoppings", nargs="+", default=None,
+                        help='Shoppings ("Todos" para a visão consolidada; default: todos)')
+    parser.add_argument("--no-instagram", action="store_true", help="Não carrega os dados do Instagram")
+    parser.add_argument("--schedule", action="store_true",
+                        help="Roda agora e depois nos horários de WBR_WARMUP_TIMES até ser interrompido")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    try:
+        service = DataService()
+    except Exception as e:
+        print(f"❌ Erro ao conectar ao banco: {e}")
+        return 1
+
+    if args.schedule:
+        scheduler = WarmupScheduler(service)
+        print(f"⏰ Pré-aquecimento agendado para {', '.join(scheduler.horarios)} (Ctrl+C para sair)")
+        scheduler.start()
+        try:
+            scheduler.join()
+        except KeyboardInterrupt:
+            scheduler.stop()
+        return 0
+
+    shoppings = None
+    if args.shoppings:
+        shoppings = [None if shopping == "Todos" else shopping for shopping in args.shoppings]
+
+    resumo = run_warmup(service, metodos=args.methods, shoppings=shoppings,
+                        instagram=not args.no_instagram)
+
+    print(f"\n📅 Data de referência: {resumo['data_referencia']}")
+    print(f"   {resumo['combinacoes']} combinações, {resumo['figuras']} figuras, "
+          f"{resumo['instagram']} cargas do Instagram em {resumo['segundos']:.1f}s")
+
+    print("\n⏱️  Tempos por etapa:")
+    for etapa in get_timing_registry().stats():
+        print(f"   {etapa['stage']:<24} n={etapa['count']:<4} p50 {etapa['p50_ms']:>9.1f} ms  "
+              f"p95 {etapa['p95_ms']:>9.1f} ms")
+
+    if resumo['erros']:
+        print("\n❌ Erros:")
+        for erro in resumo['erros']:
+            print(f"   {erro}")
+        return 1
+
+    print("\n✅ Caches aquecidos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
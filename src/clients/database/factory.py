@@ -5,6 +5,8 @@ Suporta múltiplas conexões simultâneas.
 import os
 from typing import Union, Optional, Dict, Any
 
+from .schema import normalizar_tipos_wbr
+
 # Importações condicionais para evitar erros se uma lib não estiver instalada
 def get_database_client(client_type: Optional[str] = None):
     """
@@ -147,7 +149,25 @@ def get_supabase_table_config():
     }
 
 
-def fetch_data_generic(client, config, year_filter=None, shopping_filter=None, client_type=None, date_reference=None):
+def qualified_table_name(config: Dict[str, Any]) -> str:
+    """
+    Nome da tabela com schema (ex: "mapa-do-bosque.fluxo_de_pessoas")
+
+    Também é a chave da tabela no relatório de tipos (get_schema_report).
+
+    Args:
+        config: Configuração da tabela
+
+    Returns:
+        "schema.tabela" ou só a tabela se não houver schema
+    """
+    if config.get('schema'):
+        return f"{config['schema']}.{config['table']}"
+    return config['table']
+
+
+def fetch_data_generic(client, config, year_filter=None, shopping_filter=None, client_type=None, date_reference=None, date_start=None,
+                       raise_errors=False):
     """
     Função para buscar dados usando cliente Supabase.
 
@@ -158,29 +178,125 @@ def fetch_data_generic(client, config, year_filter=None, shopping_filter=None, c
         shopping_filter: Filtro opcional de shopping
         client_type: Ignorado - sempre usa Supabase
         date_reference: Data de referência para filtro (YYYY-MM-DD ou pd.Timestamp)
+        date_start: Data inicial opcional (YYYY-MM-DD ou pd.Timestamp); default: janeiro do ano anterior
+        raise_errors: Propaga erros do banco em vez de retornar um DataFrame vazio
 
     Returns:
         DataFrame com os dados já filtrados
     """
     # Sempre usar Supabase - precisa incluir o schema
-    table_with_schema = config['table']
-    if config.get('schema'):
-        table_with_schema = f"{config['schema']}.{config['table']}"
+    table_with_schema = qualified_table_name(config)
 
     # Converte date_reference para string se necessário
     if date_reference and hasattr(date_reference, 'strftime'):
         date_reference = date_reference.strftime('%Y-%m-%d')
+    if date_start and hasattr(date_start, 'strftime'):
+        date_start = date_start.strftime('%Y-%m-%d')
 
     df = client.fetch_wbr_data(
         table_name=table_with_schema,
         date_col=config['date_col'],
         metric_col=config['metric_col'],
         shopping_col=config.get('shopping_col'),
-        date_reference=date_reference
+        date_reference=date_reference,
+        date_start=date_start,
+        raise_errors=raise_errors
     )
 
+    # Tipos compactos (shopping category, métrica int32/float32) antes de cachear/filtrar
+    # Relatório de tipos por nome com schema (o mesmo usado pelo cache local)
+    df = normalizar_tipos_wbr(df, table_with_schema)
+
     # Aplicar filtro de shopping apenas (data já foi filtrada na query)
     if shopping_filter and 'shopping' in df.columns:
         df = df[df['shopping'] == shopping_filter]
 
-    return df
\ No newline at end of file
+    return df
+
+
+def inicio_janela_completa(client, config):
+    """
+    Primeira data da janela completa: janeiro de dois anos antes da última data disponível
+
+    Usada pela TableWindow do DataService e pela primeira carga do cache local. Ancorar
+    na última data (e não em hoje) mantém cobertas as referências que a sidebar oferece
+    quando a carga atrasa na virada do ano; sem última data, usa hoje.
+
+    Args:
+        client: Cliente do banco (get_max_date)
+        config: Configuração da tabela
+
+    Returns:
+        pd.Timestamp de 1º de janeiro de (ano da última data - 2)
+    """
+    import pandas as pd
+
+    table_with_schema = qualified_table_name(config)
+
+    ultima = client.get_max_date(
+        table_name=table_with_schema,
+        date_col=config['date_col'],
+        shopping_col=config.get('shopping_col')
+    )
+    ancora = pd.Timestamp(ultima if ultima is not None else pd.Timestamp.today())
+    return pd.Timestamp(year=ancora.year - 2, month=1, day=1)
+
+
+def fetch_wbr_aggregated_generic(client, config, shopping_filter=None, date_reference=None,
+                                 metodo_semana='iso', group_by_shopping=False):
+    """
+    Busca os blocos WBR já agregados no banco (pushdown de semanas/meses).
+
+    Args:
+        client: Cliente Supabase
+        config: Dicionário com configuração da tabela
+        shopping_filter: Filtro opcional de shopping
+        date_reference: Data de referência (YYYY-MM-DD ou pd.Timestamp); default: última data disponível
+        metodo_semana: 'iso' ou 'travelling'
+        group_by_shopping: Se True, retorna {shopping: dados} em vez de um único resultado
+
+    Returns:
+        dict no formato de processar_dados_wbr (ou {shopping: dict}); vazio se não houver dados
+    """
+    import pandas as pd
+    from src.core.processing import planejar_intervalos_wbr, processar_dados_wbr_agregados
+
+    table_with_schema = qualified_table_name(config)
+
+    shopping_col = config.get('shopping_col')
+
+    if date_reference is None:
+        date_reference = client.get_max_date(
+            table_name=table_with_schema,
+            date_col=config['date_col'],
+            shopping_col=shopping_col,
+            shopping_filter=shopping_filter
+        )
+        if date_reference is None:
+            return {}
+    date_reference = pd.Timestamp(date_reference)
+
+    intervalos = planejar_intervalos_wbr(date_reference, metodo_semana)
+    df = client.fetch_wbr_buckets(
+        table_name=table_with_schema,
+        intervalos=intervalos,
+        date_col=config['date_col'],
+        metric_col=config['metric_col'],
+        shopping_col=shopping_col,
+        shopping_filter=shopping_filter,
+        group_by_shopping=group_by_shopping
+    )
+
+    if df is None or df.empty:
+        return {}
+
+    def _montar(linhas):
+        somas = {
+            intervalos[int(idx)]: (float(soma), int(n))
+            for idx, soma, n in zip(linhas['idx'], linhas['soma'], linhas['linhas'])
+        }
+        return processar_dados_wbr_agregados(somas, date_reference, metodo_semana=metodo_semana)
+
+    if group_by_shopping:
+        return {shopping: _montar(grupo) for shopping, grupo in df.groupby('shopping')}
+    return _montar(df)
@@ -181,25 +181,8 @@ class PostgreSQLClient:
         """
         query = query.replace('{{date_filter}}', date_filter)
         
-        # Adiciona hint para usar índices se existirem
-        # PostgreSQL usa comentários /*+ ... */ para hints (se pg_hint_plan estiver instalado)
-        # Ou podemos adicionar um SET para forçar uso de índices
-        optimized_query = f"""
-        -- Force index usage if available
-        SET enable_seqscan = OFF;
-        
-        {query}
-        
-        -- Reset to default
-        SET enable_seqscan = ON;
-        """
-        
-        # Por segurança, executa apenas a query principal (sem os SETs) se der erro
-        try:
-            return self.run_query(query)  # Usa query sem SETs por enquanto
-        except Exception as e:
-            # Se falhar, tenta sem otimizações
-            raise e
+        # Índices para este filtro: ver scripts/check_database.py --advise
+        return self.run_query(query)
 
     def list_tables(self, *, schema: str | None = None) -> List[str]:
         """List table names in a schema.
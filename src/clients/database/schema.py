@@ -0,0 +1,123 @@
+"""
+Normalização de tipos dos DataFrames WBR logo após a busca no banco
+
+fetch_wbr_data devolve shopping como strings Python e metric_value no tipo do
+driver (muitas vezes object/Decimal para colunas numeric). Aqui cada tabela é
+convertida uma vez para tipos compactos:
+
+- shopping: category (filtros comparam códigos inteiros, não strings);
+- metric_value: int32 quando todos os valores são inteiros no intervalo do int32,
+  float32 quando a conversão e todas as somas parciais são exatas, senão float64;
+- date: datetime64 (o pandas não tem datetime64[D]; datas diárias ficam à meia-noite).
+
+A economia de memória por tabela vai para o log e para get_schema_report().
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+logger = logging.getLogger(__name__)
+
+# float32 representa exatamente todos os inteiros até 2**24
+_FLOAT32_EXATO = 2 ** 24
+_INT32 = np.iinfo(np.int32)
+
+_relatorio: Dict[str, Dict[str, Any]] = {}
+_relatorio_lock = threading.Lock()
+
+
+def compact_dtypes_enabled() -> bool:
+    """Verifica se os tipos são compactados na carga (default: sim)"""
+    return os.getenv("WBR_COMPACT_DTYPES", "true").lower() == "true"
+
+
+def _menor_tipo_numerico(valores: pd.Series) -> pd.Series:
+    """
+    Converte a métrica para o menor tipo numérico sem perda
+
+    Args:
+        valores: Coluna de métrica (int, float, Decimal ou texto numérico)
+
+    Returns:
+        Série em int32, float32 ou float64/int64 (quando nenhum menor é seguro)
+    """
+    valores = pd.to_numeric(valores, errors='coerce')
+    if not isinstance(valores.dtype, np.dtype) or valores.dtype.kind not in 'iuf' or valores.empty:
+        return valores
+
+    arr = valores.to_numpy()
+    validos = arr[~np.isnan(arr)] if arr.dtype.kind == 'f' else arr
+    inteiros = np.isfinite(validos).all() and np.array_equal(validos, np.trunc(validos))
+    if not inteiros or validos.size == 0:
+        return valores
+
+    if validos.size == arr.size and validos.min() >= _INT32.min and validos.max() <= _INT32.max:
+        return valores.astype(np.int32)
+
+    # Com nulos: float32 só quando nenhum valor nem soma parcial perde precisão
+    if arr.dtype.kind == 'f' and np.abs(validos).sum() < _FLOAT32_EXATO:
+        return valores.astype(np.float32)
+    return valores
+
+
+def normalizar_tipos_wbr(df: pd.DataFrame, tabela: Optional[str] = None) -> pd.DataFrame:
+    """
+    Converte date, metric_value e shopping para tipos compactos (o df original não é alterado)
+
+    Args:
+        df: DataFrame no formato de fetch_wbr_data (date, metric_value, shopping)
+        tabela: Nome da tabela, usado no relatório de economia
+
+    Returns:
+        DataFrame com os tipos normalizados
+    """
+    if df is None or df.empty or not compact_dtypes_enabled():
+        return df
+
+    antes = int(df.memory_usage(deep=True).sum())
+
+    colunas = {}
+    if 'date' in df.columns and not is_datetime64_any_dtype(df['date']):
+        colunas['date'] = pd.to_datetime(df['date'])
+    if 'metric_value' in df.columns:
+        colunas['metric_value'] = _menor_tipo_numerico(df['metric_value'])
+    if 'shopping' in df.columns and not isinstance(df['shopping'].dtype, pd.CategoricalDtype):
+        colunas['shopping'] = df['shopping'].astype('category')
+    if not colunas:
+        return df
+
+    df = df.assign(**colunas)
+    depois = int(df.memory_usage(deep=True).sum())
+
+    if tabela:
+        with _relatorio_lock:
+            _relatorio[tabela] = {
+                'table': tabela,
+                'rows': len(df),
+                'bytes_before': antes,
+                'bytes_after': depois,
+                'bytes_saved': antes - depois,
+                'dtypes': {col: str(tipo) for col, tipo in df.dtypes.items()}
+            }
+    logger.info(
+        f"Tipos normalizados{f' em {tabela}' if tabela else ''}: "
+        f"{antes / 1024 / 1024:.2f} MB -> {depois / 1024 / 1024:.2f} MB "
+        f"({(antes - depois) / 1024 / 1024:.2f} MB economizados)"
+    )
+    return df
+
+
+def get_schema_report() -> Dict[str, Dict[str, Any]]:
+    """
+    Economia de memória da última normalização de cada tabela
+
+    Returns:
+        Dicionário {tabela: {table, rows, bytes_before, bytes_after, bytes_saved, dtypes}}
+    """
+    with _relatorio_lock:
+        return {tabela: dict(dados) for tabela, dados in _relatorio.items()}
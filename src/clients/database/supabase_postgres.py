@@ -4,11 +4,23 @@ Usa SQLAlchemy para conectar diretamente ao banco do Supabase
 """
 
 import os
+import threading
 import pandas as pd
 import logging
 from sqlalchemy import create_engine, text
-from typing import Optional, Dict, Any
-from ..sql.instagram_queries import InstagramQueries
+from sqlalchemy.engine import make_url
+from typing import Optional, Dict, Any, List, Tuple
+from ..sql.instagram_queries import InstagramQueries, render_date_placeholders
+from ..sql.wbr_queries import WBRQueries
+from ..sql.instagram_rollups import InstagramRollupQueries
+from ...utils.timing import timed
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +48,8 @@ class SupabaseClient:
             max_overflow=10,          # Até 10 conexões extras
             pool_timeout=30,          # Timeout para obter conexão
             pool_recycle=3600,        # Recicla conexões a cada hora
-            echo=False                # Desabilita logging SQL para performance
+            echo=False,               # Desabilita logging SQL para performance
+            connect_args=self._prepared_statement_args(supabase_db_url)
         )
 
         # Schemas dos shoppings
@@ -46,11 +59,152 @@ class SupabaseClient:
             'SBI': os.getenv("SUPABASE_SCHEMA_3", "instagram-data-fetch-sbi")
         }
 
-        # Inicializa o gerenciador de queries
+        # Inicializa os gerenciadores de queries
         self.instagram_queries = InstagramQueries()
+        self.wbr_queries = WBRQueries()
+        self.instagram_rollups = InstagramRollupQueries()
 
         logger.info("Supabase PostgreSQL client initialized")
 
+    @staticmethod
+    def _prepared_statement_args(database_url: str) -> Dict[str, Any]:
+        """
+        Argumentos de conexão para prepared statements no servidor (SUPABASE_PREPARED_STATEMENTS)
+
+        Como o texto das queries é fixo e só os parâmetros mudam, o driver psycopg 3
+        (postgresql+psycopg://) prepara cada query na primeira execução e reaproveita
+        o plano em cada conexão do pool. psycopg2 interpola os parâmetros no cliente
+        e não tem prepared statements no servidor.
+        Requer o pooler em modo sessão (porta 5432); o modo transação (6543) não os suporta.
+
+        Args:
+            database_url: URL de conexão SQLAlchemy
+
+        Returns:
+            connect_args para create_engine
+        """
+        if os.getenv("SUPABASE_PREPARED_STATEMENTS", "false").lower() != "true":
+            return {}
+
+        if make_url(database_url).drivername == "postgresql+psycopg":
+            return {"prepare_threshold": 1}
+
+        logger.warning(
+            "SUPABASE_PREPARED_STATEMENTS requer o driver psycopg 3 "
+            "(postgresql+psycopg://); usando queries parametrizadas sem prepare"
+        )
+        return {}
+
+    def _read_sql(self, sql_query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        Lê o resultado de uma query no backend configurado em SUPABASE_FETCH_BACKEND
+
+        - 'sqlalchemy' (padrão): pd.read_sql_query sobre o engine
+        - 'copy': COPY (...) TO STDOUT em CSV decodificado pelo leitor C do pyarrow,
+          sem criar tuplas Python por linha nem guardar o CSV inteiro em memória
+          (psycopg2 ou psycopg 3); volta para 'sqlalchemy' se falhar
+
+        Args:
+            sql_query: Query SQL (SELECT)
+            params: Parâmetros da query
+
+        Returns:
+            DataFrame com resultados
+        """
+        backend = os.getenv("SUPABASE_FETCH_BACKEND", "sqlalchemy").lower()
+
+        with timed('db_fetch'):
+            if backend == 'copy' and PYARROW_AVAILABLE:
+                try:
+                    return self._read_sql_copy(sql_query, params)
+                except Exception as e:
+                    logger.warning(f"COPY backend falhou, usando SQLAlchemy: {str(e)}")
+
+            with self.engine.connect() as conn:
+                return pd.read_sql_query(text(sql_query), conn, params=params)
+
+    def _read_sql_copy(self, sql_query: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """
+        Executa a query via COPY TO STDOUT e converte com pyarrow
+
+        O COPY roda numa thread que escreve num pipe enquanto o pyarrow lê e converte
+        os blocos do outro lado: o CSV nunca fica inteiro em memória, só as colunas já
+        convertidas.
+
+        Args:
+            sql_query: Query SQL (SELECT)
+            params: Parâmetros da query (renderizados como literais, COPY não aceita bind)
+
+        Returns:
+            DataFrame com colunas numéricas/datas em NumPy e texto em string[pyarrow]
+        """
+        if params:
+            sql_query = str(text(sql_query).bindparams(**params).compile(
+                dialect=self.engine.dialect,
+                compile_kwargs={"literal_binds": True}
+            ))
+        sql_query = sql_query.strip().rstrip(';')
+
+        copy_sql = f"COPY ({sql_query}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+
+        leitura, escrita = os.pipe()
+        erros: List[BaseException] = []
+
+        def _produzir():
+            try:
+                # Fechar a ponta de escrita sinaliza o fim dos dados ao leitor
+                with os.fdopen(escrita, 'wb') as destino:
+                    self._copy_to(copy_sql, destino)
+            except BaseException as e:
+                erros.append(e)
+
+        produtor = threading.Thread(target=_produzir, name="copy_stream", daemon=True)
+        produtor.start()
+        try:
+            # Fechar a ponta de leitura (inclusive em erro de parsing) interrompe o COPY com BrokenPipeError
+            with os.fdopen(leitura, 'rb') as origem:
+                table = pa_csv.read_csv(
+                    origem,
+                    convert_options=pa_csv.ConvertOptions(strings_can_be_null=True, quoted_strings_can_be_null=False)
+                )
+        finally:
+            produtor.join()
+            # Erro do banco no meio do COPY tem precedência: o CSV lido estava truncado
+            # (BrokenPipeError é só consequência de o leitor ter parado antes)
+            if erros and not isinstance(erros[0], BrokenPipeError):
+                raise erros[0]
+
+        return table.to_pandas(
+            date_as_object=False,
+            types_mapper={pa.string(): pd.StringDtype("pyarrow"), pa.large_string(): pd.StringDtype("pyarrow")}.get
+        )
+
+    def _copy_to(self, copy_sql: str, destino) -> None:
+        """
+        Escreve a saída de um COPY ... TO STDOUT em destino, com psycopg2 ou psycopg 3
+
+        Args:
+            copy_sql: Comando COPY completo
+            destino: Arquivo binário aberto para escrita
+        """
+        raw_conn = self.engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            try:
+                if hasattr(cursor, 'copy_expert'):
+                    # psycopg2
+                    cursor.copy_expert(copy_sql, destino)
+                else:
+                    # psycopg 3 (postgresql+psycopg://): blocos conforme chegam do servidor
+                    with cursor.copy(copy_sql) as copy:
+                        for bloco in copy:
+                            destino.write(bloco)
+            finally:
+                cursor.close()
+        finally:
+            # Devolve a conexão ao pool (rollback da transação implícita)
+            raw_conn.close()
+
     def query(self, sql_query: str, params: Dict[str, Any] = None) -> pd.DataFrame:
         """
         Executa uma query SQL e retorna DataFrame
@@ -65,31 +219,11 @@ class SupabaseClient:
         """
         try:
             # Substitui placeholders de data se existirem
-            # Corrigido para usar desde o primeiro dia do ano anterior até hoje
-            if '{{date_filter}}' in sql_query:
-                date_filter = """
-                DATE("postedAt") BETWEEN
-                    DATE_TRUNC('year', CURRENT_DATE - INTERVAL '1 year')
-                    AND CURRENT_DATE
-                """
-                sql_query = sql_query.replace('{{date_filter}}', date_filter)
-
-            if '{{date_filter_with_alias}}' in sql_query:
-                date_filter_with_alias = """
-                DATE(P."postedAt") BETWEEN
-                    DATE_TRUNC('year', CURRENT_DATE - INTERVAL '1 year')
-                    AND CURRENT_DATE
-                """
-                sql_query = sql_query.replace('{{date_filter_with_alias}}', date_filter_with_alias)
+            sql_query = render_date_placeholders(sql_query)
 
-            with self.engine.connect() as conn:
-                result = pd.read_sql_query(
-                    text(sql_query),
-                    conn,
-                    params=params
-                )
-                logger.info(f"Query retornou {len(result)} registros")
-                return result
+            result = self._read_sql(sql_query, params)
+            logger.info(f"Query retornou {len(result)} registros")
+            return result
         except Exception as e:
             logger.error(f"Erro ao executar query: {str(e)}")
             return pd.DataFrame()
@@ -101,21 +235,21 @@ class SupabaseClient:
         Busca dados de engajamento do Instagram usando InstagramQueries
 
         Args:
-            date_start: Data inicial (YYYY-MM-DD) - usado via placeholders na query
-            date_end: Data final (YYYY-MM-DD) - usado via placeholders na query
+            date_start: Data inicial (YYYY-MM-DD)
+            date_end: Data final (YYYY-MM-DD)
             shopping_filter: Filtro de shopping específico
 
         Returns:
             DataFrame com dados de engajamento
         """
-        # Usa a query do InstagramQueries com placeholders
-        query = self.instagram_queries.get_engagement_query(
+        # Usa a query do InstagramQueries (datas e shopping como parâmetros)
+        query, params = self.instagram_queries.get_engagement_query(
             date_start=date_start,
             date_end=date_end,
             shopping_filter=shopping_filter
         )
 
-        return self.query(query)
+        return self.query(query, params)
 
     def get_engagement_data(self, date_start: Optional[str] = None,
                            date_end: Optional[str] = None,
@@ -132,89 +266,17 @@ class SupabaseClient:
             DataFrame com dados de engajamento
         """
 
-        # Constrói WHERE clause - usa parâmetros de data quando fornecidos
-        if date_start and date_end:
-            # Usa o período específico solicitado pela aplicação
-            where_clause = f"""
-                DATE(p."postedAt") BETWEEN '{date_start}' AND '{date_end}'
-            """
+        # Rollups diários pré-agregados (INSTAGRAM_USE_ROLLUP=true) ou dados brutos
+        if self._use_instagram_rollup():
+            build_query = self.instagram_rollups.get_engagement_query
         else:
-            # Fallback: dados desde o primeiro dia do ano anterior até hoje
-            # (corrigido para atender a especificação do usuário)
-            where_clause = """
-                DATE(p."postedAt") BETWEEN
-                    DATE_TRUNC('year', CURRENT_DATE - INTERVAL '1 year')
-                    AND CURRENT_DATE
-            """
-        params = {}
-
-        # Query com UNION ALL para todos os shoppings
-        query = f"""
-        WITH all_data AS (
-            SELECT
-                'SCIB' as shopping,
-                DATE(p."postedAt") as data,
-                COALESCE(SUM(i.likes), 0) as total_likes,
-                COALESCE(SUM(i.reach),0) as total_alcance,
-                COALESCE(SUM(i.impressions),0) as total_impressoes,
-                COALESCE(SUM(i.comments), 0) as total_comentarios,
-                COALESCE(SUM(i.shares), 0) as total_compartilhamentos,
-                COALESCE(SUM(i.saved), 0) as total_salvos,
-                COUNT(DISTINCT p.id) as total_posts
-            FROM "{self.schemas['SCIB']}"."Post" p
-            LEFT JOIN "{self.schemas['SCIB']}"."PostInsight" i ON p.id = i."postId"
-            WHERE {where_clause}
-            GROUP BY DATE(p."postedAt")
-
-            UNION ALL
-
-            SELECT
-                'SBGP' as shopping,
-                DATE(p."postedAt") as data,
-                COALESCE(SUM(i.likes), 0) as total_likes,
-                COALESCE(SUM(i.reach),0) as total_alcance,
-                COALESCE(SUM(i.impressions),0) as total_impressoes,
-                COALESCE(SUM(i.comments), 0) as total_comentarios,
-                COALESCE(SUM(i.shares), 0) as total_compartilhamentos,
-                COALESCE(SUM(i.saved), 0) as total_salvos,
-                COUNT(DISTINCT p.id) as total_posts
-            FROM "{self.schemas['SBGP']}"."Post" p
-            LEFT JOIN "{self.schemas['SBGP']}"."PostInsight" i ON p.id = i."postId"
-            WHERE {where_clause}
-            GROUP BY DATE(p."postedAt")
-
-            UNION ALL
-
-            SELECT
-                'SBI' as shopping,
-                DATE(p."postedAt") as data,
-                COALESCE(SUM(i.likes), 0) as total_likes,
-                COALESCE(SUM(i.reach),0) as total_alcance,
-                COALESCE(SUM(i.impressions),0) as total_impressoes,
-                COALESCE(SUM(i.comments), 0) as total_comentarios,
-                COALESCE(SUM(i.shares), 0) as total_compartilhamentos,
-                COALESCE(SUM(i.saved), 0) as total_salvos,
-                COUNT(DISTINCT p.id) as total_posts
-            FROM "{self.schemas['SBI']}"."Post" p
-            LEFT JOIN "{self.schemas['SBI']}"."PostInsight" i ON p.id = i."postId"
-            WHERE {where_clause}
-            GROUP BY DATE(p."postedAt")
+            build_query = self.instagram_queries.get_engagement_daily_query
+
+        query, params = build_query(
+            date_start=date_start,
+            date_end=date_end,
+            shopping_filter=shopping_filter
         )
-        SELECT
-            shopping,
-            data,
-            total_likes,
-            total_alcance,
-            total_impressoes,
-            total_comentarios,
-            total_compartilhamentos,
-            total_salvos,
-            (total_likes + total_comentarios + total_compartilhamentos + total_salvos) as engajamento_total,
-            total_posts
-        FROM all_data
-        {f"WHERE shopping = '{shopping_filter}'" if shopping_filter else ""}
-        ORDER BY data DESC, shopping
-        """
 
         return self.query(query, params)
 
@@ -225,25 +287,28 @@ class SupabaseClient:
         Busca contagem de posts por dia usando InstagramQueries
 
         Args:
-            date_start: Data inicial (YYYY-MM-DD) - usado via placeholders na query
-            date_end: Data final (YYYY-MM-DD) - usado via placeholders na query
+            date_start: Data inicial (YYYY-MM-DD)
+            date_end: Data final (YYYY-MM-DD)
             shopping_filter: Filtro de shopping específico
 
         Returns:
             DataFrame com contagem de posts
         """
-        # Usa a query do InstagramQueries com placeholders
-        query = self.instagram_queries.get_post_count_query(
+        # Usa a query do InstagramQueries (ou os rollups diários)
+        queries = self.instagram_rollups if self._use_instagram_rollup() else self.instagram_queries
+        query, params = queries.get_post_count_query(
             date_start=date_start,
             date_end=date_end,
             shopping_filter=shopping_filter
         )
 
-        return self.query(query)
+        return self.query(query, params)
 
     def fetch_wbr_data(self, *, table_name: str, date_col: str = 'data',
                        metric_col: str = 'value', shopping_col: Optional[str] = 'shopping',
-                       date_reference: Optional[str] = None) -> pd.DataFrame:
+                       date_reference: Optional[str] = None,
+                       date_start: Optional[str] = None,
+                       raise_errors: bool = False) -> pd.DataFrame:
         """
         Busca dados WBR das tabelas principais (fluxo de pessoas, veículos, vendas).
 
@@ -253,54 +318,197 @@ class SupabaseClient:
             metric_col: Nome da coluna de métrica
             shopping_col: Nome da coluna de shopping (opcional)
             date_reference: Data de referência para filtro (YYYY-MM-DD)
+            date_start: Data inicial (YYYY-MM-DD); default: 1º de janeiro do ano anterior à referência
+            raise_errors: Propaga erros do banco em vez de retornar um DataFrame vazio
+                (para quem precisa distinguir "sem linhas" de "falhou", como o cache local)
 
         Returns:
             DataFrame com colunas padronizadas: date, metric_value, shopping (se houver)
         """
         try:
-            # Monta query básica
-            select_cols = [f"{date_col} as date", f"{metric_col} as metric_value"]
-            if shopping_col:
-                select_cols.append(f"{shopping_col} as shopping")
-
-            # Define o filtro de data
-            # Se date_reference fornecida, usa ela; senão usa data atual
-            if date_reference:
-                ref_date = f"'{date_reference}'::date"
-            else:
-                ref_date = "CURRENT_DATE"
-
-            # Busca dados do início do ano anterior até a data de referência
-            # Isso garante ter dados para comparação YoY
-            date_filter = f"""
-            {date_col} BETWEEN
-                DATE_TRUNC('year', {ref_date} - INTERVAL '1 year')
-                AND {ref_date}
-            """
-
-            query = f"""
-            SELECT {', '.join(select_cols)}
-            FROM "{table_name.replace('.', '"."')}"
-            WHERE {date_col} IS NOT NULL
-                AND {date_filter}
-            ORDER BY {date_col} DESC
-            """
+            query, params = self.wbr_queries.get_wbr_data_query(
+                table_name=table_name,
+                date_col=date_col,
+                metric_col=metric_col,
+                shopping_col=shopping_col,
+                date_reference=date_reference,
+                date_start=date_start
+            )
 
             # Executa query
-            with self.engine.connect() as conn:
-                df = pd.read_sql_query(text(query), conn)
+            df = self._read_sql(query, params)
 
             # Converte coluna de data para datetime
             if not df.empty and 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
+                with timed('parse_dates'):
+                    df['date'] = pd.to_datetime(df['date'])
 
             logger.info(f"Fetched {len(df)} rows from {table_name} (filtered by date)")
             return df
 
         except Exception as e:
             logger.error(f"Erro ao buscar dados de {table_name}: {str(e)}")
+            if raise_errors:
+                raise
+            return pd.DataFrame()
+
+    def get_max_date(self, *, table_name: str, date_col: str = 'data',
+                     shopping_col: Optional[str] = 'shopping',
+                     shopping_filter: Optional[str] = None) -> Optional[pd.Timestamp]:
+        """
+        Retorna a última data disponível (até hoje) de uma tabela WBR.
+
+        Args:
+            table_name: Nome da tabela com schema (ex: "mapa-do-bosque.fluxo_de_pessoas")
+            date_col: Nome da coluna de data
+            shopping_col: Nome da coluna de shopping (opcional)
+            shopping_filter: Filtro de shopping específico
+
+        Returns:
+            Última data ou None se não houver dados
+        """
+        try:
+            table = '"' + table_name.replace('.', '"."') + '"'
+            params: Dict[str, Any] = {}
+            shopping_clause = ""
+            if shopping_filter and shopping_col:
+                shopping_clause = f"AND {shopping_col} = :shopping"
+                params['shopping'] = shopping_filter
+
+            query = f"""
+            SELECT MAX({date_col}) FROM {table}
+            WHERE {date_col} <= CURRENT_DATE {shopping_clause}
+            """
+            with self.engine.connect() as conn:
+                data_max = conn.execute(text(query), params).scalar()
+            return pd.Timestamp(data_max) if data_max is not None else None
+
+        except Exception as e:
+            logger.error(f"Erro ao buscar última data de {table_name}: {str(e)}")
+            return None
+
+    def fetch_wbr_buckets(self, *, table_name: str, intervalos: List[Tuple[pd.Timestamp, pd.Timestamp]],
+                          date_col: str = 'data', metric_col: str = 'value',
+                          shopping_col: Optional[str] = 'shopping',
+                          shopping_filter: Optional[str] = None,
+                          group_by_shopping: bool = False) -> pd.DataFrame:
+        """
+        Soma a métrica no próprio banco para cada intervalo [inicio, fim] informado.
+
+        Os intervalos (semanas e meses WBR, CY e PY) vão na query como uma lista
+        VALUES e o banco faz SUM ... GROUP BY bucket[, shopping], devolvendo cerca de
+        40 linhas por tabela em vez de todas as linhas diárias.
+
+        Args:
+            table_name: Nome da tabela com schema (ex: "mapa-do-bosque.fluxo_de_pessoas")
+            intervalos: Lista de (inicio, fim) inclusivos, ver planejar_intervalos_wbr
+            date_col: Nome da coluna de data
+            metric_col: Nome da coluna de métrica
+            shopping_col: Nome da coluna de shopping (opcional)
+            shopping_filter: Filtro de shopping específico
+            group_by_shopping: Se True, agrega também por shopping
+
+        Returns:
+            DataFrame com colunas idx, [shopping,] soma, linhas (buckets sem dados são omitidos)
+        """
+        try:
+            if not intervalos:
+                return pd.DataFrame()
+            if group_by_shopping and not shopping_col:
+                raise ValueError("group_by_shopping requer shopping_col")
+
+            table = '"' + table_name.replace('.', '"."') + '"'
+
+            # Limites como parâmetros (timestamp do Postgres tem resolução de microssegundos)
+            params: Dict[str, Any] = {}
+            valores = []
+            for i, (inicio, fim) in enumerate(intervalos):
+                params[f'i{i}'] = pd.Timestamp(inicio).floor('us').to_pydatetime()
+                params[f'f{i}'] = pd.Timestamp(fim).floor('us').to_pydatetime()
+                valores.append(f"({i}, CAST(:i{i} AS timestamp), CAST(:f{i} AS timestamp))")
+            params['janela_inicio'] = min(params[f'i{i}'] for i in range(len(intervalos)))
+            params['janela_fim'] = max(params[f'f{i}'] for i in range(len(intervalos)))
+
+            shopping_clause = ""
+            if shopping_filter and shopping_col:
+                shopping_clause = f"AND {shopping_col} = :shopping"
+                params['shopping'] = shopping_filter
+
+            shopping_dados = f", {shopping_col} AS shopping" if group_by_shopping else ""
+            shopping_group = ", d.shopping" if group_by_shopping else ""
+
+            query = f"""
+            WITH buckets(idx, inicio, fim) AS (
+                VALUES {', '.join(valores)}
+            ),
+            dados AS (
+                SELECT {date_col} AS date, {metric_col} AS metric_value{shopping_dados}
+                FROM {table}
+                WHERE {date_col} BETWEEN :janela_inicio AND :janela_fim
+                    {shopping_clause}
+            )
+            SELECT b.idx{shopping_group},
+                   COALESCE(SUM(d.metric_value), 0) AS soma,
+                   COUNT(d.date) AS linhas
+            FROM buckets b
+            JOIN dados d ON d.date >= b.inicio AND d.date <= b.fim
+            GROUP BY b.idx{shopping_group}
+            """
+
+            # Mesmo caminho das demais leituras: medição db_fetch e backend COPY
+            df = self._read_sql(query, params)
+
+            logger.info(f"Fetched {len(df)} aggregated buckets from {table_name}")
+            return df
+
+        except Exception as e:
+            logger.error(f"Erro ao agregar dados de {table_name}: {str(e)}")
             return pd.DataFrame()
 
+    @staticmethod
+    def _use_instagram_rollup() -> bool:
+        """Verifica se as leituras do Instagram usam os rollups diários"""
+        return os.getenv("INSTAGRAM_USE_ROLLUP", "false").lower() == "true"
+
+    def refresh_instagram_rollups(self, days: Optional[int] = None, full: bool = False) -> Dict[str, int]:
+        """
+        Cria (se preciso) e atualiza os rollups diários do Instagram de cada shopping.
+
+        A atualização é incremental: recalcula só os dias a partir da última data do
+        rollup menos `days` (métricas de posts recentes continuam mudando). Rollups
+        vazios ou full=True são recalculados por completo.
+
+        Args:
+            days: Dias recalculados antes da última data (default: INSTAGRAM_ROLLUP_RESYNC_DAYS ou 7)
+            full: Recalcula todo o histórico
+
+        Returns:
+            Dicionário {shopping: linhas (dias) recalculadas}
+        """
+        if days is None:
+            days = int(os.getenv("INSTAGRAM_ROLLUP_RESYNC_DAYS", "7"))
+
+        result = {}
+        for shopping in self.schemas:
+            # Uma transação por shopping: leitores nunca veem o rollup parcialmente apagado
+            with self.engine.begin() as conn:
+                conn.execute(text(self.instagram_rollups.get_create_table_sql(shopping)))
+
+                since = None
+                if not full:
+                    last_date = conn.execute(text(self.instagram_rollups.get_max_date_sql(shopping))).scalar()
+                    if last_date is not None:
+                        since = pd.Timestamp(last_date) - pd.Timedelta(days=days)
+                        since = since.date()
+
+                conn.execute(text(self.instagram_rollups.get_delete_sql(shopping)), {'since': since})
+                inserted = conn.execute(text(self.instagram_rollups.get_insert_sql(shopping)), {'since': since})
+                result[shopping] = inserted.rowcount
+
+            logger.info(f"Instagram rollup {shopping}: {result[shopping]} days refreshed since {since or 'start'}")
+
+        return result
+
     def test_connection(self) -> bool:
         """Testa a conexão com o banco"""
         try:
@@ -3,6 +3,9 @@ SQL Query Management Module
 """
 
 from .instagram_queries import InstagramQueries
+from .wbr_queries import WBRQueries
+from .instagram_rollups import InstagramRollupQueries
+from .index_queries import IndexQueries
 
-__all__ = ['InstagramQueries']
+__all__ = ['InstagramQueries', 'WBRQueries', 'InstagramRollupQueries', 'IndexQueries']
 
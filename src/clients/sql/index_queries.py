@@ -0,0 +1,122 @@
+"""
+Índices recomendados para as queries do dashboard (tabelas WBR e schemas do Instagram).
+Usado pelo verificador scripts/check_database.py para propor e aplicar índices.
+"""
+
+import os
+from typing import Dict, Any, List, Optional
+
+
+class IndexQueries:
+    """Gera o DDL dos índices que atendem as queries WBR e do Instagram"""
+
+    def __init__(self):
+        """Inicializa com os schemas dos shoppings"""
+        self.schemas = {
+            'SCIB': os.getenv("SUPABASE_SCHEMA_1", "instagram-data-fetch-scib"),
+            'SBGP': os.getenv("SUPABASE_SCHEMA_2", "instagram-data-fetch-sbgp"),
+            'SBI': os.getenv("SUPABASE_SCHEMA_3", "instagram-data-fetch-sbi")
+        }
+
+    @staticmethod
+    def _index(schema: str, table: str, name: str, columns: str, reason: str) -> Dict[str, Any]:
+        # Nomes de índice do Postgres têm no máximo 63 caracteres
+        name = name.replace('-', '_')[:63]
+        return {
+            'schema': schema,
+            'table': table,
+            'name': name,
+            # Mesma forma que o Postgres usa em pg_indexes.indexdef ("USING btree (...)")
+            'columns': columns,
+            'reason': reason,
+            'sql': f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{schema}"."{table}" ({columns})'
+        }
+
+    def get_wbr_indexes(self, tables_config: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Índices das tabelas WBR.
+
+        - (data, shopping): filtro só por período com ORDER BY data (get_wbr_data_query,
+          que busca todos os shoppings de uma vez); sem coluna de shopping, só (data).
+          Um índice começando por shopping não serve a esse filtro.
+        - (shopping, data): filtro por shopping + período (fetch_wbr_buckets, get_max_date).
+
+        Args:
+            tables_config: Dicionário {tabela: configuração} (ver get_table_config)
+
+        Returns:
+            Lista de índices recomendados
+        """
+        indexes = []
+        for config in tables_config.values():
+            schema = config.get('schema') or 'public'
+            table = config['table']
+            date_col = config['date_col']
+            shopping_col = config.get('shopping_col')
+
+            if shopping_col:
+                indexes.append(self._index(
+                    schema, table, f"idx_{table}_{date_col}_{shopping_col}",
+                    f"{date_col}, {shopping_col}", "filtro por período (todos os shoppings)"
+                ))
+                indexes.append(self._index(
+                    schema, table, f"idx_{table}_{shopping_col}_{date_col}",
+                    f"{shopping_col}, {date_col}", "filtro por shopping e período"
+                ))
+            else:
+                indexes.append(self._index(
+                    schema, table, f"idx_{table}_{date_col}", date_col, "filtro por período"
+                ))
+        return indexes
+
+    def get_instagram_indexes(self) -> List[Dict[str, Any]]:
+        """
+        Índices dos schemas do Instagram de cada shopping.
+
+        - Expressão DATE("postedAt") em Post: filtro e GROUP BY por dia
+        - PostInsight("postId"): junção Post -> PostInsight
+
+        Returns:
+            Lista de índices recomendados
+        """
+        indexes = []
+        for shopping, schema in self.schemas.items():
+            prefix = shopping.lower()
+            indexes.append(self._index(
+                schema, 'Post', f"idx_{prefix}_post_posted_date",
+                'date("postedAt")', 'filtro e agrupamento por DATE("postedAt")'
+            ))
+            indexes.append(self._index(
+                schema, 'PostInsight', f"idx_{prefix}_postinsight_post_id",
+                '"postId"', 'junção Post -> PostInsight'
+            ))
+        return indexes
+
+    def get_existing_indexes_sql(self) -> str:
+        """Lista os índices existentes (schema, tabela, nome e definição)"""
+        return """
+        SELECT schemaname AS schema, tablename AS table, indexname AS name, indexdef
+        FROM pg_indexes
+        WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
+        """
+
+    @staticmethod
+    def find_existing(index: Dict[str, Any], existing: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Procura um índice existente equivalente (mesmo nome ou mesmas colunas na mesma tabela)
+
+        Args:
+            index: Índice recomendado
+            existing: Linhas de get_existing_indexes_sql
+
+        Returns:
+            Nome do índice existente ou None
+        """
+        columns = index['columns'].replace(' ', '').lower()
+        for row in existing:
+            if row['schema'] != index['schema'] or row['table'] != index['table']:
+                continue
+            indexdef = row['indexdef'].replace(' ', '').lower()
+            if row['name'] == index['name'] or f"({columns})" in indexdef:
+                return row['name']
+        return None
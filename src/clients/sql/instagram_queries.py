@@ -4,11 +4,14 @@ Cada query combina dados dos 3 shoppings (SCIB, SBGP, SBI).
 """
 
 import os
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple, Dict, Any
+
+from .params import DATE_PARAM_RANGE, date_params, select_shoppings, shopping_condition, shopping_params
 
 
 class InstagramQueries:
-    def get_post_count_query(self, date_start: Optional[str] = None, date_end: Optional[str] = None, shopping_filter: Optional[str] = None) -> str:
+    def get_post_count_query(self, date_start: Optional[str] = None, date_end: Optional[str] = None, shopping_filter: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
         """
         Query para contar a quantidade de posts por shopping e data.
         Args:
@@ -16,56 +19,10 @@ class InstagramQueries:
             date_end: Data final (YYYY-MM-DD)
             shopping_filter: Filtro de shopping específico (SCIB, SBGP, SBI) ou None para todos
         Returns:
-            Query SQL para contagem de posts
+            Tupla (query SQL com parâmetros :date_start, :date_end e :shopping, parâmetros)
         """
-
-        # Filtro de shopping
-        shopping_where = ""
-        if shopping_filter:
-            shopping_where = f"AND SHOPPING = '{shopping_filter}'"
-
-        query = f"""
-        SELECT
-            SHOPPING,
-            DATA,
-            value
-        FROM (
-            SELECT
-                'SCIB' AS SHOPPING,
-                DATE("postedAt") AS DATA,
-                COUNT(DISTINCT id) AS value
-            FROM "{self.schemas['SCIB']}"."Post"
-            WHERE
-                {{{{date_filter}}}}
-            GROUP BY DATE("postedAt")
-
-            UNION ALL
-
-            SELECT
-                'SBGP' AS SHOPPING,
-                DATE("postedAt") AS DATA,
-                COUNT(DISTINCT id) AS value
-            FROM "{self.schemas['SBGP']}"."Post"
-            WHERE
-                {{{{date_filter}}}}
-            GROUP BY DATE("postedAt")
-
-            UNION ALL
-
-            SELECT
-                'SBI' AS SHOPPING,
-                DATE("postedAt") AS DATA,
-                COUNT(DISTINCT id) AS value
-            FROM "{self.schemas['SBI']}"."Post"
-            WHERE
-                {{{{date_filter}}}}
-            GROUP BY DATE("postedAt")
-        ) AS combined_data
-        WHERE 1 = 1
-        {shopping_where}
-        ORDER BY DATA DESC, SHOPPING
-        """
-        return query
+        query = _post_count_sql(self._schemas_for(shopping_filter), bool(shopping_filter))
+        return query, {**date_params(date_start, date_end), **shopping_params(shopping_filter)}
     """Gerencia queries SQL para dados do Instagram"""
 
     def __init__(self):
@@ -76,7 +33,11 @@ class InstagramQueries:
             'SBI': os.getenv("SUPABASE_SCHEMA_3", "instagram-data-fetch-sbi")
         }
 
-    def get_engagement_query(self, date_start: Optional[str] = None, date_end: Optional[str] = None, shopping_filter: Optional[str] = None) -> str:
+    def _schemas_for(self, shopping_filter: Optional[str]) -> Tuple[Tuple[str, str], ...]:
+        """Pares (shopping, schema) dos ramos do UNION ALL"""
+        return tuple((shopping, self.schemas[shopping]) for shopping in select_shoppings(self.schemas, shopping_filter))
+
+    def get_engagement_query(self, date_start: Optional[str] = None, date_end: Optional[str] = None, shopping_filter: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
         """
         Query para métricas de engajamento (likes, comentários, compartilhamentos, salvamentos).
         Esta query pode ser usada para:
@@ -91,69 +52,167 @@ class InstagramQueries:
             shopping_filter: Filtro de shopping específico (SCIB, SBGP, SBI) ou None para todos
 
         Returns:
-            Query SQL combinando dados dos 3 shoppings
+            Tupla (query SQL com parâmetros :date_start, :date_end e :shopping, parâmetros)
         """
+        query = _engagement_sql(self._schemas_for(shopping_filter), bool(shopping_filter))
+        return query, {**date_params(date_start, date_end), **shopping_params(shopping_filter)}
 
-        # Filtro de shopping
-        shopping_where = ""
-        if shopping_filter:
-            shopping_where = f"AND shopping = '{shopping_filter}'"
+    def get_engagement_daily_query(self, date_start: Optional[str] = None, date_end: Optional[str] = None, shopping_filter: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Query de engajamento diário por shopping (inclui alcance, impressões e posts).
+
+        Args:
+            date_start: Data inicial (YYYY-MM-DD)
+            date_end: Data final (YYYY-MM-DD)
+            shopping_filter: Filtro de shopping específico (SCIB, SBGP, SBI) ou None para todos
+
+        Returns:
+            Tupla (query SQL com parâmetros :date_start, :date_end e :shopping, parâmetros)
+        """
+        query = _engagement_daily_sql(self._schemas_for(shopping_filter), bool(shopping_filter))
+        return query, {**date_params(date_start, date_end), **shopping_params(shopping_filter)}
 
-        query = f"""
-        SELECT
-            shopping,
-            data,
-            SUM(likes) as total_likes,
-            SUM(comments) as total_comentarios,
-            SUM(shares) as total_compartilhamentos,
-            SUM(saved) as total_salvos,
-            SUM(likes + comments + shares + saved) as engajamento_total,
-            COUNT(*) as total_posts
-        FROM (
-            SELECT
-                'SCIB' as shopping,
-                DATE(P."postedAt") as data,
-                I.likes,
-                I.comments,
-                I.shares,
-                I.saved
-            FROM "{self.schemas['SCIB']}"."Post" as P
-            JOIN "{self.schemas['SCIB']}"."PostInsight" as I ON P.id = I."postId"
-            WHERE
-                {{{{date_filter_with_alias}}}}
 
-            UNION ALL
+# Textos SQL em cache por (ramos, com/sem filtro): só os parâmetros mudam entre chamadas
 
+@lru_cache(maxsize=None)
+def _post_count_sql(schemas: Tuple[Tuple[str, str], ...], filtered: bool) -> str:
+    # Um ramo do UNION ALL por shopping pedido
+    branches = "\n\n            UNION ALL\n".join(
+        f"""
             SELECT
-                'SBGP' as shopping,
-                DATE(P."postedAt") as data,
-                I.likes,
-                I.comments,
-                I.shares,
-                I.saved
-            FROM "{self.schemas['SBGP']}"."Post" as P
-            JOIN "{self.schemas['SBGP']}"."PostInsight" as I ON P.id = I."postId"
+                '{shopping}' AS SHOPPING,
+                DATE("postedAt") AS DATA,
+                COUNT(DISTINCT id) AS value
+            FROM "{schema}"."Post"
             WHERE
-                {{{{date_filter_with_alias}}}}
+                {DATE_PARAM_RANGE.format(column='DATE("postedAt")')}
+            GROUP BY DATE("postedAt")"""
+        for shopping, schema in schemas
+    )
+
+    query = f"""
+        SELECT
+            SHOPPING,
+            DATA,
+            value
+        FROM ({branches}
+        ) AS combined_data
+        WHERE {shopping_condition("SHOPPING", filtered)}
+        ORDER BY DATA DESC, SHOPPING
+        """
+    return query
 
-            UNION ALL
 
+@lru_cache(maxsize=None)
+def _engagement_sql(schemas: Tuple[Tuple[str, str], ...], filtered: bool) -> str:
+    # Um ramo do UNION ALL por shopping pedido
+    branches = "\n\n            UNION ALL\n".join(
+        f"""
             SELECT
-                'SBI' as shopping,
+                '{shopping}' as shopping,
                 DATE(P."postedAt") as data,
                 I.likes,
                 I.comments,
                 I.shares,
                 I.saved
-            FROM "{self.schemas['SBI']}"."Post" as P
-            JOIN "{self.schemas['SBI']}"."PostInsight" as I ON P.id = I."postId"
+            FROM "{schema}"."Post" as P
+            JOIN "{schema}"."PostInsight" as I ON P.id = I."postId"
             WHERE
-                {{{{date_filter_with_alias}}}}
+                {DATE_PARAM_RANGE.format(column='DATE(P."postedAt")')}"""
+        for shopping, schema in schemas
+    )
+
+    query = f"""
+        SELECT
+            shopping,
+            data,
+            SUM(likes) as total_likes,
+            SUM(comments) as total_comentarios,
+            SUM(shares) as total_compartilhamentos,
+            SUM(saved) as total_salvos,
+            SUM(likes + comments + shares + saved) as engajamento_total,
+            COUNT(*) as total_posts
+        FROM ({branches}
         ) as combined_data
-        WHERE 1 = 1
-        {shopping_where}
+        WHERE {shopping_condition("shopping", filtered)}
         GROUP BY shopping, data
         ORDER BY data DESC, shopping
         """
 
-        return query
+    return query
+
+
+@lru_cache(maxsize=None)
+def _engagement_daily_sql(schemas: Tuple[Tuple[str, str], ...], filtered: bool) -> str:
+    # Query com UNION ALL apenas para os shoppings pedidos
+    branches = "\n\n            UNION ALL\n".join(
+        f"""
+            SELECT
+                '{shopping}' as shopping,
+                DATE(p."postedAt") as data,
+                COALESCE(SUM(i.likes), 0) as total_likes,
+                COALESCE(SUM(i.reach),0) as total_alcance,
+                COALESCE(SUM(i.impressions),0) as total_impressoes,
+                COALESCE(SUM(i.comments), 0) as total_comentarios,
+                COALESCE(SUM(i.shares), 0) as total_compartilhamentos,
+                COALESCE(SUM(i.saved), 0) as total_salvos,
+                COUNT(DISTINCT p.id) as total_posts
+            FROM "{schema}"."Post" p
+            LEFT JOIN "{schema}"."PostInsight" i ON p.id = i."postId"
+            WHERE {DATE_PARAM_RANGE.format(column='DATE(p."postedAt")')}
+            GROUP BY DATE(p."postedAt")"""
+        for shopping, schema in schemas
+    )
+
+    query = f"""
+        WITH all_data AS ({branches}
+        )
+        SELECT
+            shopping,
+            data,
+            total_likes,
+            total_alcance,
+            total_impressoes,
+            total_comentarios,
+            total_compartilhamentos,
+            total_salvos,
+            (total_likes + total_comentarios + total_compartilhamentos + total_salvos) as engajamento_total,
+            total_posts
+        FROM all_data
+        WHERE {shopping_condition("shopping", filtered)}
+        ORDER BY data DESC, shopping
+        """
+
+    return query
+
+
+def render_date_placeholders(sql_query: str) -> str:
+    """
+    Substitui os placeholders de data ({{date_filter}}, {{date_filter_with_alias}})
+    pelo período padrão: do primeiro dia do ano anterior até hoje.
+
+    Args:
+        sql_query: Query SQL com placeholders
+
+    Returns:
+        Query SQL pronta para execução
+    """
+    # Corrigido para usar desde o primeiro dia do ano anterior até hoje
+    if '{{date_filter}}' in sql_query:
+        date_filter = """
+        DATE("postedAt") BETWEEN
+            DATE_TRUNC('year', CURRENT_DATE - INTERVAL '1 year')
+            AND CURRENT_DATE
+        """
+        sql_query = sql_query.replace('{{date_filter}}', date_filter)
+
+    if '{{date_filter_with_alias}}' in sql_query:
+        date_filter_with_alias = """
+        DATE(P."postedAt") BETWEEN
+            DATE_TRUNC('year', CURRENT_DATE - INTERVAL '1 year')
+            AND CURRENT_DATE
+        """
+        sql_query = sql_query.replace('{{date_filter_with_alias}}', date_filter_with_alias)
+
+    return sql_query
@@ -0,0 +1,196 @@
+"""
+Tabelas de rollup diário do Instagram (uma por schema de shopping).
+Pré-agregam Post + PostInsight por (shopping, data) para que a página do
+Instagram leia poucas centenas de linhas em vez de juntar posts e insights.
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional, Tuple, Dict, Any
+
+from .params import DATE_PARAM_RANGE, date_params, select_shoppings, shopping_condition, shopping_params
+
+
+class InstagramRollupQueries:
+    """Gerencia DDL, atualização e leitura dos rollups diários do Instagram"""
+
+    def __init__(self):
+        """Inicializa com os schemas dos shoppings e o nome da tabela de rollup"""
+        self.schemas = {
+            'SCIB': os.getenv("SUPABASE_SCHEMA_1", "instagram-data-fetch-scib"),
+            'SBGP': os.getenv("SUPABASE_SCHEMA_2", "instagram-data-fetch-sbgp"),
+            'SBI': os.getenv("SUPABASE_SCHEMA_3", "instagram-data-fetch-sbi")
+        }
+        self.table = os.getenv("INSTAGRAM_ROLLUP_TABLE", "PostDailyRollup")
+
+    def _rollup(self, shopping: str) -> str:
+        return f'"{self.schemas[shopping]}"."{self.table}"'
+
+    def get_create_table_sql(self, shopping: str) -> str:
+        """
+        DDL da tabela de rollup de um shopping (idempotente).
+
+        Args:
+            shopping: Código do shopping (SCIB, SBGP, SBI)
+
+        Returns:
+            SQL CREATE TABLE IF NOT EXISTS
+        """
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self._rollup(shopping)} (
+            shopping TEXT NOT NULL,
+            data DATE NOT NULL,
+            total_likes BIGINT NOT NULL DEFAULT 0,
+            total_alcance BIGINT NOT NULL DEFAULT 0,
+            total_impressoes BIGINT NOT NULL DEFAULT 0,
+            total_comentarios BIGINT NOT NULL DEFAULT 0,
+            total_compartilhamentos BIGINT NOT NULL DEFAULT 0,
+            total_salvos BIGINT NOT NULL DEFAULT 0,
+            total_posts BIGINT NOT NULL DEFAULT 0,
+            atualizado_em TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (shopping, data)
+        )
+        """
+
+    def get_max_date_sql(self, shopping: str) -> str:
+        """Última data presente no rollup de um shopping"""
+        return f"SELECT MAX(data) FROM {self._rollup(shopping)}"
+
+    def get_delete_sql(self, shopping: str) -> str:
+        """
+        Remove os dias que serão recalculados (a partir de :since; sem :since remove tudo).
+
+        Args:
+            shopping: Código do shopping
+
+        Returns:
+            SQL DELETE com parâmetro :since (date ou NULL)
+        """
+        return f"""
+        DELETE FROM {self._rollup(shopping)}
+        WHERE CAST(:since AS date) IS NULL OR data >= CAST(:since AS date)
+        """
+
+    def get_insert_sql(self, shopping: str) -> str:
+        """
+        Recalcula os dias a partir de :since a partir de Post + PostInsight.
+
+        Mesma agregação de get_engagement_daily_query: LEFT JOIN (dias com posts sem
+        insights contam com zeros) e COUNT(DISTINCT p.id) para posts.
+
+        Args:
+            shopping: Código do shopping
+
+        Returns:
+            SQL INSERT ... SELECT com parâmetro :since (date ou NULL)
+        """
+        schema = self.schemas[shopping]
+        return f"""
+        INSERT INTO {self._rollup(shopping)} (
+            shopping, data, total_likes, total_alcance, total_impressoes,
+            total_comentarios, total_compartilhamentos, total_salvos, total_posts
+        )
+        SELECT
+            '{shopping}' as shopping,
+            DATE(p."postedAt") as data,
+            COALESCE(SUM(i.likes), 0),
+            COALESCE(SUM(i.reach), 0),
+            COALESCE(SUM(i.impressions), 0),
+            COALESCE(SUM(i.comments), 0),
+            COALESCE(SUM(i.shares), 0),
+            COALESCE(SUM(i.saved), 0),
+            COUNT(DISTINCT p.id)
+        FROM "{schema}"."Post" p
+        LEFT JOIN "{schema}"."PostInsight" i ON p.id = i."postId"
+        WHERE p."postedAt" IS NOT NULL
+            AND (CAST(:since AS date) IS NULL OR DATE(p."postedAt") >= CAST(:since AS date))
+        GROUP BY DATE(p."postedAt")
+        """
+
+    def _rollups_for(self, shopping_filter: Optional[str]) -> Tuple[str, ...]:
+        """Tabelas de rollup dos ramos do UNION ALL"""
+        return tuple(self._rollup(shopping) for shopping in select_shoppings(self.schemas, shopping_filter))
+
+    def get_engagement_query(self, date_start: Optional[str] = None, date_end: Optional[str] = None, shopping_filter: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Engajamento diário lido dos rollups (mesmas colunas de get_engagement_daily_query).
+
+        Args:
+            date_start: Data inicial (YYYY-MM-DD)
+            date_end: Data final (YYYY-MM-DD)
+            shopping_filter: Filtro de shopping específico ou None para todos
+
+        Returns:
+            Tupla (query SQL sobre as tabelas de rollup, parâmetros)
+        """
+        query = _engagement_sql(self._rollups_for(shopping_filter), bool(shopping_filter))
+        return query, {**date_params(date_start, date_end), **shopping_params(shopping_filter)}
+
+    def get_post_count_query(self, date_start: Optional[str] = None, date_end: Optional[str] = None, shopping_filter: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Contagem diária de posts lida dos rollups (mesmas colunas de get_post_count_query).
+
+        Args:
+            date_start: Data inicial (YYYY-MM-DD)
+            date_end: Data final (YYYY-MM-DD)
+            shopping_filter: Filtro de shopping específico ou None para todos
+
+        Returns:
+            Tupla (query SQL sobre as tabelas de rollup, parâmetros)
+        """
+        query = _post_count_sql(self._rollups_for(shopping_filter), bool(shopping_filter))
+        return query, {**date_params(date_start, date_end), **shopping_params(shopping_filter)}
+
+
+# Textos SQL em cache por (ramos, com/sem filtro): só os parâmetros mudam entre chamadas
+
+@lru_cache(maxsize=None)
+def _engagement_sql(rollups: Tuple[str, ...], filtered: bool) -> str:
+    where_clause = DATE_PARAM_RANGE.format(column="data")
+    branches = "\n            UNION ALL\n".join(
+        f"""
+        SELECT shopping, data, total_likes, total_alcance, total_impressoes,
+               total_comentarios, total_compartilhamentos, total_salvos, total_posts
+        FROM {rollup}
+        WHERE {where_clause}"""
+        for rollup in rollups
+    )
+
+    return f"""
+    WITH all_data AS ({branches}
+    )
+    SELECT
+        shopping,
+        data,
+        total_likes,
+        total_alcance,
+        total_impressoes,
+        total_comentarios,
+        total_compartilhamentos,
+        total_salvos,
+        (total_likes + total_comentarios + total_compartilhamentos + total_salvos) as engajamento_total,
+        total_posts
+    FROM all_data
+    WHERE {shopping_condition("shopping", filtered)}
+    ORDER BY data DESC, shopping
+    """
+
+
+@lru_cache(maxsize=None)
+def _post_count_sql(rollups: Tuple[str, ...], filtered: bool) -> str:
+    where_clause = DATE_PARAM_RANGE.format(column="data")
+    branches = "\n            UNION ALL\n".join(
+        f"""
+        SELECT shopping, data, total_posts AS value
+        FROM {rollup}
+        WHERE {where_clause}"""
+        for rollup in rollups
+    )
+
+    return f"""
+    SELECT shopping, data, value
+    FROM ({branches}
+    ) AS combined_data
+    WHERE {shopping_condition("shopping", filtered)}
+    ORDER BY data DESC, shopping
+    """
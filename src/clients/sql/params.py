@@ -0,0 +1,102 @@
+"""
+Parâmetros compartilhados pelas queries (bind params :nome).
+O texto SQL fica fixo; só os valores dos parâmetros mudam entre chamadas.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Período padrão sem datas: do primeiro dia do ano anterior até hoje
+DATE_PARAM_RANGE = """{column} BETWEEN
+                COALESCE(CAST(:date_start AS date), DATE_TRUNC('year', CURRENT_DATE - INTERVAL '1 year'))
+                AND COALESCE(CAST(:date_end AS date), CURRENT_DATE)"""
+
+
+def as_date_param(value: Any) -> Optional[date]:
+    """
+    Normaliza uma data (str YYYY-MM-DD, date, datetime ou Timestamp) para datetime.date
+
+    O texto da query não muda com o formato de entrada: o driver recebe sempre um date.
+
+    Args:
+        value: Data em qualquer formato aceito ou None
+
+    Returns:
+        datetime.date ou None
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def select_shoppings(schemas: Dict[str, str], shopping_filter: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Shoppings cujos schemas entram no UNION ALL da query
+
+    Com um shopping conhecido, só o ramo dele é gerado (a query toca um único schema).
+    Sem filtro, ou com um código desconhecido, gera todos os ramos; nesse caso o filtro
+    :shopping no fim da query devolve vazio, como antes.
+
+    Args:
+        schemas: Dicionário {shopping: schema}
+        shopping_filter: Filtro de shopping específico ou None para todos
+
+    Returns:
+        Tupla com os códigos dos shoppings
+    """
+    if shopping_filter and shopping_filter in schemas:
+        return (shopping_filter,)
+    return tuple(schemas)
+
+
+def date_params(date_start: Any = None, date_end: Any = None) -> Dict[str, Optional[date]]:
+    """
+    Parâmetros :date_start e :date_end de DATE_PARAM_RANGE
+
+    O período só é usado quando as duas datas são fornecidas; senão vale o período padrão.
+
+    Args:
+        date_start: Data inicial ou None
+        date_end: Data final ou None
+
+    Returns:
+        Dicionário {'date_start': date ou None, 'date_end': date ou None}
+    """
+    if not (date_start and date_end):
+        date_start = date_end = None
+    return {'date_start': as_date_param(date_start), 'date_end': as_date_param(date_end)}
+
+
+def shopping_condition(column: str, filtered: bool) -> str:
+    """
+    Condição de shopping da query
+
+    Com filtro compara com :shopping; sem filtro a query não tem o parâmetro. Um texto
+    por caso (em vez de ":shopping IS NULL OR ...") deixa o plano genérico do Postgres
+    usar a condição de shopping.
+
+    Args:
+        column: Coluna de shopping
+        filtered: Se a query filtra por um shopping
+
+    Returns:
+        Condição SQL (TRUE quando não há filtro)
+    """
+    return f"{column} = CAST(:shopping AS text)" if filtered else "TRUE"
+
+
+def shopping_params(shopping_filter: Optional[str] = None) -> Dict[str, str]:
+    """
+    Parâmetro :shopping de shopping_condition (vazio sem filtro)
+
+    Args:
+        shopping_filter: Filtro de shopping específico ou None para todos
+
+    Returns:
+        Dicionário {'shopping': código} ou {}
+    """
+    return {'shopping': shopping_filter} if shopping_filter else {}
@@ -0,0 +1,72 @@
+"""
+Queries SQL para as tabelas WBR (fluxo de pessoas, veículos e vendas).
+Usadas pelo SupabaseClient e pelo assistente de índices (scripts/check_database.py).
+"""
+
+from functools import lru_cache
+from typing import Optional, Tuple, Dict, Any
+
+from .params import as_date_param
+
+
+class WBRQueries:
+    """Gerencia queries SQL das tabelas WBR"""
+
+    def get_wbr_data_query(self, table_name: str, date_col: str = 'data',
+                           metric_col: str = 'value', shopping_col: Optional[str] = 'shopping',
+                           date_reference: Optional[str] = None,
+                           date_start: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Query das linhas diárias de uma tabela WBR.
+
+        Args:
+            table_name: Nome da tabela com schema (ex: "mapa-do-bosque.fluxo_de_pessoas")
+            date_col: Nome da coluna de data
+            metric_col: Nome da coluna de métrica
+            shopping_col: Nome da coluna de shopping (opcional)
+            date_reference: Data de referência (YYYY-MM-DD); default: data atual
+            date_start: Data inicial (YYYY-MM-DD); default: 1º de janeiro do ano anterior à referência
+
+        Returns:
+            Tupla (query SQL com parâmetros :date_start e :date_reference, parâmetros).
+            Colunas padronizadas: date, metric_value, shopping (se houver)
+        """
+        query = _wbr_data_sql(table_name, date_col, metric_col, shopping_col)
+        params = {
+            'date_start': as_date_param(date_start),
+            'date_reference': as_date_param(date_reference)
+        }
+        return query, params
+
+
+@lru_cache(maxsize=None)
+def _wbr_data_sql(table_name: str, date_col: str, metric_col: str,
+                  shopping_col: Optional[str]) -> str:
+    """Texto SQL fixo por tabela (só os parâmetros de data mudam entre chamadas)"""
+    # Monta query básica
+    select_cols = [f"{date_col} as date", f"{metric_col} as metric_value"]
+    if shopping_col:
+        select_cols.append(f"{shopping_col} as shopping")
+
+    # Se date_reference fornecida, usa ela; senão usa data atual
+    ref_date = "COALESCE(CAST(:date_reference AS date), CURRENT_DATE)"
+
+    # Busca dados do início do ano anterior até a data de referência
+    # Isso garante ter dados para comparação YoY
+    start_date = f"COALESCE(CAST(:date_start AS date), DATE_TRUNC('year', {ref_date} - INTERVAL '1 year'))"
+
+    date_filter = f"""
+    {date_col} BETWEEN
+        {start_date}
+        AND {ref_date}
+    """
+
+    query = f"""
+    SELECT {', '.join(select_cols)}
+    FROM "{table_name.replace('.', '"."')}"
+    WHERE {date_col} IS NOT NULL
+        AND {date_filter}
+    ORDER BY {date_col} DESC
+    """
+
+    return query
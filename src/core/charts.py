@@ -3,6 +3,7 @@ import plotly.graph_objects as go
 from decimal import Decimal
 
 from .processing import COLUNA_METRICA as _COLUNA_METRICA
+from .wbr_utility import as_float_array, yoy_array, nan_to_none
 
 
 def formatar_valor(valor, tipo='numero'):
@@ -28,26 +29,8 @@ def formatar_valor(valor, tipo='numero'):
 
 
 def criar_grafico_wbr(dados: dict, df: pd.DataFrame, data_ref: pd.Timestamp, titulo: str, unidade: str):
-    def _to_decimal(x):
-        """Convert to Decimal for calculations"""
-        try:
-            if pd.isna(x):
-                return None
-            return Decimal(str(x))
-        except Exception:
-            return None
-    
-    def _decimal_to_float(x):
-        """Convert Decimal to float for Plotly"""
-        if x is None:
-            return None
-        if isinstance(x, Decimal):
-            return float(x)
-        return float(x) if x is not None else None
-
     def _is_positive(x):
-        v = _to_decimal(x)
-        return v is not None and v > 0
+        return x is not None and not pd.isna(x) and x > 0
     metrica = _COLUNA_METRICA
 
     valores_cy_semanas = list(dados['semanas_cy'][metrica].values)
@@ -67,24 +50,17 @@ def criar_grafico_wbr(dados: dict, df: pd.DataFrame, data_ref: pd.Timestamp, tit
     meses_offset = semanas_count + 1
     x_meses = list(range(meses_offset, meses_offset + 12))
 
-    # Cálculo de YOY para semanas e meses
-    def _yoy(cy, py):
-        cyf = _to_decimal(cy)
-        pyf = _to_decimal(py)
-        if pyf is None or pyf == 0 or cyf is None:
-            return None
-        return ((cyf - pyf) / pyf) * 100
-    
-    yoy_semanas = [_yoy(cy, py) for cy, py in zip(valores_cy_semanas, valores_py_semanas)]
-    yoy_meses = [_yoy(cy, py) for cy, py in zip(valores_cy_meses, valores_py_meses)]
+    # Cálculo de YOY para semanas e meses (vetorizado em float64; arredondamento só na exibição)
+    yoy_semanas = nan_to_none(yoy_array(valores_cy_semanas, valores_py_semanas))
+    yoy_meses = nan_to_none(yoy_array(valores_cy_meses, valores_py_meses))
 
-    # Convert to Decimal for calculations, then to float for Plotly
-    valores_cy_semanas_clean = [_decimal_to_float(_to_decimal(v)) for v in valores_cy_semanas]
-    valores_py_semanas_clean = [_decimal_to_float(_to_decimal(v)) for v in valores_py_semanas]
-    valores_cy_meses_clean = [_decimal_to_float(_to_decimal(v)) for v in valores_cy_meses]
-    valores_py_meses_clean = [_decimal_to_float(_to_decimal(v)) for v in valores_py_meses]
-    yoy_semanas_clean = [_decimal_to_float(_to_decimal(v)) for v in yoy_semanas]
-    yoy_meses_clean = [_decimal_to_float(_to_decimal(v)) for v in yoy_meses]
+    # Valores em float para o Plotly (None onde não há dado)
+    valores_cy_semanas_clean = nan_to_none(as_float_array(valores_cy_semanas))
+    valores_py_semanas_clean = nan_to_none(as_float_array(valores_py_semanas))
+    valores_cy_meses_clean = nan_to_none(as_float_array(valores_cy_meses))
+    valores_py_meses_clean = nan_to_none(as_float_array(valores_py_meses))
+    yoy_semanas_clean = yoy_semanas
+    yoy_meses_clean = yoy_meses
 
     semanas_do_ano = dados['semanas_cy'].index.isocalendar().week.tolist()
     labels_semanas = [f'Wk {sem}' for sem in semanas_do_ano]
@@ -540,7 +516,7 @@ def criar_grafico_wbr(dados: dict, df: pd.DataFrame, data_ref: pd.Timestamp, tit
         color = 'black'
         if 'YOY' in header or 'WOW' in header:
             try:
-                val_num = Decimal(str(value).replace('%', '').replace('+', ''))
+                val_num = float(str(value).replace('%', '').replace('+', ''))
                 color = 'darkgreen' if val_num > 0 else 'darkred' if val_num < 0 else 'black'
             except Exception:
                 pass
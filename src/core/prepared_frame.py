@@ -0,0 +1,211 @@
+"""
+Contrato do "frame preparado" do pipeline WBR.
+
+Um frame preparado é montado uma única vez na carga (DataService) e repassado
+sem cópias defensivas nem novos pd.to_datetime para processar_dados_wbr,
+calcular_metricas_wbr, WBRCalculator/prepare_data_for_wbr, create_trailing_six_weeks
+e compute_trailing_weeks. Ele garante:
+
+- coluna de data em datetime64, sem datas nulas;
+- linhas em ordem crescente de data (ordenação estável);
+- índice DatetimeIndex com as mesmas datas da coluna (sem nome, para não
+  conflitar com a coluna em groupby/sort_values).
+
+O frame é somente leitura: quem precisar alterar colunas usa assign/copy e nunca
+atribuição in-place (df.loc[...] = ...). O frame preparado é dono dos seus arrays
+(copiados uma vez na preparação, nunca compartilhados com o DataFrame de entrada)
+e as colunas NumPy numéricas e de data são marcadas como não graváveis: uma escrita in-place nele
+levanta "assignment destination is read-only" em vez de alterar os dados
+compartilhados pelo cache. Sem Copy-on-Write (pandas 2) o mesmo vale para as
+fatias, que são views; com ele, escrever numa fatia só copia a fatia. Substituir
+uma coluna inteira (assign, df[col] = ...) continua permitido.
+
+consolidar_por_data monta, no mesmo contrato, a série com uma linha por data
+usada quando a visão é de todos os shoppings. FrameParticionado guarda as linhas
+de todos os shoppings num único frame ordenado por (shopping, data): cada shopping
+é uma fatia contígua desse frame, que continua um frame preparado.
+"""
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+
+def _somente_leitura(df: pd.DataFrame, index: pd.Index, copiar: bool = True) -> pd.DataFrame:
+    """
+    Remonta o DataFrame sobre cópias próprias das colunas, com as colunas NumPy não graváveis
+
+    A cópia é necessária: uma view dos arrays de entrada não é rastreada pelo
+    Copy-on-Write, e uma escrita posterior no DataFrame de entrada apareceria aqui.
+    Colunas de extensão (category, datas com fuso) e object (shopping sem tipos
+    compactos) são copiadas sem a marcação: no pandas 2 rotinas Cython como
+    memory_usage(deep=True) exigem um buffer gravável nas colunas object.
+
+    Args:
+        df: DataFrame de origem (não é alterado)
+        index: Índice do novo DataFrame
+        copiar: False quando df é um intermediário já copiado (ex: saída de take)
+            que ninguém mais referencia
+
+    Returns:
+        DataFrame com as mesmas colunas, uma por bloco
+    """
+    colunas = {}
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, np.dtype) and serie.dtype != object:
+            valores = serie.to_numpy(copy=copiar)
+            valores.flags.writeable = False
+            colunas[col] = valores
+        else:
+            colunas[col] = serie.array.copy() if copiar else serie.array
+    # copy=False: cada coluna fica no próprio bloco, sem consolidar (o que copiaria de novo)
+    return pd.DataFrame(colunas, index=index, copy=False)
+
+
+def frame_preparado(df: pd.DataFrame, coluna_data: str = 'date') -> bool:
+    """
+    Verifica se o DataFrame já segue o contrato de frame preparado
+
+    Args:
+        df: DataFrame a verificar
+        coluna_data: Nome da coluna de data
+
+    Returns:
+        True se o frame pode ser usado sem cópia/conversão/ordenação
+    """
+    if coluna_data not in df.columns or not isinstance(df.index, pd.DatetimeIndex):
+        return False
+    if df.index.name is not None or not is_datetime64_any_dtype(df[coluna_data]):
+        return False
+    if df.empty:
+        return True
+    # O índice monotônico não tem NaT; as pontas confirmam que ele espelha a coluna
+    datas = df[coluna_data]
+    return (
+        df.index.is_monotonic_increasing
+        and df.index[0] == datas.iloc[0]
+        and df.index[-1] == datas.iloc[-1]
+    )
+
+
+def preparar_frame(df: pd.DataFrame, coluna_data: str = 'date') -> pd.DataFrame:
+    """
+    Monta o frame preparado (ou devolve o próprio df se ele já for um)
+
+    O DataFrame de entrada nunca é alterado.
+
+    Args:
+        df: DataFrame com a coluna de data (ex: saída de fetch_wbr_data, ORDER BY data DESC)
+        coluna_data: Nome da coluna de data
+
+    Returns:
+        DataFrame em ordem crescente de data, indexado pelas datas
+    """
+    if frame_preparado(df, coluna_data):
+        return df
+
+    datas = df[coluna_data]
+    if not is_datetime64_any_dtype(datas):
+        datas = pd.to_datetime(datas)
+    df = df.assign(**{coluna_data: datas})
+
+    if datas.isna().any():
+        df = df[datas.notna().to_numpy()]
+        datas = df[coluna_data]
+
+    if not datas.is_monotonic_increasing:
+        if datas.is_monotonic_decreasing:
+            # Ordem da query (ORDER BY data DESC): inverter é mais barato que ordenar
+            df = df.iloc[::-1]
+        else:
+            df = df.sort_values(coluna_data, kind='stable')
+
+    return _somente_leitura(df, pd.DatetimeIndex(df[coluna_data].array))
+
+
+def consolidar_por_data(df: pd.DataFrame, coluna_data: str = 'date') -> pd.DataFrame:
+    """
+    Soma as colunas numéricas por data (ex: todos os shoppings numa série só)
+
+    Inteiros são somados em int64 e floats em float64 (nulos contam como 0, igual
+    ao .sum() do pandas), para que a soma de muitas linhas não perca precisão.
+
+    Args:
+        df: DataFrame com várias linhas por data (ex: uma por shopping)
+        coluna_data: Nome da coluna de data
+
+    Returns:
+        Frame preparado com uma linha por data e só as colunas numéricas
+    """
+    df = preparar_frame(df, coluna_data)
+    colunas = [col for col in df.select_dtypes(include='number').columns if col != coluna_data]
+
+    datas = df[coluna_data].to_numpy()
+    # Frame ordenado: cada data começa onde o valor muda
+    inicios = np.flatnonzero(np.r_[True, datas[1:] != datas[:-1]]) if len(datas) else np.array([], dtype=np.intp)
+
+    somas = {}
+    for col in colunas:
+        valores = df[col].to_numpy()
+        if valores.dtype.kind in 'iub':
+            valores = valores.astype(np.int64)
+        else:
+            valores = np.nan_to_num(df[col].to_numpy(dtype=np.float64, na_value=np.nan), nan=0.0)
+        somas[col] = np.add.reduceat(valores, inicios) if len(inicios) else valores[:0]
+
+    unicas = df[coluna_data].iloc[inicios]
+    consolidado = pd.DataFrame({coluna_data: unicas.to_numpy(), **somas}, index=pd.DatetimeIndex(unicas.array))
+    return _somente_leitura(consolidado, consolidado.index)
+
+
+class FrameParticionado:
+    """
+    Frame preparado reordenado por (coluna, data), com as posições de cada valor da coluna
+
+    As linhas de um valor (ex: um shopping) ficam contíguas: a partição é a fatia
+    iloc[i:j] do mesmo frame, sem cópia, e continua um frame preparado (datas
+    crescentes, índice DatetimeIndex, somente leitura). O frame inteiro não segue
+    o contrato (as datas recomeçam a cada valor). Linhas com a coluna nula ficam
+    fora das partições.
+    """
+
+    def __init__(self, df: pd.DataFrame, coluna: str = 'shopping', coluna_data: str = 'date'):
+        """
+        Args:
+            df: DataFrame com as colunas de partição e de data (preparado ou não)
+            coluna: Coluna de partição
+            coluna_data: Nome da coluna de data
+        """
+        self.coluna = coluna
+        self.posicoes: Dict[Any, Tuple[int, int]] = {}
+        if df.empty or coluna not in df.columns:
+            self.frame = preparar_frame(df, coluna_data) if not df.empty else df
+            return
+
+        df = preparar_frame(df, coluna_data)
+        codigos, valores = pd.factorize(df[coluna], sort=False)
+        # Ordenação estável por código: as datas continuam crescentes dentro de cada valor
+        ordem = np.argsort(codigos, kind='stable')
+        codigos = codigos[ordem]
+        ordenado = df.take(ordem)
+        self.frame = _somente_leitura(ordenado, pd.DatetimeIndex(ordenado[coluna_data].array), copiar=False)
+
+        posicoes = np.arange(len(valores))
+        inicios = np.searchsorted(codigos, posicoes, side='left')
+        fins = np.searchsorted(codigos, posicoes, side='right')
+        self.posicoes = {valor: (int(i), int(j)) for valor, i, j in zip(valores, inicios, fins)}
+
+    def fatia(self, valor: Any) -> pd.DataFrame:
+        """
+        Linhas de um valor da coluna, como view do frame
+
+        Args:
+            valor: Valor da coluna de partição (ex: código do shopping)
+
+        Returns:
+            Frame preparado (vazio se o valor não existe)
+        """
+        i, j = self.posicoes.get(valor, (0, 0))
+        return self.frame.iloc[i:j]
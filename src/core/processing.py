@@ -1,7 +1,10 @@
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-from typing import Optional, List, Dict, Any
+from pandas.api.types import is_datetime64_any_dtype
+from typing import Optional, List, Dict, Any, Sequence, Tuple, Union
+
+from .prepared_frame import preparar_frame
 
 # Mantemos funções simples existentes para compatibilidade com outros usos
 def process_data(df):
@@ -37,6 +40,122 @@ COLUNA_DATA = 'date'
 COLUNA_METRICA = 'metric_value'
 
 
+# ============================================
+# MOTOR DE BUCKETS (AGREGAÇÃO EM PASSADA ÚNICA)
+# ============================================
+
+def _extrair_serie(df_work: pd.DataFrame, coluna_metrica: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extrai datas e valores do DataFrame como arrays NumPy para o motor de buckets.
+
+    Args:
+        df_work: DataFrame indexado por data
+        coluna_metrica: Nome da coluna de métrica
+
+    Returns:
+        Tupla (datas datetime64[ns], valores float64) sem linhas de data nula
+    """
+    datas = np.asarray(df_work.index.values, dtype='datetime64[ns]')
+    valores = pd.to_numeric(df_work[coluna_metrica], errors='coerce').to_numpy(dtype='float64')
+
+    validas = ~np.isnat(datas)
+    # NaN soma como 0, igual ao .sum() do pandas
+    return datas[validas], np.nan_to_num(valores[validas], nan=0.0)
+
+
+def _somar_intervalos(
+    serie: Tuple[np.ndarray, np.ndarray],
+    inicios: List[pd.Timestamp],
+    fins: List[pd.Timestamp]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Soma a métrica em vários intervalos [inicio, fim] (inclusivos) de uma só vez.
+
+    Cada linha recebe o id do seu bucket com um searchsorted sobre os inícios
+    ordenados e a agregação é feita com um único np.bincount, em vez de uma
+    máscara booleana sobre o DataFrame inteiro para cada semana/mês.
+
+    Args:
+        serie: Tupla (datas, valores) retornada por _extrair_serie
+        inicios: Início de cada intervalo
+        fins: Fim de cada intervalo
+
+    Returns:
+        Tupla (somas, contagens de linhas) na mesma ordem dos intervalos
+    """
+    if isinstance(serie, SomasPorIntervalo):
+        return serie.somar(inicios, fins)
+
+    datas, valores = serie
+    n = len(inicios)
+    if n == 0:
+        return np.zeros(0), np.zeros(0, dtype=np.int64)
+
+    inicios_np = np.array([pd.Timestamp(t).to_datetime64() for t in inicios], dtype='datetime64[ns]')
+    fins_np = np.array([pd.Timestamp(t).to_datetime64() for t in fins], dtype='datetime64[ns]')
+
+    ordem = np.argsort(inicios_np, kind='stable')
+    inicios_ord = inicios_np[ordem]
+    fins_ord = fins_np[ordem]
+
+    if n > 1 and (inicios_ord[1:] <= fins_ord[:-1]).any():
+        # Intervalos sobrepostos (ajuste de 29/02 no ano anterior): soma cada um à parte
+        somas = np.empty(n)
+        contagens = np.empty(n, dtype=np.int64)
+        for i in range(n):
+            mask = (datas >= inicios_np[i]) & (datas <= fins_np[i])
+            somas[i] = valores[mask].sum()
+            contagens[i] = mask.sum()
+        return somas, contagens
+
+    pos = np.searchsorted(inicios_ord, datas, side='right') - 1
+    dentro = pos >= 0
+    dentro[dentro] = datas[dentro] <= fins_ord[pos[dentro]]
+    ids = ordem[pos[dentro]]
+
+    somas = np.bincount(ids, weights=valores[dentro], minlength=n)
+    contagens = np.bincount(ids, minlength=n)
+    return somas, contagens
+
+
+class SomasPorIntervalo:
+    """
+    Somas já agregadas por intervalo (ex.: calculadas no banco), no lugar da série bruta.
+
+    Sem somas informadas, apenas registra os intervalos pedidos pelo motor de buckets
+    (devolvendo zeros), o que permite planejar os buckets de uma data de referência
+    sem nenhum dado.
+
+    Args:
+        somas: dict {(inicio, fim): (soma, contagem)}; intervalos ausentes valem zero
+    """
+
+    def __init__(self, somas: Optional[Dict[Tuple[pd.Timestamp, pd.Timestamp], Tuple[float, int]]] = None):
+        self.somas = somas
+        self.intervalos: List[Tuple[pd.Timestamp, pd.Timestamp]] = []
+
+    def somar(self, inicios: List[pd.Timestamp], fins: List[pd.Timestamp]) -> Tuple[np.ndarray, np.ndarray]:
+        chaves = [(pd.Timestamp(ini), pd.Timestamp(fim)) for ini, fim in zip(inicios, fins)]
+        self.intervalos.extend(chaves)
+
+        somas = np.zeros(len(chaves))
+        contagens = np.zeros(len(chaves), dtype=np.int64)
+        if self.somas:
+            for i, chave in enumerate(chaves):
+                somas[i], contagens[i] = self.somas.get(chave, (0.0, 0))
+        return somas, contagens
+
+
+def _para_ano_anterior(inicio: pd.Timestamp, fim: pd.Timestamp, ano_anterior: int) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """Leva um intervalo para o ano anterior (29/02 vira 28/02)."""
+    try:
+        return inicio.replace(year=ano_anterior), fim.replace(year=ano_anterior)
+    except ValueError:
+        # Caso especial: 29 de fevereiro
+        return (pd.Timestamp(year=ano_anterior, month=inicio.month, day=min(inicio.day, 28)),
+                pd.Timestamp(year=ano_anterior, month=fim.month, day=min(fim.day, 28)))
+
+
 # ============================================
 # FUNÇÕES MODULARES PARA PROCESSAMENTO DE SEMANAS
 # ============================================
@@ -68,19 +187,21 @@ def calcular_semanas_travelling(
 
 
 def processar_semanas_travelling(
-    df_work: pd.DataFrame,
+    df_work: Optional[pd.DataFrame],
     data_referencia: pd.Timestamp,
     coluna_metrica: str,
-    num_semanas: int = 6
+    num_semanas: int = 6,
+    serie: Optional[Tuple[np.ndarray, np.ndarray]] = None
 ) -> tuple:
     """
     Processa semanas usando método Travelling Week.
 
     Args:
-        df_work: DataFrame indexado por data
+        df_work: DataFrame indexado por data (ignorado se serie for fornecida)
         data_referencia: Data de referência
         coluna_metrica: Nome da coluna de métrica
         num_semanas: Número de semanas
+        serie: Arrays (datas, valores) já extraídos de df_work (opcional)
 
     Returns:
         Tupla (semanas_cy, semanas_py, ano_atual, ano_anterior)
@@ -88,56 +209,40 @@ def processar_semanas_travelling(
     ano_atual = data_referencia.year
     ano_anterior = ano_atual - 1
 
-    semanas_cy_list = []
-    semanas_py_list = []
-
-    # Calcula cada semana retroativamente
-    for i in range(num_semanas):
-        # Week ending para esta semana
-        week_ending = data_referencia - timedelta(days=7 * i)
-        week_starting = week_ending - timedelta(days=6)
-
-        # CY - Ano Atual
-        mask_cy = (df_work.index >= week_starting) & (df_work.index <= week_ending)
-        valor_cy = df_work.loc[mask_cy, coluna_metrica].sum() if mask_cy.any() else 0
-        semanas_cy_list.append(pd.Series({coluna_metrica: valor_cy}, name=week_ending))
+    if serie is None:
+        serie = _extrair_serie(df_work, coluna_metrica)
 
-        # PY - Ano Anterior
-        try:
-            week_ending_py = week_ending.replace(year=ano_anterior)
-            week_starting_py = week_starting.replace(year=ano_anterior)
-        except ValueError:
-            # Caso especial: 29 de fevereiro
-            week_ending_py = pd.Timestamp(year=ano_anterior, month=week_ending.month, day=28)
-            week_starting_py = pd.Timestamp(year=ano_anterior, month=week_starting.month,
-                                           day=min(week_starting.day, 28))
+    # Limites de cada semana (ordem: mais antiga → mais recente)
+    fins_cy = [data_referencia - timedelta(days=7 * i) for i in reversed(range(num_semanas))]
+    inicios_cy = [fim - timedelta(days=6) for fim in fins_cy]
 
-        mask_py = (df_work.index >= week_starting_py) & (df_work.index <= week_ending_py)
-        valor_py = df_work.loc[mask_py, coluna_metrica].sum() if mask_py.any() else 0
-        semanas_py_list.append(pd.Series({coluna_metrica: valor_py}, name=week_ending_py))
+    limites_py = [_para_ano_anterior(ini, fim, ano_anterior) for ini, fim in zip(inicios_cy, fins_cy)]
+    inicios_py = [ini for ini, _ in limites_py]
+    fins_py = [fim for _, fim in limites_py]
 
-    # Criar DataFrames (ordem: mais antiga → mais recente)
-    semanas_cy = pd.DataFrame(semanas_cy_list[::-1])
-    semanas_cy.index = pd.DatetimeIndex([s.name for s in semanas_cy_list[::-1]])
+    # CY e PY agregados numa única passada
+    somas, _ = _somar_intervalos(serie, inicios_cy + inicios_py, fins_cy + fins_py)
 
-    semanas_py = pd.DataFrame(semanas_py_list[::-1])
-    semanas_py.index = pd.DatetimeIndex([s.name for s in semanas_py_list[::-1]])
+    semanas_cy = pd.DataFrame({coluna_metrica: somas[:num_semanas]}, index=pd.DatetimeIndex(fins_cy))
+    semanas_py = pd.DataFrame({coluna_metrica: somas[num_semanas:]}, index=pd.DatetimeIndex(fins_py))
 
     return semanas_cy, semanas_py, ano_atual, ano_anterior
 
 
 def processar_semanas_iso(
-    df_work: pd.DataFrame,
+    df_work: Optional[pd.DataFrame],
     data_referencia: pd.Timestamp,
-    coluna_metrica: str
+    coluna_metrica: str,
+    serie: Optional[Tuple[np.ndarray, np.ndarray]] = None
 ) -> tuple:
     """
     Processa semanas usando método ISO Week (Dom-Sáb).
 
     Args:
-        df_work: DataFrame indexado por data
+        df_work: DataFrame indexado por data (ignorado se serie for fornecida)
         data_referencia: Data de referência
         coluna_metrica: Nome da coluna de métrica
+        serie: Arrays (datas, valores) já extraídos de df_work (opcional)
 
     Returns:
         Tupla (semanas_cy, semanas_py, semana_parcial, dados_adicionais)
@@ -145,6 +250,9 @@ def processar_semanas_iso(
     ano_atual = data_referencia.year
     ano_anterior = ano_atual - 1
 
+    if serie is None:
+        serie = _extrair_serie(df_work, coluna_metrica)
+
     # Verifica se estamos no meio de uma semana (semana parcial)
     fim_semana_completa = pd.Timestamp(data_referencia).to_period('W-SUN').end_time
     semana_parcial = data_referencia < fim_semana_completa
@@ -158,20 +266,19 @@ def processar_semanas_iso(
         dias_semana_parcial = 7
         inicio_semana_atual = fim_semana - timedelta(days=6)
 
-    # Semanas CY
+    # Semanas CY: buckets Dom-Sáb rotulados pelo domingo (equivalente ao resample 'W-SUN')
+    # dentro da janela (inicio_6sem, fim_semana]
     inicio_6sem = fim_semana - timedelta(weeks=6)
-    df_6sem_cy = df_work[(df_work.index > inicio_6sem) & (df_work.index <= fim_semana)]
-    semanas_cy = df_6sem_cy.resample('W-SUN').agg({coluna_metrica: 'sum'}).tail(6)
-
-    # Calcula data equivalente no ano anterior
-    try:
-        data_ref_py = data_referencia.replace(year=ano_anterior)
-    except ValueError:
-        data_ref_py = pd.Timestamp(year=ano_anterior, month=data_referencia.month, day=28)
-
-    # Processa semanas PY manualmente para garantir alinhamento
-    semanas_py_list = []
-
+    inicio_janela = inicio_6sem + pd.Timedelta(1, 'ns')
+    primeiro_domingo = pd.Timestamp(inicio_janela).to_period('W-SUN').end_time.normalize()
+    ultimo_domingo = pd.Timestamp(fim_semana).to_period('W-SUN').end_time.normalize()
+    domingos_cy = list(pd.date_range(primeiro_domingo, ultimo_domingo, freq='7D'))
+    inicios_cy = [max(dom - timedelta(days=6), inicio_janela) for dom in domingos_cy]
+    fins_cy = [min(dom + timedelta(days=1) - pd.Timedelta(1, 'ns'), fim_semana) for dom in domingos_cy]
+
+    # Semanas PY: mesmas datas do calendário no ano anterior
+    inicios_py = []
+    fins_py = []
     for i in range(6):
         semanas_atras = 5 - i
 
@@ -182,21 +289,26 @@ def processar_semanas_iso(
             fim_sem_cy = fim_semana - timedelta(weeks=semanas_atras)
             inicio_sem_cy = fim_sem_cy - timedelta(days=6)
 
-        try:
-            inicio_sem_py = inicio_sem_cy.replace(year=ano_anterior)
-            fim_sem_py = fim_sem_cy.replace(year=ano_anterior)
-        except ValueError:
-            inicio_sem_py = pd.Timestamp(year=ano_anterior, month=inicio_sem_cy.month,
-                                       day=min(inicio_sem_cy.day, 28))
-            fim_sem_py = pd.Timestamp(year=ano_anterior, month=fim_sem_cy.month,
-                                     day=min(fim_sem_cy.day, 28))
-
-        df_semana_py = df_work[(df_work.index >= inicio_sem_py) & (df_work.index <= fim_sem_py)]
-        valor_semana = df_semana_py[coluna_metrica].sum() if not df_semana_py.empty else 0
-        semanas_py_list.append(pd.Series({coluna_metrica: valor_semana}, name=fim_sem_py))
+        inicio_sem_py, fim_sem_py = _para_ano_anterior(inicio_sem_cy, fim_sem_cy, ano_anterior)
+        inicios_py.append(inicio_sem_py)
+        fins_py.append(fim_sem_py)
+
+    # CY e PY agregados numa única passada
+    n_cy = len(domingos_cy)
+    somas, contagens = _somar_intervalos(serie, inicios_cy + inicios_py, fins_cy + fins_py)
+
+    # Como no resample, só existem os buckets entre o primeiro e o último com dados
+    com_dados = np.flatnonzero(contagens[:n_cy])
+    if len(com_dados) > 0:
+        faixa = slice(com_dados[0], com_dados[-1] + 1)
+        semanas_cy = pd.DataFrame(
+            {coluna_metrica: somas[:n_cy][faixa]},
+            index=pd.DatetimeIndex(domingos_cy[faixa])
+        ).tail(6)
+    else:
+        semanas_cy = pd.DataFrame({coluna_metrica: []}, index=pd.DatetimeIndex([]))
 
-    semanas_py = pd.DataFrame(semanas_py_list)
-    semanas_py.index = pd.DatetimeIndex([s.name for s in semanas_py_list])
+    semanas_py = pd.DataFrame({coluna_metrica: somas[n_cy:]}, index=pd.DatetimeIndex(fins_py))
 
     dados_adicionais = {
         'inicio_semana_atual': inicio_semana_atual if semana_parcial else None,
@@ -207,73 +319,60 @@ def processar_semanas_iso(
 
 
 def processar_meses_completo(
-    df_work: pd.DataFrame,
+    df_work: Optional[pd.DataFrame],
     data_referencia: pd.Timestamp,
-    coluna_metrica: str
+    coluna_metrica: str,
+    serie: Optional[Tuple[np.ndarray, np.ndarray]] = None
 ) -> tuple:
     """
     Processa dados mensais para ambos os anos.
 
     Args:
-        df_work: DataFrame indexado por data
+        df_work: DataFrame indexado por data (ignorado se serie for fornecida)
         data_referencia: Data de referência
         coluna_metrica: Nome da coluna de métrica
+        serie: Arrays (datas, valores) já extraídos de df_work (opcional)
 
     Returns:
         Tupla (meses_cy, meses_py, mes_parcial_cy, mes_parcial_py)
     """
     ano_atual = data_referencia.year
     ano_anterior = ano_atual - 1
+    mes_ref = data_referencia.month
 
-    # CY - Meses do ano atual
-    inicio_ano_cy = pd.Timestamp(year=ano_atual, month=1, day=1)
-    fim_ano_cy = data_referencia
-
-    df_ano_cy = df_work[(df_work.index >= inicio_ano_cy) & (df_work.index <= fim_ano_cy)]
-    df_12m_cy = df_ano_cy.resample('MS').agg({coluna_metrica: 'sum'})
+    if serie is None:
+        serie = _extrair_serie(df_work, coluna_metrica)
 
-    # Reindexa para 12 meses
+    # CY - Jan até o mês de referência, cortado na data de referência
     idx_cy = pd.date_range(start=pd.Timestamp(year=ano_atual, month=1, day=1), periods=12, freq='MS')
-    df_12m_cy = df_12m_cy.reindex(idx_cy)
-
-    # Zera meses passados sem dados, mantém NaN para meses futuros
-    mes_ref = data_referencia.month
-    futuros_mask = df_12m_cy.index.month > mes_ref
-    df_12m_cy.loc[~futuros_mask, coluna_metrica] = df_12m_cy.loc[~futuros_mask, coluna_metrica].fillna(0)
+    inicios_cy = list(idx_cy[:mes_ref])
+    fins_cy = [
+        min(inicio + pd.offsets.MonthBegin(1) - pd.Timedelta(1, 'ns'), data_referencia)
+        for inicio in inicios_cy
+    ]
+
+    # PY - Comparação "Maçã com Maçã": mês de referência só até o mesmo dia
+    idx_py = pd.date_range(start=pd.Timestamp(year=ano_anterior, month=1, day=1), periods=12, freq='MS')
+    inicios_py = list(idx_py[:mes_ref])
+    fins_py = [inicio + pd.offsets.MonthEnd(0) for inicio in inicios_py[:-1]]
+    fins_py.append(_para_ano_anterior(data_referencia, data_referencia, ano_anterior)[1])
+
+    # CY e PY agregados numa única passada
+    somas, _ = _somar_intervalos(serie, inicios_cy + inicios_py, fins_cy + fins_py)
+
+    # Mantém NaN para meses futuros (após o mês da data de referência)
+    valores_cy = np.full(12, np.nan)
+    valores_cy[:mes_ref] = somas[:mes_ref]
+    valores_py = np.full(12, np.nan)
+    valores_py[:mes_ref] = somas[mes_ref:]
+
+    df_12m_cy = pd.DataFrame({coluna_metrica: valores_cy}, index=idx_cy)
+    df_12m_py = pd.DataFrame({coluna_metrica: valores_py}, index=idx_py)
 
     # Detectar mês parcial CY
     fim_mes_ref = (data_referencia.replace(day=1) + pd.offsets.MonthEnd(1))
     mes_parcial_cy = data_referencia < fim_mes_ref
 
-    # PY - Meses do ano anterior
-    inicio_ano_py = pd.Timestamp(year=ano_anterior, month=1, day=1)
-    try:
-        fim_ano_py = pd.Timestamp(year=ano_anterior, month=data_referencia.month, day=data_referencia.day)
-    except ValueError:
-        fim_ano_py = pd.Timestamp(year=ano_anterior, month=data_referencia.month, day=28)
-
-    df_ano_py = df_work[(df_work.index >= inicio_ano_py) & (df_work.index <= fim_ano_py)]
-
-    # Processa mês a mês para PY
-    meses_py_list = []
-    for mes in range(1, 13):
-        inicio_mes_py = pd.Timestamp(year=ano_anterior, month=mes, day=1)
-
-        if mes == data_referencia.month:
-            fim_mes_py = pd.Timestamp(year=ano_anterior, month=mes, day=data_referencia.day)
-        elif mes < data_referencia.month:
-            fim_mes_py = inicio_mes_py + pd.offsets.MonthEnd(0)
-        else:
-            meses_py_list.append(pd.Series({coluna_metrica: np.nan}, name=inicio_mes_py))
-            continue
-
-        dados_mes = df_ano_py[(df_ano_py.index >= inicio_mes_py) & (df_ano_py.index <= fim_mes_py)]
-        soma_mes = dados_mes[coluna_metrica].sum() if not dados_mes.empty else 0
-        meses_py_list.append(pd.Series({coluna_metrica: soma_mes}, name=inicio_mes_py))
-
-    df_12m_py = pd.DataFrame(meses_py_list)
-    df_12m_py.index = pd.DatetimeIndex([s.name for s in meses_py_list])
-
     mes_parcial_py = mes_parcial_cy
 
     return df_12m_cy, df_12m_py, mes_parcial_cy, mes_parcial_py
@@ -292,40 +391,56 @@ def processar_dados_wbr(df: pd.DataFrame, data_referencia: pd.Timestamp | None =
     Returns:
         dict com séries semanais/mensais de CY e PY, flags de mês parcial e anos usados.
     """
-    # Preparação inicial comum para ambos os métodos
-    df_work = df.copy()
-    df_work[coluna_data] = pd.to_datetime(df_work[coluna_data])
+    # Frame preparado (ver prepared_frame): já vem indexado por data, sem cópia
+    df_work = preparar_frame(df, coluna_data)
 
     if data_referencia is None:
         data_referencia = df_work[coluna_data].max()
     else:
         data_referencia = pd.to_datetime(data_referencia)
 
-    # Set the date column as index
-    df_work = df_work.set_index(coluna_data)
+    # Extrai datas/valores uma única vez para semanas e meses
+    serie = _extrair_serie(df_work, coluna_metrica)
 
-    # Ensure index is DatetimeIndex
-    if not isinstance(df_work.index, pd.DatetimeIndex):
-        df_work.index = pd.to_datetime(df_work.index)
+    return _processar_serie(serie, data_referencia, coluna_metrica, metodo_semana)
+
+
+def _processar_serie(
+    serie: Union[Tuple[np.ndarray, np.ndarray], 'SomasPorIntervalo'],
+    data_referencia: pd.Timestamp,
+    coluna_metrica: str,
+    metodo_semana: str
+) -> Dict[str, Any]:
+    """
+    Monta o dicionário WBR (semanas + meses, CY e PY) a partir de uma série já extraída.
+
+    Args:
+        serie: Arrays (datas, valores) retornados por _extrair_serie ou SomasPorIntervalo
+        data_referencia: Data de referência
+        coluna_metrica: Nome da coluna de métrica
+        metodo_semana: 'iso' ou 'travelling'
 
+    Returns:
+        dict no mesmo formato de processar_dados_wbr
+    """
     # Processar semanas baseado no método escolhido
     if metodo_semana == 'travelling':
         # Usar Travelling Week (semanas móveis de 7 dias)
         semanas_cy, semanas_py, ano_atual, ano_anterior = processar_semanas_travelling(
-            df_work, data_referencia, coluna_metrica
+            None, data_referencia, coluna_metrica, serie=serie
         )
         semana_parcial = False  # Travelling week sempre tem 7 dias completos
     else:
         # Usar ISO Week (Dom-Sáb)
         semanas_cy, semanas_py, semana_parcial, dados_adicionais = processar_semanas_iso(
-            df_work, data_referencia, coluna_metrica
+            None, data_referencia, coluna_metrica, serie=serie
         )
         ano_atual = data_referencia.year
         ano_anterior = ano_atual - 1
 
     # Processar meses (comum para ambos os métodos)
     df_12m_cy, df_12m_py, mes_parcial_cy, mes_parcial_py = processar_meses_completo(
-        df_work, data_referencia, coluna_metrica
+        None, data_referencia, coluna_metrica, serie=serie
     )
 
     # Retornar dicionário com todos os dados processados
@@ -342,215 +457,113 @@ def processar_dados_wbr(df: pd.DataFrame, data_referencia: pd.Timestamp | None =
     }
 
 
-# ============================================
-# MANTÉM IMPLEMENTAÇÃO ANTIGA ABAIXO PARA REFERÊNCIA
-# (Será removida após validação completa)
-# ============================================
-
-def processar_dados_wbr_OLD(df: pd.DataFrame, data_referencia: pd.Timestamp | None = None, coluna_data: str = 'date', coluna_metrica: str = 'metric_value'):
+def processar_dados_wbr_multi(
+    df: pd.DataFrame,
+    data_referencia: pd.Timestamp | None = None,
+    keys: Sequence[str] = ('table', 'shopping'),
+    coluna_data: str = 'date',
+    coluna_metrica: str = 'metric_value',
+    metodo_semana: str = 'iso'
+) -> Dict[tuple, Dict[str, Any]]:
     """
-    VERSÃO ANTIGA - Será removida após validação.
-    Mantida temporariamente para referência.
+    Processa várias séries WBR (ex.: tabela × shopping) de um DataFrame em formato longo.
+
+    As datas são convertidas uma única vez, as linhas são agrupadas pelas chaves
+    com uma só ordenação e cada grupo é agregado sobre uma fatia contígua dos
+    mesmos arrays, sem copiar nem reindexar o DataFrame por série.
+
+    Args:
+        df: DataFrame longo com colunas de data, métrica e chaves
+        data_referencia: Data final para análise (default: última data do DataFrame inteiro)
+        keys: Colunas que identificam cada série (default: ('table', 'shopping'))
+        coluna_data: Nome da coluna de data (default: 'date')
+        coluna_metrica: Nome da coluna de métrica (default: 'metric_value')
+        metodo_semana: 'iso' para ISO Week (Dom-Sáb) ou 'travelling' para Travelling Week
+    Returns:
+        dict {tupla de valores das chaves: dict no formato de processar_dados_wbr}
     """
-    df_work = df.copy()
-    df_work[coluna_data] = pd.to_datetime(df_work[coluna_data])
+    keys = list(keys)
+    faltantes = [col for col in [coluna_data, coluna_metrica] + keys if col not in df.columns]
+    if faltantes:
+        raise ValueError(f"DataFrame não contém as colunas: {faltantes}. Colunas disponíveis: {df.columns.tolist()}")
+
+    if df.empty:
+        return {}
+
+    datas = pd.to_datetime(df[coluna_data])
 
     if data_referencia is None:
-        data_referencia = df_work[coluna_data].max()
+        data_referencia = datas.max()
     else:
         data_referencia = pd.to_datetime(data_referencia)
 
-    df_work = df_work.set_index(coluna_data)
-    if not isinstance(df_work.index, pd.DatetimeIndex):
-        df_work.index = pd.to_datetime(df_work.index)
+    # Um id inteiro por combinação de chaves (ordenadas) e uma única ordenação por grupo
+    agrupado = df.groupby(keys, sort=True, observed=True, dropna=False)
+    grupos = agrupado.ngroup().to_numpy()
+    chaves = list(agrupado.groups.keys())
 
-    ano_atual = data_referencia.year
-    inicio_ano_cy = pd.Timestamp(year=ano_atual, month=1, day=1)
-    fim_ano_cy = data_referencia
+    ordem = np.argsort(grupos, kind='stable')
+    datas_np = np.asarray(datas.to_numpy(), dtype='datetime64[ns]')[ordem]
+    valores_np = pd.to_numeric(df[coluna_metrica], errors='coerce').to_numpy(dtype='float64')[ordem]
+    limites = np.searchsorted(grupos[ordem], np.arange(len(chaves) + 1))
 
-    # Semanas CY (alinhadas ao domingo)
-    # Verifica se estamos no meio de uma semana (semana parcial)
-    fim_semana_completa = pd.Timestamp(data_referencia).to_period('W-SUN').end_time
-    semana_parcial = data_referencia < fim_semana_completa
-    
-    # Se temos uma semana parcial, ajusta o fim para a data de referência
-    if semana_parcial:
-        fim_semana = data_referencia
-        # Calcula quantos dias temos na semana atual
-        inicio_semana_atual = pd.Timestamp(data_referencia).to_period('W-SUN').start_time
-        dias_semana_parcial = (data_referencia - inicio_semana_atual).days + 1
-    else:
-        fim_semana = fim_semana_completa
-        dias_semana_parcial = 7
-    
-    inicio_6sem = fim_semana - timedelta(weeks=6)
-    df_6sem_cy = df_work[(df_work.index > inicio_6sem) & (df_work.index <= fim_semana)]
-    semanas_cy = df_6sem_cy.resample('W-SUN').agg({coluna_metrica: 'sum'}).tail(6)
+    validas = ~np.isnat(datas_np)
+    valores_np = np.nan_to_num(valores_np, nan=0.0)
 
-    # Meses CY (Jan–Dez do ano de referência), mantendo meses sem dados
-    df_ano_cy = df_work[(df_work.index >= inicio_ano_cy) & (df_work.index <= fim_ano_cy)]
-    df_12m_cy = df_ano_cy.resample('MS').agg({coluna_metrica: 'sum'})
-    # Reindexa para 12 meses do ano (Jan–Dez)
-    idx_cy = pd.date_range(start=pd.Timestamp(year=ano_atual, month=1, day=1), periods=12, freq='MS')
-    df_12m_cy = df_12m_cy.reindex(idx_cy)
-    # Zera meses com ausencia total de dados no período (mantém NaN onde apropriado)
-    # Mantemos NaN para meses futuros (após o mês da data de referência)
-    mes_ref = data_referencia.month
-    futuros_mask = df_12m_cy.index.month > mes_ref
-    # Para meses posteriores ao mês de referência, mantemos NaN; para meses anteriores vazios, coloca 0
-    df_12m_cy.loc[~futuros_mask, coluna_metrica] = df_12m_cy.loc[~futuros_mask, coluna_metrica].fillna(0)
-
-    # Detectar mês parcial CY (com base no mês da data de referência e dados reais)
-    mes_parcial_cy = False
-    dias_mes_parcial_cy = 0
-    inicio_mes_ref = data_referencia.replace(day=1)
-    fim_mes_ref = (inicio_mes_ref + pd.offsets.MonthEnd(1))
-    dados_mes_ref = df_work[(df_work.index >= inicio_mes_ref) & (df_work.index <= data_referencia)]
-    if not dados_mes_ref.empty:
-        dias_mes_parcial_cy = len(dados_mes_ref.index.normalize().unique())
-        # Parcial se a data de referência não é o último dia do mês
-        mes_parcial_cy = data_referencia < fim_mes_ref
-
-    # PY - Comparação "Maçã com Maçã"
-    ano_anterior = data_referencia.year - 1
-    inicio_ano_py = pd.Timestamp(year=ano_anterior, month=1, day=1)
-    
-    # Para comparação justa, PY deve ter apenas até o mesmo dia/mês que CY
-    # Se CY está em 10/julho, PY deve mostrar apenas até 10/julho do ano anterior
-    try:
-        fim_ano_py = pd.Timestamp(year=ano_anterior, month=data_referencia.month, day=data_referencia.day)
-    except ValueError:
-        # Caso especial: 29 de fevereiro -> 28 de fevereiro no ano não-bissexto
-        fim_ano_py = pd.Timestamp(year=ano_anterior, month=data_referencia.month, day=28)
-
-    # Semanas PY - Comparação "Maçã com Maçã" 
-    # Usa as mesmas datas do calendário, apenas mudando o ano
-    # Isso garante comparação justa: 25-31 agosto 2025 vs 25-31 agosto 2024
-    
-    # Calcula a data equivalente no ano anterior (mesmo mês/dia)
-    try:
-        # Tenta criar a mesma data no ano anterior
-        data_ref_py = data_referencia.replace(year=ano_anterior)
-    except ValueError:
-        # Caso especial: 29 de fevereiro em ano bissexto -> 28 de fevereiro
-        data_ref_py = pd.Timestamp(year=ano_anterior, month=data_referencia.month, day=28)
-    
-    # Se CY tem semana parcial, PY também deve ter
-    if semana_parcial:
-        # Para PY, usa exatamente o mesmo período calendário
-        fim_semana_py = data_ref_py
-        # Calcula quantos dias atrás começou a semana em CY para aplicar o mesmo em PY
-        dias_desde_inicio_semana = (data_referencia - inicio_semana_atual).days
-        inicio_semana_py = data_ref_py - timedelta(days=dias_desde_inicio_semana)
-        # 6 semanas atrás mantendo o alinhamento
-        inicio_6sem_py = inicio_semana_py - timedelta(weeks=5)
-    else:
-        # Para semana completa, usa exatamente 7 dias terminando na mesma data
-        fim_semana_py = data_ref_py
-        # Retrocede exatamente 6 semanas (42 dias) a partir do fim
-        inicio_6sem_py = fim_semana_py - timedelta(days=41)  # 6 semanas = 42 dias, menos 1 pois é inclusive
-    
-    # Para PY, vamos processar manualmente cada semana para garantir alinhamento exato de datas
-    semanas_py_list = []
-    
-    # Processa cada uma das 6 semanas com as mesmas datas do calendário
-    for i in range(6):
-        # Calcula o período da semana i (0 = 6 semanas atrás, 5 = semana atual)
-        semanas_atras = 5 - i
-        
-        if i == 5 and semana_parcial:
-            # Última semana é parcial
-            inicio_sem_cy = inicio_semana_atual
-            fim_sem_cy = data_referencia
-        else:
-            # Semanas completas
-            fim_sem_cy = fim_semana - timedelta(weeks=semanas_atras)
-            inicio_sem_cy = fim_sem_cy - timedelta(days=6)
-        
-        # Usa exatamente as mesmas datas no ano anterior
-        try:
-            inicio_sem_py = inicio_sem_cy.replace(year=ano_anterior)
-            fim_sem_py = fim_sem_cy.replace(year=ano_anterior)
-        except ValueError:
-            # Caso especial para 29 de fevereiro
-            inicio_sem_py = pd.Timestamp(year=ano_anterior, month=inicio_sem_cy.month, 
-                                       day=min(inicio_sem_cy.day, 28))
-            fim_sem_py = pd.Timestamp(year=ano_anterior, month=fim_sem_cy.month,
-                                     day=min(fim_sem_cy.day, 28))
-        
-        # Filtra e soma os dados para essa semana
-        df_semana_py = df_work[(df_work.index >= inicio_sem_py) & (df_work.index <= fim_sem_py)]
-        valor_semana = df_semana_py[coluna_metrica].sum() if not df_semana_py.empty else 0
-        
-        # Adiciona à lista com o timestamp do último dia da semana
-        semanas_py_list.append(pd.Series({coluna_metrica: valor_semana}, name=fim_sem_py))
-    
-    # Cria o DataFrame das semanas PY
-    semanas_py = pd.DataFrame(semanas_py_list)
-    semanas_py.index = pd.DatetimeIndex([s.name for s in semanas_py_list])
-
-    # Meses PY - Comparação "Maçã com Maçã"
-    # Para cada mês, use apenas até o mesmo dia que CY
-    df_ano_py = df_work[(df_work.index >= inicio_ano_py) & (df_work.index <= fim_ano_py)]
-    
-    # Processa mês a mês para garantir comparação justa
-    meses_py_list = []
-    for mes in range(1, 13):
-        inicio_mes_py = pd.Timestamp(year=ano_anterior, month=mes, day=1)
-        
-        # Se é o mês da data de referência, limita ao mesmo dia
-        if mes == data_referencia.month:
-            fim_mes_py = pd.Timestamp(year=ano_anterior, month=mes, day=data_referencia.day)
-        # Se é um mês anterior ao mês de referência, usa o mês completo
-        elif mes < data_referencia.month:
-            fim_mes_py = inicio_mes_py + pd.offsets.MonthEnd(0)
-        # Se é um mês posterior, não tem dados (será NaN)
-        else:
-            meses_py_list.append(pd.Series({coluna_metrica: np.nan}, name=inicio_mes_py))
-            continue
-        
-        # Filtra dados do mês
-        dados_mes = df_ano_py[(df_ano_py.index >= inicio_mes_py) & (df_ano_py.index <= fim_mes_py)]
-        if not dados_mes.empty:
-            soma_mes = dados_mes[coluna_metrica].sum()
-        else:
-            soma_mes = 0
-        
-        meses_py_list.append(pd.Series({coluna_metrica: soma_mes}, name=inicio_mes_py))
-    
-    # Cria DataFrame com todos os meses
-    df_12m_py = pd.DataFrame(meses_py_list)
-    df_12m_py.index = pd.date_range(start=pd.Timestamp(year=ano_anterior, month=1, day=1), periods=12, freq='MS')
-
-    # Para PY, o mês parcial deve seguir a mesma lógica de CY para comparação justa
-    # Se CY tem mês parcial (não chegou ao fim do mês), PY também tem mês parcial para o mesmo mês
-    mes_parcial_py = mes_parcial_cy  # PY tem mês parcial se CY tem
-    dias_mes_parcial_py = 0
-    
-    # Calcula os dias no mês parcial PY (mesmo mês do ano anterior)
-    if mes_parcial_cy:
-        # Para o mês da data de referência no ano anterior
-        inicio_mes_ref_py = pd.Timestamp(year=ano_anterior, month=data_referencia.month, day=1)
-        # Limita ao mesmo dia que CY para comparação justa
-        fim_mes_ref_py = pd.Timestamp(year=ano_anterior, month=data_referencia.month, day=data_referencia.day)
-        dados_mes_ref_py = df_work[(df_work.index >= inicio_mes_ref_py) & (df_work.index <= fim_mes_ref_py)]
-        if not dados_mes_ref_py.empty:
-            dias_mes_parcial_py = len(dados_mes_ref_py.index.normalize().unique())
+    resultado = {}
+    for i, chave in enumerate(chaves):
+        fatia = slice(limites[i], limites[i + 1])
+        mask = validas[fatia]
+        serie = (datas_np[fatia][mask], valores_np[fatia][mask])
+        chave = chave if isinstance(chave, tuple) else (chave,)
+        resultado[chave] = _processar_serie(serie, data_referencia, coluna_metrica, metodo_semana)
 
-    return {
-        'semanas_cy': semanas_cy,
-        'meses_cy': df_12m_cy,
-        'semanas_py': semanas_py,
-        'meses_py': df_12m_py,
-        'mes_parcial_cy': mes_parcial_cy,
-        'dias_mes_parcial_cy': dias_mes_parcial_cy,
-        'mes_parcial_py': mes_parcial_py,
-        'dias_mes_parcial_py': dias_mes_parcial_py,
-        'semana_parcial': semana_parcial,
-        'dias_semana_parcial': dias_semana_parcial if semana_parcial else 7,
-        'ano_atual': ano_atual,
-        'ano_anterior': ano_anterior
-    }
+    return resultado
+
+
+def planejar_intervalos_wbr(
+    data_referencia: pd.Timestamp,
+    metodo_semana: str = 'iso'
+) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Lista os intervalos [inicio, fim] (semanas e meses, CY e PY) de uma data de referência.
+
+    Usado para empurrar a agregação para o banco: os mesmos limites usados pelo
+    processamento em pandas são enviados na query, garantindo o mesmo resultado.
+
+    Args:
+        data_referencia: Data de referência
+        metodo_semana: 'iso' ou 'travelling'
+
+    Returns:
+        Lista de tuplas (inicio, fim) sem repetições, na ordem em que são usadas
+    """
+    coletor = SomasPorIntervalo()
+    _processar_serie(coletor, pd.to_datetime(data_referencia), COLUNA_METRICA, metodo_semana)
+    return list(dict.fromkeys(coletor.intervalos))
+
+
+def processar_dados_wbr_agregados(
+    somas: Dict[Tuple[pd.Timestamp, pd.Timestamp], Tuple[float, int]],
+    data_referencia: pd.Timestamp,
+    coluna_metrica: str = 'metric_value',
+    metodo_semana: str = 'iso'
+) -> Dict[str, Any]:
+    """
+    Monta o dicionário WBR a partir de somas por intervalo já agregadas.
+
+    Args:
+        somas: dict {(inicio, fim): (soma, contagem de linhas)} com os intervalos de planejar_intervalos_wbr
+        data_referencia: Data de referência usada no planejamento
+        coluna_metrica: Nome da coluna de métrica (default: 'metric_value')
+        metodo_semana: 'iso' ou 'travelling'
+
+    Returns:
+        dict no mesmo formato de processar_dados_wbr
+    """
+    return _processar_serie(
+        SomasPorIntervalo(somas), pd.to_datetime(data_referencia), coluna_metrica, metodo_semana
+    )
 
 
 # ============================================
@@ -606,8 +619,8 @@ def compute_trailing_weeks(
     # Validate aggregation functions against DataFrame columns
     cfg.validate_aggf_columns(daily_df.columns.tolist())
 
-    # Work with a copy to avoid modifying original data
-    df_work = daily_df.copy()
+    # Sem cópia: rename/assign/sort devolvem objetos novos e daily_df nunca é alterado
+    df_work = daily_df
 
     # Auto-detect date column - normalize to 'Date' for consistency
     date_col = None
@@ -624,8 +637,9 @@ def compute_trailing_weeks(
         df_work = df_work.rename(columns={date_col: 'Date'})
         date_col = 'Date'
 
-    # Ensure date column is datetime
-    df_work['Date'] = pd.to_datetime(df_work['Date'])
+    # Ensure date column is datetime (frames preparados já chegam em datetime64)
+    if not is_datetime64_any_dtype(df_work['Date']):
+        df_work = df_work.assign(Date=pd.to_datetime(df_work['Date']))
 
     # Remove duplicates by aggregating (sum for numeric columns)
     if df_work['Date'].duplicated().any():
@@ -633,8 +647,9 @@ def compute_trailing_weeks(
         agg_dict = {col: 'sum' for col in numeric_cols}
         df_work = df_work.groupby('Date').agg(agg_dict).reset_index()
 
-    # Sort by date for consistency
-    df_work = df_work.sort_values('Date').reset_index(drop=True)
+    # Sort by date for consistency (frames preparados já estão ordenados)
+    if not df_work['Date'].is_monotonic_increasing:
+        df_work = df_work.sort_values('Date').reset_index(drop=True)
 
     # Calculate week boundaries using strict 7-day spans
     week_ending = pd.to_datetime(cfg.week_ending)
@@ -673,7 +688,7 @@ def compute_trailing_weeks(
         else:
             # Filter data for this week (inclusive of both start and end dates)
             mask = (df_work['Date'] >= week_start) & (df_work['Date'] <= week_end)
-            week_data = df_work.loc[mask].copy()
+            week_data = df_work.loc[mask]
 
         # Initialize week result with required metadata
         week_result = {
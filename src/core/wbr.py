@@ -3,9 +3,12 @@ import logging
 from typing import Dict, Any, Optional
 import datetime
 
+from .prepared_frame import preparar_frame
 from .processing import processar_dados_wbr
 from .wbr_charts_modular import criar_grafico_wbr_modular
 from .wbr_metrics import WBRCalculator
+from .wbr_utility import nan_to_none
+from src.utils.timing import timed
 
 logger = logging.getLogger(__name__)
 
@@ -13,44 +16,96 @@ TITULO_GRAFICO = 'INSIRA O TÍTULO'
 UNIDADE_METRICA = 'INSIRA A UNIDADE'
 
 
-def gerar_grafico_wbr(df: pd.DataFrame,
-                      coluna_data: str = 'date',
-                      coluna_pessoas: str = 'metric_value',
-                      titulo: str | None = None,
-                      unidade: str | None = None,
-                      data_referencia: str | pd.Timestamp | None = None,
-                      metodo_semana: str = 'iso'):
-    if titulo is None:
-        titulo = TITULO_GRAFICO
-    if unidade is None:
-        unidade = UNIDADE_METRICA
+def preparar_dados_wbr(df: pd.DataFrame,
+                       coluna_data: str = 'date',
+                       coluna_pessoas: str = 'metric_value',
+                       data_referencia: str | pd.Timestamp | None = None,
+                       metodo_semana: str = 'iso',
+                       dados_processados: Optional[Dict[str, Any]] = None):
+    """
+    Valida o DataFrame e calcula os blocos WBR usados no gráfico.
+
+    Args:
+        df: DataFrame com os dados diários (pode ser None se dados_processados e data_referencia vierem prontos)
+        coluna_data: Nome da coluna de data
+        coluna_pessoas: Nome da coluna de métrica
+        data_referencia: Data de referência (default: última data do DataFrame)
+        metodo_semana: 'iso' ou 'travelling'
+        dados_processados: Blocos já calculados em lote (reaproveitados se fornecidos)
+
+    Returns:
+        Tupla (dados processados, data de referência)
+    """
+    # Blocos já calculados (lote ou pushdown no banco): o DataFrame nem é necessário
+    if dados_processados is not None and data_referencia is not None:
+        return dados_processados, pd.to_datetime(data_referencia)
 
     if coluna_data not in df.columns:
         raise ValueError(f"DataFrame não contém a coluna de data: {coluna_data}. Colunas disponíveis: {df.columns.tolist()}")
     if coluna_pessoas not in df.columns:
         raise ValueError(f"DataFrame não contém a coluna de pessoas: {coluna_pessoas}. Colunas disponíveis: {df.columns.tolist()}")
 
-    # Ensure date column is datetime (work with a copy)
-    df_original = df.copy()
-    df_original[coluna_data] = pd.to_datetime(df_original[coluna_data])
+    # Frame preparado na carga (DataService) passa direto; outros são preparados sem alterar df
+    df_original = preparar_frame(df, coluna_data)
 
     if data_referencia is None:
         data_referencia = df_original[coluna_data].max()
     else:
         data_referencia = pd.to_datetime(data_referencia)
 
-    # Pass column names to processar_dados_wbr
-    dados_processados = processar_dados_wbr(df_original, data_referencia, coluna_data=coluna_data, coluna_metrica=coluna_pessoas, metodo_semana=metodo_semana)
+    # Reaproveita blocos já calculados em lote (processar_dados_wbr_multi) quando fornecidos
+    if dados_processados is None:
+        with timed('processar_dados_wbr'):
+            dados_processados = processar_dados_wbr(df_original, data_referencia, coluna_data=coluna_data, coluna_metrica=coluna_pessoas, metodo_semana=metodo_semana)
 
-    # Use the new modular function
-    fig = criar_grafico_wbr_modular(
-        dados=dados_processados,
-        titulo=titulo,
-        unidade=unidade,
-        metrica='metric_value',  # The processed data uses 'metric_value' as the standard column
-        data_referencia=data_referencia
+    return dados_processados, data_referencia
+
+
+def montar_figura_wbr(dados_processados: Dict[str, Any],
+                      titulo: str,
+                      unidade: str,
+                      data_referencia: pd.Timestamp):
+    """
+    Monta a figura Plotly a partir dos blocos WBR já calculados.
+
+    Args:
+        dados_processados: Saída de preparar_dados_wbr / processar_dados_wbr
+        titulo: Título do gráfico
+        unidade: Unidade de medida
+        data_referencia: Data de referência
+
+    Returns:
+        Figura Plotly
+    """
+    with timed('figure_build'):
+        return criar_grafico_wbr_modular(
+            dados=dados_processados,
+            titulo=titulo,
+            unidade=unidade,
+            metrica='metric_value',  # The processed data uses 'metric_value' as the standard column
+            data_referencia=data_referencia
+        )
+
+
+def gerar_grafico_wbr(df: pd.DataFrame,
+                      coluna_data: str = 'date',
+                      coluna_pessoas: str = 'metric_value',
+                      titulo: str | None = None,
+                      unidade: str | None = None,
+                      data_referencia: str | pd.Timestamp | None = None,
+                      metodo_semana: str = 'iso',
+                      dados_processados: Optional[Dict[str, Any]] = None):
+    if titulo is None:
+        titulo = TITULO_GRAFICO
+    if unidade is None:
+        unidade = UNIDADE_METRICA
+
+    dados_processados, data_referencia = preparar_dados_wbr(
+        df, coluna_data, coluna_pessoas, data_referencia, metodo_semana, dados_processados
     )
-    return fig
+
+    # Use the new modular function
+    return montar_figura_wbr(dados_processados, titulo, unidade, data_referencia)
 
 
 def calcular_metricas_wbr(
@@ -74,9 +129,8 @@ def calcular_metricas_wbr(
         Dictionary with calculated metrics, comparisons, and summaries
     """
     try:
-        # Ensure date column is datetime
-        df_work = df.copy()
-        df_work[coluna_data] = pd.to_datetime(df_work[coluna_data])
+        # Ensure date column is datetime (sem cópia se df já for um frame preparado)
+        df_work = preparar_frame(df, coluna_data)
         
         # Use data_referencia or get latest date
         if data_referencia is None:
@@ -85,7 +139,7 @@ def calcular_metricas_wbr(
             data_referencia = pd.to_datetime(data_referencia)
         
         # Auto-detect numeric columns for aggregation
-        numeric_cols = df_work.select_dtypes(include=['int64', 'float64']).columns.tolist()
+        numeric_cols = df_work.select_dtypes(include='number').columns.tolist()
         if coluna_data in numeric_cols:
             numeric_cols.remove(coluna_data)
         
@@ -171,6 +225,17 @@ def calcular_metricas_wbr(
                     'yoy': {'current': None, 'previous': None, 'percent_change': None}
                 }
         
+        # WOW/YOY of every trailing week at once (float64 arrays; None where not computable)
+        weekly_comparisons = {}
+        for metric in numeric_cols:
+            try:
+                weekly_comparisons[metric] = {
+                    name: nan_to_none(values)
+                    for name, values in calc.compute_comparison_arrays(metric).items()
+                }
+            except Exception as e:
+                logger.warning(f"Failed to calculate weekly comparisons for {metric}: {e}")
+        
         # Get formatted results for Streamlit
         streamlit_data = calc.get_metrics_for_streamlit()
         
@@ -184,6 +249,7 @@ def calcular_metricas_wbr(
                 'current_year': calc.cy_trailing_six_weeks.to_dict('records'),
                 'previous_year': calc.py_trailing_six_weeks.to_dict('records')
             },
+            'weekly_comparisons': weekly_comparisons,
             'summary': calc.export_summary().to_dict('records'),
             'streamlit_data': streamlit_data,
             'metadata': {
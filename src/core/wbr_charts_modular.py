@@ -5,10 +5,13 @@ Separa a lógica de visualização semanal e mensal em funções distintas
 
 import pandas as pd
 import plotly.graph_objects as go
-from typing import Optional, Tuple, Dict, Any
+import plotly.io as pio
+from typing import Optional, Tuple, Dict, Any, List
 from decimal import Decimal
 import numpy as np
 
+from .wbr_utility import yoy_array, nan_to_none
+
 
 def formatar_valor(valor: float, tipo: str = 'numero') -> str:
     """
@@ -57,27 +60,54 @@ def calcular_yoy(valor_cy: float, valor_py: float) -> Optional[float]:
     return ((valor_cy - valor_py) / valor_py) * 100
 
 
-def criar_grafico_semanal_wbr(
-    dados: Dict[str, Any],
-    metrica: str = 'metric_value',
-    unidade: str = 'valor',
-    ano_atual: int = 2024,
-    ano_anterior: int = 2023
-) -> Tuple[go.Figure, Dict[str, Any]]:
+# Estilo comum dos eixos Y (semanal e mensal)
+_GRID_COLOR = 'rgba(240, 240, 240, 0.5)'
+
+MESES_ABREV = {
+    1: 'JAN', 2: 'FEV', 3: 'MAR', 4: 'ABR',
+    5: 'MAI', 6: 'JUN', 7: 'JUL', 8: 'AGO',
+    9: 'SET', 10: 'OUT', 11: 'NOV', 12: 'DEZ'
+}
+
+_TEMPLATE_CACHE: Dict[str, Dict[str, Any]] = {}
+
+
+def _template_dict(nome: str = 'plotly_white') -> Dict[str, Any]:
     """
-    Cria gráfico WBR para visualização semanal com comparação YoY.
+    Template Plotly já expandido em dicionário.
 
-    Args:
-        dados: Dicionário com dados processados contendo 'semanas_cy' e 'semanas_py'
-        metrica: Nome da coluna de métrica
-        unidade: Unidade de medida para labels
-        ano_atual: Ano atual para label
-        ano_anterior: Ano anterior para label
+    Sem validação o Plotly não resolve o nome do template, então a figura
+    direta precisa recebê-lo expandido (calculado uma vez por processo).
+    O dicionário é compartilhado: só deve ser passado a go.Figure, que o copia.
+    """
+    if nome not in _TEMPLATE_CACHE:
+        _TEMPLATE_CACHE[nome] = pio.templates[nome].to_plotly_json()
+    return _TEMPLATE_CACHE[nome]
+
+
+def _range_seguro(valores: List[Any]) -> List[float]:
+    """Range do eixo Y com folga de 15% abaixo e acima dos valores válidos"""
+    valores_validos = [v for v in valores if v is not None and not pd.isna(v)]
+    if valores_validos:
+        return [min(valores_validos) * 0.85, max(valores_validos) * 1.15]
+    return [0, 1]
+
+
+def _spec_semanal(
+    dados: Dict[str, Any],
+    metrica: str,
+    unidade: str,
+    ano_atual: int,
+    ano_anterior: int
+) -> Tuple[List[Dict], List[Dict], Dict[str, Any], Dict[str, Any]]:
+    """
+    Traces, anotações e eixos da visualização semanal como dicionários simples.
 
     Returns:
-        Tupla com (Figura Plotly, Dicionário de traces para combinação)
+        Tupla com (traces, anotações, {'xaxis', 'yaxis'}, KPIs semanais)
     """
-    fig = go.Figure()
+    traces = []
+    annotations = []
 
     # Extrair dados
     valores_cy = list(dados['semanas_cy'][metrica].values)
@@ -90,14 +120,15 @@ def criar_grafico_semanal_wbr(
     x_semanas = list(range(len(valores_cy)))
     labels_semanas = [data.strftime('%d/%m') for data in datas_semanas]
 
-    # Calcular YoY semanal
-    yoy_semanas = [calcular_yoy(cy, py) for cy, py in zip(valores_cy, valores_py)]
+    # Calcular YoY semanal (todas as semanas de uma vez, em float64)
+    yoy_semanas = nan_to_none(yoy_array(valores_cy, valores_py))
 
     # Detectar semana parcial
     semana_parcial = dados.get('semana_parcial', False)
 
     # Trace PY (Ano Anterior) - Semanas
-    fig.add_trace(go.Scatter(
+    traces.append(dict(
+        type='scatter',
         x=x_semanas,
         y=valores_py,
         name=f'{unidade.upper()} {ano_anterior} (Semanas)',
@@ -110,7 +141,8 @@ def criar_grafico_semanal_wbr(
 
     # Marcador para semana parcial se houver
     if semana_parcial and len(valores_py) > 0:
-        fig.add_trace(go.Scatter(
+        traces.append(dict(
+            type='scatter',
             x=x_semanas[-1:],
             y=valores_py[-1:],
             mode='markers',
@@ -121,7 +153,8 @@ def criar_grafico_semanal_wbr(
         ))
 
     # Trace CY (Ano Atual) - Semanas
-    fig.add_trace(go.Scatter(
+    traces.append(dict(
+        type='scatter',
         x=x_semanas,
         y=valores_cy,
         name=f'{unidade.upper()} {ano_atual} (Semanas)',
@@ -135,7 +168,8 @@ def criar_grafico_semanal_wbr(
 
     # Marcador especial para semana parcial se houver
     if semana_parcial and len(valores_cy) > 0:
-        fig.add_trace(go.Scatter(
+        traces.append(dict(
+            type='scatter',
             x=x_semanas[-1:],
             y=valores_cy[-1:],
             mode='markers',
@@ -154,7 +188,7 @@ def criar_grafico_semanal_wbr(
             yshift_valor = 15 if eh_ultima else 25
 
             # Valor absoluto
-            fig.add_annotation(
+            annotations.append(dict(
                 x=x_pos,
                 y=cy,
                 text=formatar_valor(cy, 'numero'),
@@ -162,13 +196,13 @@ def criar_grafico_semanal_wbr(
                 yshift=yshift_valor,
                 font=dict(size=18, color='black'),
                 yref='y'
-            )
+            ))
 
             # YoY
             if yoy is not None:
                 yshift_yoy = 30 if eh_ultima else 40
                 color = 'darkgreen' if yoy > 0 else 'darkred' if yoy < 0 else 'black'
-                fig.add_annotation(
+                annotations.append(dict(
                     x=x_pos,
                     y=cy,
                     text=formatar_valor(yoy, 'percentual'),
@@ -176,53 +210,27 @@ def criar_grafico_semanal_wbr(
                     yshift=yshift_yoy,
                     font=dict(size=16, color=color),
                     yref='y'
-                )
-
-    # Calcular range seguro para eixo Y
-    todos_valores = valores_cy + valores_py
-    valores_validos = [v for v in todos_valores if v is not None and not pd.isna(v)]
-    if valores_validos:
-        min_val = min(valores_validos)
-        max_val = max(valores_validos)
-        y_range = [min_val * 0.85, max_val * 1.15]
-    else:
-        y_range = [0, 1]
+                ))
 
-    # Configuração do layout
-    fig.update_layout(
-        xaxis=dict(
+    eixos = {
+        'xaxis': dict(
             ticktext=labels_semanas,
             tickvals=x_semanas,
-            gridcolor='rgba(240, 240, 240, 0.5)',
+            gridcolor=_GRID_COLOR,
             showgrid=True,
             zeroline=False,
             tickfont=dict(size=11)
         ),
-        yaxis=dict(
+        'yaxis': dict(
             title=dict(text=f'{unidade} Semanais', font=dict(size=16)),
             tickformat='.1s',
-            gridcolor='rgba(240, 240, 240, 0.5)',
+            gridcolor=_GRID_COLOR,
             showgrid=True,
             zeroline=False,
-            range=y_range,
+            range=_range_seguro(valores_cy + valores_py),
             tickfont=dict(size=14)
-        ),
-        hovermode='x unified',
-        template='plotly_white',
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.16,
-            xanchor="center",
-            x=0.5,
-            bordercolor="lightgray",
-            borderwidth=1,
-            font=dict(size=11)
-        ),
-        plot_bgcolor='white',
-        paper_bgcolor='white'
-    )
+        )
+    }
 
     # Retornar dados para KPIs
     kpis_semanas = {
@@ -232,196 +240,173 @@ def criar_grafico_semanal_wbr(
         'yoy_semanal': yoy_semanas[-1] if yoy_semanas else 0
     }
 
-    return fig, kpis_semanas
+    return traces, annotations, eixos, kpis_semanas
 
 
-def criar_grafico_mensal_wbr(
-    dados: Dict[str, Any],
-    metrica: str = 'metric_value',
-    unidade: str = 'valor',
-    ano_atual: int = 2024,
-    ano_anterior: int = 2023,
-    offset_x: int = 7
-) -> Tuple[go.Figure, Dict[str, Any]]:
+def _traces_mensais_ano(
+    valores: List[Any],
+    x_meses: List[int],
+    mes_parcial: bool,
+    nome: str,
+    estilo_linha: Dict[str, Any],
+    estilo_parcial: Dict[str, Any]
+) -> List[Dict]:
     """
-    Cria gráfico WBR para visualização mensal com comparação YoY.
+    Traces de um ano (CY ou PY) na visualização mensal: linha sólida até o último
+    mês completo e trecho tracejado até o mês parcial, quando houver.
 
     Args:
-        dados: Dicionário com dados processados contendo 'meses_cy' e 'meses_py'
-        metrica: Nome da coluna de métrica
-        unidade: Unidade de medida para labels
-        ano_atual: Ano atual para label
-        ano_anterior: Ano anterior para label
-        offset_x: Deslocamento no eixo X para separar de gráfico semanal
+        valores: 12 valores mensais (None para meses sem dados)
+        x_meses: Posições X dos meses
+        mes_parcial: Se o último mês com dados é parcial
+        nome: Nome da série na legenda
+        estilo_linha: Propriedades da linha sólida (line, mode, marker)
+        estilo_parcial: Propriedades do trecho parcial e do marcador de mês único
 
     Returns:
-        Tupla com (Figura Plotly, Dicionário de KPIs mensais)
+        Lista de traces (dicionários)
     """
-    fig = go.Figure()
-
-    # Extrair dados
-    valores_cy_meses = list(dados['meses_cy'][metrica].values)
-    valores_py_meses = list(dados['meses_py'][metrica].values)
-
-    # Garantir 12 meses
-    while len(valores_cy_meses) < 12:
-        valores_cy_meses.append(None)
-    while len(valores_py_meses) < 12:
-        valores_py_meses.append(None)
-
-    # Posições X e labels
-    x_meses = list(range(offset_x, offset_x + 12))
-    meses_map = {
-        1: 'JAN', 2: 'FEV', 3: 'MAR', 4: 'ABR',
-        5: 'MAI', 6: 'JUN', 7: 'JUL', 8: 'AGO',
-        9: 'SET', 10: 'OUT', 11: 'NOV', 12: 'DEZ'
-    }
-    labels_meses = [meses_map.get(i+1) for i in range(12)]
-
-    # Calcular YoY mensal
-    yoy_meses = [calcular_yoy(cy, py) for cy, py in zip(valores_cy_meses, valores_py_meses)]
-
-    # Detectar mês parcial
-    mes_parcial_cy = dados.get('mes_parcial_cy', False)
-    mes_parcial_py = dados.get('mes_parcial_py', False)
+    traces = []
 
     # Encontrar último mês com dados
-    ultimo_mes_cy = -1
-    for i in range(len(valores_cy_meses)):
-        if valores_cy_meses[i] is not None and not pd.isna(valores_cy_meses[i]):
-            ultimo_mes_cy = i
-
-    ultimo_mes_py = -1
-    for i in range(len(valores_py_meses)):
-        if valores_py_meses[i] is not None and not pd.isna(valores_py_meses[i]):
-            ultimo_mes_py = i
+    ultimo_mes = -1
+    for i in range(len(valores)):
+        if valores[i] is not None and not pd.isna(valores[i]):
+            ultimo_mes = i
 
-    # Trace PY (Ano Anterior) - Meses
     # Filtrar apenas valores não-nulos para desenhar a linha
-    indices_validos_py = [i for i, v in enumerate(valores_py_meses) if v is not None and not pd.isna(v)]
+    indices_validos = [i for i, v in enumerate(valores) if v is not None and not pd.isna(v)]
+
+    def _linha(x_validos, y_validos):
+        return dict(
+            type='scatter',
+            x=x_validos,
+            y=y_validos,
+            name=nome,
+            connectgaps=False,
+            hovertemplate='%{y:,.0f}<extra></extra>',
+            yaxis='y2',
+            **estilo_linha
+        )
 
-    if mes_parcial_py and ultimo_mes_py >= 0 and len(indices_validos_py) > 0:
+    if mes_parcial and ultimo_mes >= 0 and len(indices_validos) > 0:
         # Se há mês parcial, desenha linha até o mês anterior completo
-        if ultimo_mes_py > 0:
+        if ultimo_mes > 0:
             # Linha sólida até o penúltimo mês
-            x_validos = [x_meses[i] for i in indices_validos_py if i < ultimo_mes_py]
-            y_validos = [valores_py_meses[i] for i in indices_validos_py if i < ultimo_mes_py]
+            x_validos = [x_meses[i] for i in indices_validos if i < ultimo_mes]
+            y_validos = [valores[i] for i in indices_validos if i < ultimo_mes]
 
             if x_validos:
-                fig.add_trace(go.Scatter(
-                    x=x_validos,
-                    y=y_validos,
-                    name=f'{unidade.upper()} {ano_anterior} (Meses)',
-                    line=dict(color="#D685AB", width=1.5, shape='linear'),  # Mudado para linear
-                    mode='lines',
-                    connectgaps=False,
-                    hovertemplate='%{y:,.0f}<extra></extra>',
-                    yaxis='y2'
-                ))
+                traces.append(_linha(x_validos, y_validos))
 
             # Linha tracejada para o último mês (parcial)
-            fig.add_trace(go.Scatter(
-                x=[x_meses[ultimo_mes_py-1], x_meses[ultimo_mes_py]],
-                y=[valores_py_meses[ultimo_mes_py-1], valores_py_meses[ultimo_mes_py]],
-                line=dict(color="#D685AB", width=1.5, dash='dash'),
-                mode='lines',
+            traces.append(dict(
+                type='scatter',
+                x=[x_meses[ultimo_mes-1], x_meses[ultimo_mes]],
+                y=[valores[ultimo_mes-1], valores[ultimo_mes]],
                 hovertemplate='%{y:,.0f}<extra></extra>',
                 yaxis='y2',
-                showlegend=False
+                showlegend=False,
+                **estilo_parcial['trecho']
             ))
         else:
-            # Se só há um mês e é parcial, mostra apenas como tracejado
-            fig.add_trace(go.Scatter(
+            # Se só há um mês e é parcial, mostra apenas como marcador
+            traces.append(dict(
+                type='scatter',
                 x=[x_meses[0]],
-                y=[valores_py_meses[0]],
+                y=[valores[0]],
                 mode='markers',
-                marker=dict(color="#D685AB", size=6),
+                marker=estilo_parcial['marcador'],
                 hovertemplate='%{y:,.0f} (parcial)<extra></extra>',
                 yaxis='y2',
                 showlegend=False
             ))
     else:
         # Linha completa se não há mês parcial
-        # Filtrar apenas valores não-nulos para desenhar a linha
-        x_validos = [x_meses[i] for i in indices_validos_py]
-        y_validos = [valores_py_meses[i] for i in indices_validos_py]
+        x_validos = [x_meses[i] for i in indices_validos]
+        y_validos = [valores[i] for i in indices_validos]
 
         if x_validos:
-            fig.add_trace(go.Scatter(
-                x=x_validos,
-                y=y_validos,
-                name=f'{unidade.upper()} {ano_anterior} (Meses)',
-                line=dict(color="#D685AB", width=1.5, shape='linear'),  # Mudado para linear
-                mode='lines',
-                connectgaps=False,
-                hovertemplate='%{y:,.0f}<extra></extra>',
-                yaxis='y2'
-            ))
+            traces.append(_linha(x_validos, y_validos))
 
-    # Trace CY (Ano Atual) - Meses
-    # Filtrar apenas valores não-nulos para desenhar a linha
-    indices_validos_cy = [i for i, v in enumerate(valores_cy_meses) if v is not None and not pd.isna(v)]
+    return traces
 
-    if mes_parcial_cy and ultimo_mes_cy >= 0 and len(indices_validos_cy) > 0:
-        # Se há mês parcial, desenha linha até o mês anterior completo
-        if ultimo_mes_cy > 0:
-            # Linha sólida até o penúltimo mês
-            x_validos = [x_meses[i] for i in indices_validos_cy if i < ultimo_mes_cy]
-            y_validos = [valores_cy_meses[i] for i in indices_validos_cy if i < ultimo_mes_cy]
 
-            if x_validos:
-                fig.add_trace(go.Scatter(
-                    x=x_validos,
-                    y=y_validos,
-                    name=f'{unidade.upper()} {ano_atual} (Meses)',
-                    line=dict(color="#00008B", width=2.5, shape='spline', smoothing=1.0),
-                    mode='lines+markers',
-                    marker=dict(color='#00008B', size=8, symbol='diamond'),
-                    connectgaps=False,
-                    hovertemplate='%{y:,.0f}<extra></extra>',
-                    yaxis='y2'
-                ))
+def _spec_mensal(
+    dados: Dict[str, Any],
+    metrica: str,
+    unidade: str,
+    ano_atual: int,
+    ano_anterior: int,
+    offset_x: int
+) -> Tuple[List[Dict], List[Dict], Dict[str, Any], Dict[str, Any]]:
+    """
+    Traces, anotações e eixos da visualização mensal como dicionários simples.
 
-            # Linha tracejada para o último mês (parcial)
-            fig.add_trace(go.Scatter(
-                x=[x_meses[ultimo_mes_cy-1], x_meses[ultimo_mes_cy]],
-                y=[valores_cy_meses[ultimo_mes_cy-1], valores_cy_meses[ultimo_mes_cy]],
-                line=dict(color='#00008B', width=2.5, dash='dash'),
-                mode='lines+markers',
-                marker=dict(color='#00008B', size=8, symbol='diamond-open'),
-                hovertemplate='%{y:,.0f}<extra></extra>',
-                yaxis='y2',
-                showlegend=False
-            ))
-        else:
-            # Se só há um mês e é parcial, mostra apenas como marcador
-            fig.add_trace(go.Scatter(
-                x=[x_meses[0]],
-                y=[valores_cy_meses[0]],
-                mode='markers',
-                marker=dict(color='#00008B', size=8, symbol='diamond-open'),
-                hovertemplate='%{y:,.0f} (parcial)<extra></extra>',
-                yaxis='y2',
-                showlegend=False
-            ))
-    else:
-        # Linha completa se não há mês parcial (data de referência é o último dia do mês)
-        # Filtrar apenas valores não-nulos para desenhar a linha
-        x_validos = [x_meses[i] for i in indices_validos_cy]
-        y_validos = [valores_cy_meses[i] for i in indices_validos_cy]
+    Returns:
+        Tupla com (traces, anotações, {'xaxis', 'yaxis2'}, KPIs mensais)
+    """
+    annotations = []
 
-        if x_validos:
-            fig.add_trace(go.Scatter(
-                x=x_validos,
-                y=y_validos,
-                name=f'{unidade.upper()} {ano_atual} (Meses)',
-                line=dict(color="#00008B", width=2.5, shape='spline', smoothing=1.0),
+    # Extrair dados
+    valores_cy_meses = list(dados['meses_cy'][metrica].values)
+    valores_py_meses = list(dados['meses_py'][metrica].values)
+
+    # Garantir 12 meses
+    while len(valores_cy_meses) < 12:
+        valores_cy_meses.append(None)
+    while len(valores_py_meses) < 12:
+        valores_py_meses.append(None)
+
+    # Posições X e labels
+    x_meses = list(range(offset_x, offset_x + 12))
+    labels_meses = [MESES_ABREV.get(i+1) for i in range(12)]
+
+    # Calcular YoY mensal (todos os meses de uma vez, em float64)
+    yoy_meses = nan_to_none(yoy_array(valores_cy_meses, valores_py_meses))
+
+    # Detectar mês parcial
+    mes_parcial_cy = dados.get('mes_parcial_cy', False)
+    mes_parcial_py = dados.get('mes_parcial_py', False)
+
+    # Encontrar último mês com dados
+    ultimo_mes_cy = -1
+    for i in range(len(valores_cy_meses)):
+        if valores_cy_meses[i] is not None and not pd.isna(valores_cy_meses[i]):
+            ultimo_mes_cy = i
+
+    # Trace PY (Ano Anterior) - Meses
+    traces = _traces_mensais_ano(
+        valores_py_meses, x_meses, mes_parcial_py,
+        nome=f'{unidade.upper()} {ano_anterior} (Meses)',
+        estilo_linha=dict(
+            line=dict(color="#D685AB", width=1.5, shape='linear'),  # Mudado para linear
+            mode='lines'
+        ),
+        estilo_parcial={
+            'trecho': dict(line=dict(color="#D685AB", width=1.5, dash='dash'), mode='lines'),
+            'marcador': dict(color="#D685AB", size=6)
+        }
+    )
+
+    # Trace CY (Ano Atual) - Meses
+    traces += _traces_mensais_ano(
+        valores_cy_meses, x_meses, mes_parcial_cy,
+        nome=f'{unidade.upper()} {ano_atual} (Meses)',
+        estilo_linha=dict(
+            line=dict(color="#00008B", width=2.5, shape='spline', smoothing=1.0),
+            mode='lines+markers',
+            marker=dict(color='#00008B', size=8, symbol='diamond')
+        ),
+        estilo_parcial={
+            'trecho': dict(
+                line=dict(color='#00008B', width=2.5, dash='dash'),
                 mode='lines+markers',
-                marker=dict(color='#00008B', size=8, symbol='diamond'),
-                connectgaps=False,
-                hovertemplate='%{y:,.0f}<extra></extra>',
-                yaxis='y2'
-            ))
+                marker=dict(color='#00008B', size=8, symbol='diamond-open')
+            ),
+            'marcador': dict(color='#00008B', size=8, symbol='diamond-open')
+        }
+    )
 
     # Adicionar anotações mensais
     for i, (cy, py, yoy) in enumerate(zip(valores_cy_meses, valores_py_meses, yoy_meses)):
@@ -431,7 +416,7 @@ def criar_grafico_mensal_wbr(
             yshift_valor = 15 if eh_ultimo else 25
 
             # Valor absoluto
-            fig.add_annotation(
+            annotations.append(dict(
                 x=x_pos,
                 y=cy,
                 text=formatar_valor(cy, 'numero'),
@@ -439,13 +424,13 @@ def criar_grafico_mensal_wbr(
                 yshift=yshift_valor,
                 font=dict(size=18, color='gray' if eh_ultimo else 'black'),
                 yref='y2'
-            )
+            ))
 
             # YoY
             if yoy is not None:
                 yshift_yoy = 30 if eh_ultimo else 40
                 color = 'darkgreen' if yoy > 0 else 'darkred' if yoy < 0 else 'black'
-                fig.add_annotation(
+                annotations.append(dict(
                     x=x_pos,
                     y=cy,
                     text=formatar_valor(yoy, 'percentual'),
@@ -453,45 +438,29 @@ def criar_grafico_mensal_wbr(
                     yshift=yshift_yoy,
                     font=dict(size=16, color=color),
                     yref='y2'
-                )
-
-    # Calcular range para eixo Y2
-    todos_valores = valores_cy_meses + valores_py_meses
-    valores_validos = [v for v in todos_valores if v is not None and not pd.isna(v)]
-    if valores_validos:
-        min_val = min(valores_validos)
-        max_val = max(valores_validos)
-        y_range = [min_val * 0.85, max_val * 1.15]
-    else:
-        y_range = [0, 1]
+                ))
 
-    # Configuração do layout
-    fig.update_layout(
-        xaxis=dict(
+    eixos = {
+        'xaxis': dict(
             ticktext=labels_meses,
             tickvals=x_meses,
-            gridcolor='rgba(240, 240, 240, 0.5)',
+            gridcolor=_GRID_COLOR,
             showgrid=True,
             zeroline=False,
             tickfont=dict(size=11)
         ),
-        yaxis2=dict(
+        'yaxis2': dict(
             title=dict(text=f'{unidade} Mensais', font=dict(size=16)),
             tickformat='.1s',
-            gridcolor='rgba(240, 240, 240, 0.5)',
+            gridcolor=_GRID_COLOR,
             showgrid=True,
             zeroline=False,
             overlaying='y',
             side='right',
-            range=y_range,
+            range=_range_seguro(valores_cy_meses + valores_py_meses),
             tickfont=dict(size=14)
-        ),
-        hovermode='x unified',
-        template='plotly_white',
-        showlegend=True,
-        plot_bgcolor='white',
-        paper_bgcolor='white'
-    )
+        )
+    }
 
     # Calcular KPIs mensais
     mes_atual = ultimo_mes_cy + 1 if ultimo_mes_cy >= 0 else 0
@@ -527,66 +496,125 @@ def criar_grafico_mensal_wbr(
         'mes_atual': mes_atual
     }
 
+    return traces, annotations, eixos, kpis_meses
+
+
+def criar_grafico_semanal_wbr(
+    dados: Dict[str, Any],
+    metrica: str = 'metric_value',
+    unidade: str = 'valor',
+    ano_atual: int = 2024,
+    ano_anterior: int = 2023
+) -> Tuple[go.Figure, Dict[str, Any]]:
+    """
+    Cria gráfico WBR para visualização semanal com comparação YoY.
+
+    Args:
+        dados: Dicionário com dados processados contendo 'semanas_cy' e 'semanas_py'
+        metrica: Nome da coluna de métrica
+        unidade: Unidade de medida para labels
+        ano_atual: Ano atual para label
+        ano_anterior: Ano anterior para label
+
+    Returns:
+        Tupla com (Figura Plotly, Dicionário de traces para combinação)
+    """
+    traces, annotations, eixos, kpis_semanas = _spec_semanal(
+        dados, metrica, unidade, ano_atual, ano_anterior
+    )
+
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        annotations=annotations,
+        hovermode='x unified',
+        template='plotly_white',
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.16,
+            xanchor="center",
+            x=0.5,
+            bordercolor="lightgray",
+            borderwidth=1,
+            font=dict(size=11)
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        **eixos
+    )
+
+    return fig, kpis_semanas
+
+
+def criar_grafico_mensal_wbr(
+    dados: Dict[str, Any],
+    metrica: str = 'metric_value',
+    unidade: str = 'valor',
+    ano_atual: int = 2024,
+    ano_anterior: int = 2023,
+    offset_x: int = 7
+) -> Tuple[go.Figure, Dict[str, Any]]:
+    """
+    Cria gráfico WBR para visualização mensal com comparação YoY.
+
+    Args:
+        dados: Dicionário com dados processados contendo 'meses_cy' e 'meses_py'
+        metrica: Nome da coluna de métrica
+        unidade: Unidade de medida para labels
+        ano_atual: Ano atual para label
+        ano_anterior: Ano anterior para label
+        offset_x: Deslocamento no eixo X para separar de gráfico semanal
+
+    Returns:
+        Tupla com (Figura Plotly, Dicionário de KPIs mensais)
+    """
+    traces, annotations, eixos, kpis_meses = _spec_mensal(
+        dados, metrica, unidade, ano_atual, ano_anterior, offset_x
+    )
+
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        annotations=annotations,
+        hovermode='x unified',
+        template='plotly_white',
+        showlegend=True,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        **eixos
+    )
+
     return fig, kpis_meses
 
 
-def combinar_graficos_wbr(
-    fig_semanal: go.Figure,
-    fig_mensal: go.Figure,
+def _layout_combinado(
     titulo: str,
     data_referencia: pd.Timestamp,
+    labels_semanas: List[str],
+    labels_meses: Optional[List[str]],
+    yaxis: Any,
+    yaxis2: Any,
+    annotations: List[Dict],
     kpis_semanas: Dict[str, Any],
     kpis_meses: Dict[str, Any]
-) -> go.Figure:
+) -> Dict[str, Any]:
     """
-    Combina os gráficos semanal e mensal em uma única visualização.
+    Layout da visualização combinada (título, eixos, separador e barra de KPIs).
 
     Args:
-        fig_semanal: Figura com gráfico semanal
-        fig_mensal: Figura com gráfico mensal
         titulo: Título do gráfico combinado
         data_referencia: Data para análise
+        labels_semanas: Labels DD/MM das semanas
+        labels_meses: Labels dos meses
+        yaxis: Eixo Y semanal
+        yaxis2: Eixo Y mensal
+        annotations: Anotações de valores/YoY das duas visualizações
         kpis_semanas: KPIs calculados da visualização semanal
         kpis_meses: KPIs calculados da visualização mensal
 
     Returns:
-        Figura Plotly combinada com ambas visualizações
+        Dicionário de layout sem o template
     """
-    # Criar nova figura combinada
-    fig_combinado = go.Figure()
-
-    # Adicionar todos os traces do gráfico semanal
-    for trace in fig_semanal.data:
-        fig_combinado.add_trace(trace)
-
-    # Adicionar todos os traces do gráfico mensal
-    for trace in fig_mensal.data:
-        fig_combinado.add_trace(trace)
-
-    # IMPORTANTE: Adicionar as anotações das figuras originais
-    # Copiar anotações do gráfico semanal
-    if hasattr(fig_semanal.layout, 'annotations') and fig_semanal.layout.annotations:
-        for annotation in fig_semanal.layout.annotations:
-            # Converter annotation para dicionário corretamente
-            annotation_dict = annotation.to_plotly_json()
-            fig_combinado.add_annotation(annotation_dict)
-
-    # Copiar anotações do gráfico mensal
-    if hasattr(fig_mensal.layout, 'annotations') and fig_mensal.layout.annotations:
-        for annotation in fig_mensal.layout.annotations:
-            # Converter annotation para dicionário corretamente
-            annotation_dict = annotation.to_plotly_json()
-            fig_combinado.add_annotation(annotation_dict)
-
-    # Adicionar linha separadora entre semanas e meses
-    fig_combinado.add_vline(
-        x=6,  # Posição após as 6 semanas
-        line_width=1,
-        line_dash="solid",
-        line_color="lightgray",
-        opacity=0.5
-    )
-
     # Preparar título com nota de período
     nota_parcial = ""
     if kpis_meses.get('mes_atual') and data_referencia:
@@ -609,62 +637,14 @@ def combinar_graficos_wbr(
             data_formatada = data_referencia.strftime('%d/%m/%Y')
             nota_parcial = f"<br><sub>{mes_nome} parcial (até {data_formatada})</sub>"
 
-    # Combinar labels do eixo X
-    labels_semanas = fig_semanal.layout.xaxis.ticktext
-    labels_meses = fig_mensal.layout.xaxis.ticktext
-
     # Garantir que sempre temos 12 meses nos labels
     if labels_meses is None or len(labels_meses) < 12:
-        meses_map = {
-            1: 'JAN', 2: 'FEV', 3: 'MAR', 4: 'ABR',
-            5: 'MAI', 6: 'JUN', 7: 'JUL', 8: 'AGO',
-            9: 'SET', 10: 'OUT', 11: 'NOV', 12: 'DEZ'
-        }
-        labels_meses = [meses_map[i] for i in range(1, 13)]
+        labels_meses = [MESES_ABREV[i] for i in range(1, 13)]
 
     # Combinar labels: 6 semanas + espaço + 12 meses
     labels_combinados = list(labels_semanas) + [''] + list(labels_meses)
     tickvals_combinados = list(range(len(labels_combinados)))
 
-    # Configuração do layout combinado
-    fig_combinado.update_layout(
-        title={
-            'text': titulo + nota_parcial,
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': dict(size=20, color='black')
-        },
-        xaxis=dict(
-            ticktext=labels_combinados,
-            tickvals=tickvals_combinados,
-            tickangle=-45 if len(labels_combinados) > 10 else 0,
-            gridcolor='rgba(240, 240, 240, 0.5)',
-            showgrid=True,
-            zeroline=False,
-            tickfont=dict(size=11)
-        ),
-        yaxis=fig_semanal.layout.yaxis,
-        yaxis2=fig_mensal.layout.yaxis2,
-        hovermode='x unified',
-        template='plotly_white',
-        height=500,
-        autosize=True,
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="top",
-            y=-0.16,
-            xanchor="center",
-            x=0.5,
-            bordercolor="lightgray",
-            borderwidth=1,
-            font=dict(size=11)
-        ),
-        margin=dict(t=60, b=150, l=50, r=50),
-        plot_bgcolor='white',
-        paper_bgcolor='white'
-    )
-
     # Adicionar KPIs na barra inferior
     kpis_headers = ['LastWk', 'WOW', 'YOY(Sem)', 'MTD', 'YOY(Mês)', 'QTD', 'YOY(Tri)', 'YTD', 'YOY(Ano)']
 
@@ -685,12 +665,14 @@ def combinar_graficos_wbr(
         formatar_valor(kpis_meses.get('ytd_yoy', 0), 'percentual')
     ]
 
+    annotations = list(annotations)
+
     # Adicionar anotações de KPIs
     for i, (header, value) in enumerate(zip(kpis_headers, kpis_values)):
         x_position = (i + 0.5) / 9
 
         # Header
-        fig_combinado.add_annotation(
+        annotations.append(dict(
             x=x_position,
             y=-0.38,
             xref='paper',
@@ -700,7 +682,7 @@ def combinar_graficos_wbr(
             font=dict(size=19, color='Black', family='Arial'),
             align='center',
             xanchor='center'
-        )
+        ))
 
         # Valor
         color = 'black'
@@ -711,7 +693,7 @@ def combinar_graficos_wbr(
             except:
                 pass
 
-        fig_combinado.add_annotation(
+        annotations.append(dict(
             x=x_position,
             y=-0.44,
             xref='paper',
@@ -721,21 +703,116 @@ def combinar_graficos_wbr(
             font=dict(size=18, color=color, family='Arial'),
             align='center',
             xanchor='center'
-        )
+        ))
+
+    return dict(
+        annotations=annotations,
+        # Linha separadora entre semanas e meses (equivalente a add_vline(x=6))
+        shapes=[dict(
+            type='line',
+            x0=6, x1=6,  # Posição após as 6 semanas
+            xref='x',
+            y0=0, y1=1,
+            yref='y domain',
+            line=dict(color='lightgray', dash='solid', width=1),
+            opacity=0.5
+        )],
+        title={
+            'text': titulo + nota_parcial,
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': dict(size=20, color='black')
+        },
+        xaxis=dict(
+            ticktext=labels_combinados,
+            tickvals=tickvals_combinados,
+            tickangle=-45 if len(labels_combinados) > 10 else 0,
+            gridcolor=_GRID_COLOR,
+            showgrid=True,
+            zeroline=False,
+            tickfont=dict(size=11)
+        ),
+        yaxis=yaxis,
+        yaxis2=yaxis2,
+        hovermode='x unified',
+        height=500,
+        autosize=True,
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.16,
+            xanchor="center",
+            x=0.5,
+            bordercolor="lightgray",
+            borderwidth=1,
+            font=dict(size=11)
+        ),
+        margin=dict(t=60, b=150, l=50, r=50),
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+
+
+def combinar_graficos_wbr(
+    fig_semanal: go.Figure,
+    fig_mensal: go.Figure,
+    titulo: str,
+    data_referencia: pd.Timestamp,
+    kpis_semanas: Dict[str, Any],
+    kpis_meses: Dict[str, Any]
+) -> go.Figure:
+    """
+    Combina os gráficos semanal e mensal em uma única visualização.
 
-    return fig_combinado
+    Mantido para quem já tem as duas figuras prontas; criar_grafico_wbr_modular
+    monta a figura combinada direto, sem as figuras intermediárias.
 
+    Args:
+        fig_semanal: Figura com gráfico semanal
+        fig_mensal: Figura com gráfico mensal
+        titulo: Título do gráfico combinado
+        data_referencia: Data para análise
+        kpis_semanas: KPIs calculados da visualização semanal
+        kpis_meses: KPIs calculados da visualização mensal
 
-# Função principal de integração
-def criar_grafico_wbr_modular(
+    Returns:
+        Figura Plotly combinada com ambas visualizações
+    """
+    # Copiar traces e anotações das figuras originais
+    traces = list(fig_semanal.data) + list(fig_mensal.data)
+    annotations = [
+        annotation.to_plotly_json()
+        for fig in (fig_semanal, fig_mensal)
+        for annotation in (fig.layout.annotations or ())
+    ]
+
+    layout = _layout_combinado(
+        titulo=titulo,
+        data_referencia=data_referencia,
+        labels_semanas=fig_semanal.layout.xaxis.ticktext,
+        labels_meses=fig_mensal.layout.xaxis.ticktext,
+        yaxis=fig_semanal.layout.yaxis,
+        yaxis2=fig_mensal.layout.yaxis2,
+        annotations=annotations,
+        kpis_semanas=kpis_semanas,
+        kpis_meses=kpis_meses
+    )
+    layout['template'] = 'plotly_white'
+
+    return go.Figure(data=traces, layout=layout)
+
+
+def criar_figura_wbr_dict(
     dados: Dict[str, Any],
     titulo: str = "Dashboard WBR",
     unidade: str = "valor",
     metrica: str = "metric_value",
     data_referencia: Optional[pd.Timestamp] = None
-) -> go.Figure:
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
     """
-    Função principal que cria o gráfico WBR completo usando as funções modulares.
+    Monta a especificação completa do gráfico WBR combinado em uma única passada,
+    com dicionários simples (sem criar e validar objetos Plotly).
 
     Args:
         dados: Dicionário com dados processados
@@ -745,39 +822,69 @@ def criar_grafico_wbr_modular(
         data_referencia: Data para análise
 
     Returns:
-        Figura Plotly com gráfico WBR completo
+        Tupla com ({'data', 'layout'}, KPIs semanais, KPIs mensais)
     """
     # Obter anos
     ano_atual = dados.get('ano_atual', data_referencia.year if data_referencia else 2024)
     ano_anterior = dados.get('ano_anterior', ano_atual - 1)
 
-    # Criar gráfico semanal
-    fig_semanal, kpis_semanas = criar_grafico_semanal_wbr(
-        dados=dados,
-        metrica=metrica,
-        unidade=unidade,
-        ano_atual=ano_atual,
-        ano_anterior=ano_anterior
+    traces_sem, annotations_sem, eixos_sem, kpis_semanas = _spec_semanal(
+        dados, metrica, unidade, ano_atual, ano_anterior
     )
-
-    # Criar gráfico mensal
-    fig_mensal, kpis_meses = criar_grafico_mensal_wbr(
-        dados=dados,
-        metrica=metrica,
-        unidade=unidade,
-        ano_atual=ano_atual,
-        ano_anterior=ano_anterior,
+    traces_mes, annotations_mes, eixos_mes, kpis_meses = _spec_mensal(
+        dados, metrica, unidade, ano_atual, ano_anterior,
         offset_x=7  # Começa após as 6 semanas + espaçador
     )
 
-    # Combinar gráficos
-    fig_combinado = combinar_graficos_wbr(
-        fig_semanal=fig_semanal,
-        fig_mensal=fig_mensal,
+    layout = _layout_combinado(
         titulo=titulo,
         data_referencia=data_referencia or pd.Timestamp.now(),
+        labels_semanas=eixos_sem['xaxis']['ticktext'],
+        labels_meses=eixos_mes['xaxis']['ticktext'],
+        yaxis=eixos_sem['yaxis'],
+        yaxis2=eixos_mes['yaxis2'],
+        annotations=annotations_sem + annotations_mes,
         kpis_semanas=kpis_semanas,
         kpis_meses=kpis_meses
     )
+    # Pelo nome: o template expandido é compartilhado e só entra na figura (ver criar_grafico_wbr_modular)
+    layout['template'] = 'plotly_white'
+
+    return {'data': traces_sem + traces_mes, 'layout': layout}, kpis_semanas, kpis_meses
+
+
+# Função principal de integração
+def criar_grafico_wbr_modular(
+    dados: Dict[str, Any],
+    titulo: str = "Dashboard WBR",
+    unidade: str = "valor",
+    metrica: str = "metric_value",
+    data_referencia: Optional[pd.Timestamp] = None
+) -> go.Figure:
+    """
+    Função principal que cria o gráfico WBR completo usando as funções modulares.
+
+    A figura é montada direto a partir da especificação em dicionário
+    (criar_figura_wbr_dict), sem validação: o Plotly validaria cada trace e
+    anotação em cada add_trace/add_annotation das figuras intermediárias.
+
+    Args:
+        dados: Dicionário com dados processados
+        titulo: Título do gráfico
+        unidade: Unidade de medida
+        metrica: Nome da coluna de métrica
+        data_referencia: Data para análise
 
-    return fig_combinado
\ No newline at end of file
+    Returns:
+        Figura Plotly com gráfico WBR completo
+    """
+    spec, _, _ = criar_figura_wbr_dict(
+        dados=dados,
+        titulo=titulo,
+        unidade=unidade,
+        metrica=metrica,
+        data_referencia=data_referencia
+    )
+    # go.Figure copia o layout: a figura pode ser alterada sem tocar o template em cache
+    spec['layout']['template'] = _template_dict(spec['layout']['template'])
+    return go.Figure(spec, _validate=False)
@@ -21,7 +21,11 @@ from .wbr_utility import (
     create_trailing_six_weeks, 
     DataValidator, 
     WBRValidationError,
-    prepare_data_for_wbr
+    prepare_data_for_wbr,
+    EXACT_DECIMAL,
+    to_number,
+    yoy_array,
+    wow_array
 )
 
 logger = logging.getLogger(__name__)
@@ -52,10 +56,10 @@ class ComparisonResult:
     """Result of metric comparison (WOW/YOY)."""
     metric_name: str
     comparison_type: str
-    current_value: Decimal
-    previous_value: Decimal
-    absolute_change: Decimal
-    percent_change: Optional[Decimal]
+    current_value: Union[float, Decimal]
+    previous_value: Union[float, Decimal]
+    absolute_change: Union[float, Decimal]
+    percent_change: Optional[Union[float, Decimal]]
     is_improvement: Optional[bool] = None
     
     def to_dict(self) -> Dict[str, Any]:
@@ -88,7 +92,8 @@ class WBRCalculator:
         validate_data: bool = True,
         cache_enabled: bool = True,
         date_column: str = 'date',  # Default to project standard
-        metric_column: str = 'metric_value'  # Default to project standard
+        metric_column: str = 'metric_value',  # Default to project standard
+        exact_decimal: Optional[bool] = None
     ):
         """
         Initialize WBR Calculator with BigQuery/Streamlit compatibility.
@@ -104,6 +109,8 @@ class WBRCalculator:
             cache_enabled: Whether to enable calculation caching
             date_column: Name of date column (default: 'date')
             metric_column: Name of primary metric column
+            exact_decimal: Return Decimal values instead of float
+                (default: WBR_EXACT_DECIMAL env var)
         """
         # Store column names for compatibility
         self.date_column = date_column
@@ -131,6 +138,7 @@ class WBRCalculator:
         self.aggregation_map = aggregation_map
         self.num_weeks = num_weeks
         self.cache_enabled = cache_enabled
+        self.exact_decimal = EXACT_DECIMAL if exact_decimal is None else exact_decimal
         
         # Metric classification
         self.value_metrics = set(value_metrics or [])
@@ -151,6 +159,9 @@ class WBRCalculator:
         # Cache for expensive calculations
         self._calculation_cache = {} if cache_enabled else None
         
+        # Cumulative sums for period-to-date KPIs (see date_index)
+        self._date_index = None
+        
     def _validate_metric_classification(self):
         """Validate that metrics aren't classified in multiple categories."""
         overlap = self.value_metrics & self.ratio_metrics
@@ -200,6 +211,17 @@ class WBRCalculator:
                 date_column=self.date_column
             )
     
+    @property
+    def date_index(self) -> 'PrefixSumIndex':
+        """Prefix-sum index over the daily data (summed metrics), built on first use."""
+        if self._date_index is None:
+            metrics = [
+                col for col, agg in self.aggregation_map.items()
+                if agg == 'sum' and col in self.daily_df.columns
+            ]
+            self._date_index = PrefixSumIndex(self.daily_df, self.date_column, metrics)
+        return self._date_index
+    
     def add_product_metric(
         self,
         name: str,
@@ -379,10 +401,10 @@ class WBRCalculator:
             return ComparisonResult(
                 metric_name=f"{metric}_{year_label}",
                 comparison_type="WOW",
-                current_value=Decimal(str(current)),
-                previous_value=Decimal(str(previous)),
-                absolute_change=Decimal(str(absolute_change)),
-                percent_change=Decimal(str(percent_change)) if percent_change else None,
+                current_value=to_number(current, self.exact_decimal),
+                previous_value=to_number(previous, self.exact_decimal),
+                absolute_change=to_number(absolute_change, self.exact_decimal),
+                percent_change=to_number(percent_change, self.exact_decimal) if percent_change else None,
                 is_improvement=is_improvement
             )
             
@@ -424,10 +446,10 @@ class WBRCalculator:
             return ComparisonResult(
                 metric_name=metric,
                 comparison_type="YOY",
-                current_value=Decimal(str(cy_last)),
-                previous_value=Decimal(str(py_last)),
-                absolute_change=Decimal(str(absolute_change)),
-                percent_change=Decimal(str(percent_change)) if percent_change else None,
+                current_value=to_number(cy_last, self.exact_decimal),
+                previous_value=to_number(py_last, self.exact_decimal),
+                absolute_change=to_number(absolute_change, self.exact_decimal),
+                percent_change=to_number(percent_change, self.exact_decimal) if percent_change else None,
                 is_improvement=absolute_change > 0
             )
             
@@ -442,6 +464,20 @@ class WBRCalculator:
                 percent_change=None
             )
     
+    def compute_comparison_arrays(self, metric: str) -> Dict[str, np.ndarray]:
+        """
+        WOW (CY and PY) and YOY for every week of the trailing window at once.
+        
+        Plain float64 arrays (NaN where not computable); round only for display.
+        """
+        cy = self._get_metric_series(metric, 'cy').to_numpy()
+        py = self._get_metric_series(metric, 'py').to_numpy()
+        return {
+            'wow_cy': wow_array(cy),
+            'wow_py': wow_array(py),
+            'yoy': yoy_array(cy, py)
+        }
+    
     def export_trailing(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Export combined DataFrames with original and derived metrics."""
         # Filter out empty DataFrames before concatenation
@@ -543,88 +579,23 @@ class WBRCalculator:
             # Last week previous year
             ultima_semana_py = py_series.iloc[5] if not pd.isna(py_series.iloc[5]) else 0
             
-            # Calculate WOW
-            wow_pct = 0
-            wow_abs = ultima_semana - semana_anterior
-            if semana_anterior != 0:
-                wow_pct = ((ultima_semana / semana_anterior - 1) * 100)
-            
-            # Calculate YOY for last week
-            yoy_pct = 0
-            if ultima_semana_py != 0:
-                yoy_pct = ((ultima_semana / ultima_semana_py - 1) * 100)
-            
-            # Calculate MTD, QTD, YTD from actual data
-            # Get the current date parts
-            current_month = self.week_ending.month
-            current_quarter = (current_month - 1) // 3 + 1
-            current_year = self.week_ending.year
-            
-            # Calculate MTD - Month-to-Date (current month only)
-            start_of_month = pd.Timestamp(year=current_year, month=current_month, day=1)
-            mtd_mask_cy = (self.data.index >= start_of_month) & (self.data.index <= self.week_ending)
-            mtd_atual = self.data[mtd_mask_cy][metric_col].sum() if metric_col in self.data.columns else cy_series.sum()
-            
-            # Calculate MTD for previous year
-            start_of_month_py = pd.Timestamp(year=current_year - 1, month=current_month, day=1)
-            end_of_month_py = pd.Timestamp(year=current_year - 1, month=current_month, day=self.week_ending.day)
-            mtd_mask_py = (self.data.index >= start_of_month_py) & (self.data.index <= end_of_month_py)
-            mtd_py = self.data[mtd_mask_py][metric_col].sum() if metric_col in self.data.columns else py_series.sum()
-            
-            # Calculate QTD - Quarter-to-Date
-            quarter_start_month = (current_quarter - 1) * 3 + 1
-            start_of_quarter = pd.Timestamp(year=current_year, month=quarter_start_month, day=1)
-            qtd_mask_cy = (self.data.index >= start_of_quarter) & (self.data.index <= self.week_ending)
-            qtd_atual = self.data[qtd_mask_cy][metric_col].sum() if metric_col in self.data.columns else mtd_atual
-            
-            # Calculate QTD for previous year
-            start_of_quarter_py = pd.Timestamp(year=current_year - 1, month=quarter_start_month, day=1)
-            end_date_py = pd.Timestamp(year=current_year - 1, month=current_month, day=self.week_ending.day)
-            qtd_mask_py = (self.data.index >= start_of_quarter_py) & (self.data.index <= end_date_py)
-            qtd_py = self.data[qtd_mask_py][metric_col].sum() if metric_col in self.data.columns else mtd_py
-            
-            # Calculate YTD - Year-to-Date
-            start_of_year = pd.Timestamp(year=current_year, month=1, day=1)
-            ytd_mask_cy = (self.data.index >= start_of_year) & (self.data.index <= self.week_ending)
-            ytd_atual = self.data[ytd_mask_cy][metric_col].sum() if metric_col in self.data.columns else qtd_atual
-            
-            # Calculate YTD for previous year
-            start_of_year_py = pd.Timestamp(year=current_year - 1, month=1, day=1)
-            ytd_mask_py = (self.data.index >= start_of_year_py) & (self.data.index <= end_date_py)
-            ytd_py = self.data[ytd_mask_py][metric_col].sum() if metric_col in self.data.columns else qtd_py
-            
-            # Calculate YOY percentages
-            mtd_pct = 0
-            if mtd_py != 0:
-                mtd_pct = ((mtd_atual / mtd_py - 1) * 100)
-            
-            qtd_pct = 0
-            if qtd_py != 0:
-                qtd_pct = ((qtd_atual / qtd_py - 1) * 100)
-                
-            ytd_pct = 0
-            if ytd_py != 0:
-                ytd_pct = ((ytd_atual / ytd_py - 1) * 100)
-            
-            # For backward compatibility, mes_atual uses MTD
-            mes_atual = mtd_atual
-            mes_py = mtd_py
+            # MTD, QTD and YTD (CY and PY) from the prefix-sum index: two searchsorted each
+            bounds = _period_to_date_bounds(self.week_ending)
+            if metric_col in self.date_index.metrics:
+                periods = {
+                    name: self.date_index.range_sum(metric_col, start, end)
+                    for name, (start, end) in bounds.items()
+                }
+            else:
+                # Derived metric: only the trailing windows are available
+                periods = {
+                    name: (cy_series if name.endswith('_cy') else py_series).sum()
+                    for name in bounds
+                }
             
-            return {
-                'ultima_semana': Decimal(str(ultima_semana)),
-                'var_semanal': Decimal(str(wow_pct)),
-                'yoy_semanal': Decimal(str(yoy_pct)),
-                'mes_atual': Decimal(str(mes_atual)),
-                'yoy_mensal': Decimal(str(mtd_pct)),
-                'trimestre_atual': Decimal(str(qtd_atual)),
-                'yoy_trimestral': Decimal(str(qtd_pct)),
-                'ano_atual': Decimal(str(ytd_atual)),
-                'yoy_anual': Decimal(str(ytd_pct)),
-                'wow_pct': Decimal(str(wow_pct)),
-                'wow_abs': Decimal(str(wow_abs)),
-                'mtd_atual': Decimal(str(mtd_atual)),
-                'mtd_pct': Decimal(str(mtd_pct))
-            }
+            return _build_dashboard_kpis(
+                ultima_semana, semana_anterior, ultima_semana_py, periods, self.exact_decimal
+            )
             
         except Exception as e:
             logger.warning(f"Error calculating dashboard KPIs: {e}")
@@ -704,8 +675,280 @@ class WBRCalculator:
                 raise ValueError(f"Invalid handle_zero option: {handle_zero}")
 
 
+def _period_to_date_bounds(week_ending: pd.Timestamp) -> Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    CY and PY date ranges (inclusive) for MTD, QTD and YTD.
+
+    PY ranges end on the same calendar day one year earlier; 29/02 falls back to 28/02.
+    """
+    current_year = week_ending.year
+    current_month = week_ending.month
+    quarter_start_month = ((current_month - 1) // 3) * 3 + 1
+
+    py_month_end = pd.Timestamp(year=current_year - 1, month=current_month, day=1) + pd.offsets.MonthEnd(0)
+    end_date_py = pd.Timestamp(
+        year=current_year - 1, month=current_month, day=min(week_ending.day, py_month_end.day)
+    )
+
+    return {
+        'mtd_cy': (pd.Timestamp(year=current_year, month=current_month, day=1), week_ending),
+        'mtd_py': (pd.Timestamp(year=current_year - 1, month=current_month, day=1), end_date_py),
+        'qtd_cy': (pd.Timestamp(year=current_year, month=quarter_start_month, day=1), week_ending),
+        'qtd_py': (pd.Timestamp(year=current_year - 1, month=quarter_start_month, day=1), end_date_py),
+        'ytd_cy': (pd.Timestamp(year=current_year, month=1, day=1), week_ending),
+        'ytd_py': (pd.Timestamp(year=current_year - 1, month=1, day=1), end_date_py)
+    }
+
+
+def _build_dashboard_kpis(
+    ultima_semana: float,
+    semana_anterior: float,
+    ultima_semana_py: float,
+    periods: Dict[str, float],
+    exact_decimal: bool = False
+) -> Dict[str, Any]:
+    """
+    Assemble the dashboard KPI dictionary from weekly and period-to-date totals.
+
+    Args:
+        ultima_semana: Last week (CY)
+        semana_anterior: Week before the last one (CY)
+        ultima_semana_py: Last week (PY)
+        periods: Totals keyed as in _period_to_date_bounds (mtd_cy, mtd_py, ...)
+        exact_decimal: Return Decimal values instead of float
+
+    Returns:
+        Dictionary compatible with existing dashboard KPI cards
+    """
+    def _pct(current, previous):
+        return ((current / previous - 1) * 100) if previous != 0 else 0
+
+    wow_pct = _pct(ultima_semana, semana_anterior)
+    wow_abs = ultima_semana - semana_anterior
+    yoy_pct = _pct(ultima_semana, ultima_semana_py)
+
+    mtd_atual, mtd_pct = periods['mtd_cy'], _pct(periods['mtd_cy'], periods['mtd_py'])
+    qtd_atual, qtd_pct = periods['qtd_cy'], _pct(periods['qtd_cy'], periods['qtd_py'])
+    ytd_atual, ytd_pct = periods['ytd_cy'], _pct(periods['ytd_cy'], periods['ytd_py'])
+
+    kpis = {
+        'ultima_semana': ultima_semana,
+        'var_semanal': wow_pct,
+        'yoy_semanal': yoy_pct,
+        # For backward compatibility, mes_atual uses MTD
+        'mes_atual': mtd_atual,
+        'yoy_mensal': mtd_pct,
+        'trimestre_atual': qtd_atual,
+        'yoy_trimestral': qtd_pct,
+        'ano_atual': ytd_atual,
+        'yoy_anual': ytd_pct,
+        'wow_pct': wow_pct,
+        'wow_abs': wow_abs,
+        'mtd_atual': mtd_atual,
+        'mtd_pct': mtd_pct
+    }
+    return {key: to_number(value, exact_decimal) for key, value in kpis.items()}
+
+
+class PrefixSumIndex:
+    """
+    Daily cumulative sums per metric over a sorted date array.
+
+    The sum of any inclusive date range is the difference of two prefix values,
+    located with searchsorted, so trailing weeks and period-to-date totals never
+    rescan the rows. Rows are bucketed by calendar day; NaN values count as zero.
+    """
+
+    def __init__(self, df: pd.DataFrame, date_column: str, metrics: List[str]):
+        """
+        Build the index.
+
+        Args:
+            df: DataFrame with a date column and the metric columns
+            date_column: Name of date column
+            metrics: Metric columns to index (summed per day)
+        """
+        days = pd.to_datetime(df[date_column]).dt.normalize()
+        daily = df[metrics].groupby(days.to_numpy()).sum()
+
+        self.metrics = list(metrics)
+        self.dates = daily.index.to_numpy().astype('datetime64[D]')
+        # Leading zero: the sum of rows [lo, hi) is cumsum[hi] - cumsum[lo]
+        self._cumsum = {
+            metric: np.concatenate(([0.0], np.cumsum(daily[metric].to_numpy(dtype=np.float64))))
+            for metric in self.metrics
+        }
+
+    @staticmethod
+    def _as_day(value) -> np.ndarray:
+        return np.asarray(pd.to_datetime(value).to_numpy(), dtype='datetime64[D]')
+
+    def range_sum(self, metric: str, start, end) -> Union[float, np.ndarray]:
+        """
+        Sum of a metric between two dates (both inclusive).
+
+        Args:
+            metric: Metric column
+            start: First day (scalar or array-like)
+            end: Last day (scalar or array-like, same shape as start)
+
+        Returns:
+            Float for scalar bounds, array for array-like bounds
+        """
+        cumsum = self._cumsum[metric]
+        lo = np.searchsorted(self.dates, self._as_day(start), side='left')
+        hi = np.searchsorted(self.dates, self._as_day(end), side='right')
+        result = cumsum[hi] - cumsum[lo]
+        return float(result) if np.ndim(result) == 0 else result
+
+    def trailing_weeks(self, metric: str, week_ending, num_weeks: int = 6) -> np.ndarray:
+        """
+        Sums of the trailing 7-day buckets ending on week_ending, oldest first.
+
+        Args:
+            metric: Metric column
+            week_ending: Last day of the most recent bucket
+            num_weeks: Number of buckets
+
+        Returns:
+            Array with num_weeks sums
+        """
+        ends = self._as_day(week_ending) - np.arange(num_weeks - 1, -1, -1) * np.timedelta64(7, 'D')
+        return self.range_sum(metric, ends - np.timedelta64(6, 'D'), ends)
+
+
+class IncrementalWBRCalculator:
+    """
+    Stateful dashboard KPI calculator for moving the week ending back and forth.
+
+    Data is prepared and indexed once (PrefixSumIndex); each position of the week
+    ending then answers every get_dashboard_kpis field from prefix-sum differences,
+    without rebuilding the trailing-window frames. Only sum aggregation is supported.
+
+    at() and trailing_weeks(week_ending=...) never touch the current position, so one
+    instance can be shared between threads (one per table and shopping in TableWindow).
+    """
+
+    def __init__(
+        self,
+        daily_df: pd.DataFrame,
+        week_ending: Union[datetime.date, datetime.datetime, pd.Timestamp],
+        metrics: Optional[List[str]] = None,
+        num_weeks: int = 6,
+        date_column: str = 'date',
+        metric_column: str = 'metric_value',
+        exact_decimal: Optional[bool] = None
+    ):
+        """
+        Initialize the calculator.
+
+        Args:
+            daily_df: DataFrame with daily data
+            week_ending: Initial end date of the analysis period
+            metrics: Metric columns to index (default: metric_column)
+            num_weeks: Number of weeks in trailing window
+            date_column: Name of date column (default: 'date')
+            metric_column: Name of primary metric column
+            exact_decimal: Return Decimal values instead of float
+                (default: WBR_EXACT_DECIMAL env var)
+        """
+        self.date_column = date_column
+        self.metric_column = metric_column
+        self.num_weeks = num_weeks
+        self.week_ending = pd.to_datetime(week_ending).normalize()
+        self.exact_decimal = EXACT_DECIMAL if exact_decimal is None else exact_decimal
+
+        metrics = list(metrics or [metric_column])
+        prepared = prepare_data_for_wbr(daily_df, date_column, metric_column)
+        self.index = PrefixSumIndex(prepared, date_column, metrics)
+
+    def shift_week_ending(self, delta: Union[int, datetime.timedelta]) -> Dict[str, Any]:
+        """
+        Move the week ending and return the KPIs at the new position.
+
+        Args:
+            delta: Number of weeks (int, negative goes back) or a timedelta
+
+        Returns:
+            Dictionary compatible with existing dashboard KPI cards
+        """
+        if not isinstance(delta, datetime.timedelta):
+            delta = datetime.timedelta(weeks=delta)
+        self.week_ending = self.week_ending + delta
+        return self.at(self.week_ending)
+
+    def at(
+        self,
+        week_ending: Union[datetime.date, datetime.datetime, pd.Timestamp],
+        metric: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        KPIs for an arbitrary week ending, without changing the current position.
+
+        Args:
+            week_ending: End date of the analysis period
+            metric: Metric column (default: metric_column)
+
+        Returns:
+            Dictionary with the same fields as WBRCalculator.get_dashboard_kpis
+        """
+        metric = metric or self.metric_column
+        week_ending = pd.to_datetime(week_ending).normalize()
+
+        cy_weeks = self.index.trailing_weeks(metric, week_ending, self.num_weeks)
+        py_weeks = self.index.trailing_weeks(
+            metric, week_ending - datetime.timedelta(days=364), self.num_weeks
+        )
+
+        periods = {
+            name: self.index.range_sum(metric, start, end)
+            for name, (start, end) in _period_to_date_bounds(week_ending).items()
+        }
+
+        return _build_dashboard_kpis(
+            ultima_semana=float(cy_weeks[-1]),
+            semana_anterior=float(cy_weeks[-2]) if self.num_weeks > 1 else 0.0,
+            ultima_semana_py=float(py_weeks[-1]),
+            periods=periods,
+            exact_decimal=self.exact_decimal
+        )
+
+    def get_dashboard_kpis(self) -> Dict[str, Any]:
+        """KPIs at the current week ending (same fields as WBRCalculator.get_dashboard_kpis)."""
+        return self.at(self.week_ending)
+
+    def trailing_weeks(
+        self,
+        metric: Optional[str] = None,
+        previous_year: bool = False,
+        week_ending: Optional[Union[datetime.date, datetime.datetime, pd.Timestamp]] = None
+    ) -> pd.Series:
+        """
+        Trailing weekly sums at the current (or the given) week ending.
+
+        Args:
+            metric: Metric column (default: metric_column)
+            previous_year: Use the PY window (week ending minus 364 days)
+            week_ending: End date of the analysis period, without changing the current
+                position (default: current week ending)
+
+        Returns:
+            Series indexed by week ending date, oldest first
+        """
+        week_ending = self.week_ending if week_ending is None else pd.to_datetime(week_ending).normalize()
+        if previous_year:
+            week_ending = week_ending - datetime.timedelta(days=364)
+        ends = pd.date_range(end=week_ending, periods=self.num_weeks, freq='7D')
+        return pd.Series(
+            self.index.trailing_weeks(metric or self.metric_column, week_ending, self.num_weeks),
+            index=ends,
+            name=metric or self.metric_column
+        )
+
+
 # Função para compatibilidade com o código existente (substitui calcular_kpis de kpis.py)
-def calcular_kpis(df: pd.DataFrame, data_referencia: pd.Timestamp = None, coluna_data: str = 'date', coluna_metrica: str = 'metric_value') -> Dict[str, Any]:
+def calcular_kpis(df: pd.DataFrame, data_referencia: pd.Timestamp = None, coluna_data: str = 'date', coluna_metrica: str = 'metric_value',
+                  exact_decimal: Optional[bool] = None) -> Dict[str, Any]:
     """
     Função de compatibilidade que substitui a antiga calcular_kpis de kpis.py.
     Usa a lógica robusta das 6 semanas móveis do WBRCalculator.
@@ -715,6 +958,7 @@ def calcular_kpis(df: pd.DataFrame, data_referencia: pd.Timestamp = None, coluna
         data_referencia: Data de referência para análise
         coluna_data: Nome da coluna de data
         coluna_metrica: Nome da coluna de métrica principal
+        exact_decimal: Valores em Decimal (exportações financeiras) em vez de float
         
     Returns:
         Dictionary com KPIs para o dashboard
@@ -749,7 +993,8 @@ def calcular_kpis(df: pd.DataFrame, data_referencia: pd.Timestamp = None, coluna
             validate_data=False,  # Skip validation for speed
             cache_enabled=False,
             date_column=coluna_data,
-            metric_column=coluna_metrica
+            metric_column=coluna_metrica,
+            exact_decimal=exact_decimal
         )
         
         # Retornar KPIs formatados para o dashboard
@@ -4,6 +4,7 @@ Handles temporal window operations and data padding for WBR system.
 Integrated with existing project structure.
 """
 
+import os
 import pandas as pd
 import numpy as np
 import datetime
@@ -11,6 +12,7 @@ import logging
 from decimal import Decimal
 from typing import Dict, Optional, Union, Any, Tuple, List
 from dataclasses import dataclass
+from .prepared_frame import frame_preparado, consolidar_por_data
 
 logger = logging.getLogger(__name__)
 
@@ -175,9 +177,9 @@ def create_trailing_six_weeks(
             for warning in validation.warnings:
                 logger.warning(warning)
     
-    # Ensure we work with a copy
-    df = df.copy()
-    df[date_column] = pd.to_datetime(df[date_column])
+    # Frames preparados já têm a data em datetime64; os demais são convertidos sem alterar o original
+    if not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+        df = df.assign(**{date_column: pd.to_datetime(df[date_column])})
     week_ending = pd.to_datetime(week_ending)
     
     # Map ISO weekday to pandas resample rule
@@ -199,7 +201,7 @@ def create_trailing_six_weeks(
     
     # Filter data for the period
     mask = (df[date_column] <= week_ending) & (df[date_column] >= start_date)
-    trailing_daily = df.loc[mask].copy()
+    trailing_daily = df.loc[mask]
     
     if trailing_daily.empty:
         logger.warning(f"No data found between {start_date} and {week_ending}")
@@ -290,6 +292,7 @@ def prepare_data_for_wbr(
 ) -> pd.DataFrame:
     """
     Prepare data for WBR processing, ensuring compatibility with existing system.
+    Rows sharing a date (e.g. one per shopping) are summed into a single row.
     
     Args:
         df: Input DataFrame
@@ -299,16 +302,26 @@ def prepare_data_for_wbr(
     Returns:
         Prepared DataFrame with standardized columns
     """
-    df_prepared = df.copy()
-    
+    if frame_preparado(df, date_column):
+        # Already datetime64, sorted and indexed at load time: no copy, conversion or sort
+        if df[date_column].duplicated().any():
+            # Several rows per date (e.g. one per shopping): sum them, like processar_dados_wbr
+            return consolidar_por_data(df, date_column)
+        return df
+
     # Ensure date column is datetime
-    df_prepared[date_column] = pd.to_datetime(df_prepared[date_column])
+    df_prepared = df.assign(**{date_column: pd.to_datetime(df[date_column])})
     
     # Sort by date
     df_prepared = df_prepared.sort_values(date_column)
     
-    # Remove duplicates if any
-    df_prepared = df_prepared.drop_duplicates(subset=[date_column])
+    # Remove duplicates by aggregating (sum for numeric columns)
+    if df_prepared[date_column].duplicated().any():
+        numeric_cols = df_prepared.select_dtypes(include=[np.number]).columns.tolist()
+        if metric_column in df_prepared.columns and metric_column not in numeric_cols:
+            numeric_cols.append(metric_column)
+        agg_dict = {col: 'sum' for col in numeric_cols}
+        df_prepared = df_prepared.groupby(date_column).agg(agg_dict).reset_index()
     
     # Reset index
     df_prepared = df_prepared.reset_index(drop=True)
@@ -620,6 +633,89 @@ def detect_trend_direction(
     }
 
 
+# ============================================
+# VECTORIZED COMPARISONS (float64)
+# ============================================
+
+# Exact-decimal results (Decimal instead of float) for finance exports; opt-in
+EXACT_DECIMAL = os.getenv("WBR_EXACT_DECIMAL", "false").lower() == "true"
+
+
+def as_float_array(values: Any) -> np.ndarray:
+    """
+    Convert values (floats, ints, Decimals, None, NaN, pd.NA) to a float64 array.
+
+    Args:
+        values: Sequence, Series or array of numbers
+
+    Returns:
+        float64 array with NaN for missing values
+    """
+    try:
+        # floats, ints, Decimals and None convert directly (None -> NaN)
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # pd.NA, texts and other objects
+        return pd.to_numeric(pd.Series(list(values), dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def yoy_array(current: Any, previous: Any) -> np.ndarray:
+    """
+    Percentage change of current over previous, element-wise.
+
+    Args:
+        current: Current values (e.g. CY weeks or months)
+        previous: Comparison values, same length (e.g. PY weeks or months)
+
+    Returns:
+        float64 array; NaN where either value is missing or previous is zero
+    """
+    current = as_float_array(current)
+    previous = as_float_array(previous)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = ((current - previous) / previous) * 100
+    change[previous == 0] = np.nan
+    return change
+
+
+def wow_array(values: Any) -> np.ndarray:
+    """
+    Week-over-week percentage change for every week of a series.
+
+    Args:
+        values: Weekly values, oldest first
+
+    Returns:
+        float64 array of the same length; the first element is NaN
+    """
+    values = as_float_array(values)
+    result = np.full(values.shape, np.nan)
+    if len(values) > 1:
+        result[1:] = yoy_array(values[1:], values[:-1])
+    return result
+
+
+def nan_to_none(values: np.ndarray) -> List[Optional[float]]:
+    """Convert a float array to a list of floats with None for NaN (for Plotly/labels)."""
+    return [None if np.isnan(v) else v for v in values.tolist()]
+
+
+def to_number(value: Any, exact_decimal: bool = False) -> Union[float, Decimal]:
+    """
+    Numeric result in the configured representation.
+
+    Args:
+        value: Number to convert
+        exact_decimal: Return Decimal(str(value)) instead of float
+
+    Returns:
+        float by default, Decimal in exact-decimal mode
+    """
+    if exact_decimal:
+        return value if isinstance(value, Decimal) else Decimal(str(value))
+    return float(value)
+
+
 # ============================================
 # SPECIFICATION-REQUIRED METRICS FUNCTIONS
 # ============================================
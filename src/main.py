@@ -192,8 +192,10 @@ st.markdown("---")
 # Obtém e renderiza APENAS a página atual
 current_page = component_cache.get_page(st.session_state.page)
 if current_page:
+    from src.utils.timing import timed
     try:
-        current_page.render(filters)
+        with timed('page_render', table=st.session_state.page):
+            current_page.render(filters)
     except Exception as e:
         st.error(f"Erro ao renderizar página: {e}")
 
@@ -207,4 +209,7 @@ if os.getenv("DEBUG_PERFORMANCE", "false").lower() == "true":
         st.markdown("### 🔍 Debug")
         st.caption(f"Página: {st.session_state.page}")
         st.caption(f"Usuário: {st.session_state.get('username', 'N/A')}")
-        st.caption(f"Cache Pages: {len(component_cache._pages)}")
\ No newline at end of file
+        st.caption(f"Cache Pages: {len(component_cache._pages)}")
+
+    from src.ui.components.performance import PerformancePanelComponent
+    PerformancePanelComponent().render()
\ No newline at end of file
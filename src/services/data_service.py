@@ -2,17 +2,162 @@
 Serviço de dados - Gerenciamento de dados e cache
 """
 from typing import Optional, Tuple, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
 import pandas as pd
 import streamlit as st
 import os
-from src.clients.database.factory import get_database_client, fetch_data_generic
+from src.clients.database.factory import (
+    get_database_client, fetch_data_generic, fetch_wbr_aggregated_generic, inicio_janela_completa
+)
 from src.config.database import get_table_config, get_database_type
+from src.core.prepared_frame import FrameParticionado, preparar_frame, consolidar_por_data
+from src.core.processing import processar_dados_wbr_multi
+from src.core.wbr_metrics import IncrementalWBRCalculator
+from src.services.local_store import ParquetTableStore, local_store_enabled
+from src.services.query_cache import get_query_cache, make_cache_key
+from src.services.warmup import warmup_enabled, start_warmup_thread
+from src.utils.timing import timed, timing_labels
+
+logger = logging.getLogger(__name__)
+
+
+def aggregation_pushdown_enabled() -> bool:
+    """Verifica se semanas/meses são agregados no banco em vez de carregar as linhas diárias (default: não)"""
+    return os.getenv("WBR_AGGREGATION_PUSHDOWN", "false").lower() == "true"
+
+
+def superset_window_enabled() -> bool:
+    """Verifica se as tabelas WBR são carregadas uma vez na janela completa (default: sim)"""
+    return os.getenv("WBR_SUPERSET_WINDOW", "true").lower() == "true"
+
+
+class TableWindow:
+    """
+    Janela completa de uma tabela WBR (janeiro de dois anos antes da última data até hoje),
+    guardada como frame preparado (ver src.core.prepared_frame), da qual cada
+    data de referência é servida por fatiamento, sem cópias.
+
+    Com coluna de shopping, as linhas ficam num único FrameParticionado (ordenado por
+    shopping e data): trocar de shopping é uma consulta às posições mais uma busca
+    binária, sem varrer nem copiar a tabela. A visão "Todos" é a série consolidada
+    (soma por data, uma linha por data), tão barata quanto um shopping.
+
+    KPIs e semanas móveis vêm de um IncrementalWBRCalculator por shopping, criado
+    na primeira consulta: mudar a data de referência é só uma diferença de somas
+    prefixadas, sem recalcular as janelas.
+    """
+
+    def __init__(self, df: pd.DataFrame, inicio: pd.Timestamp):
+        """
+        Args:
+            df: DataFrame no formato de fetch_wbr_data (date, metric_value, shopping)
+            inicio: Primeira data coberta pela janela
+        """
+        self.inicio = pd.Timestamp(inicio)
+        self.particao: Optional[FrameParticionado] = None
+        self.consolidado: Optional[pd.DataFrame] = None
+
+        if not df.empty:
+            with timed('parse_dates'):
+                df = preparar_frame(df)
+            if 'shopping' in df.columns:
+                with timed('partition_shoppings'):
+                    # Uma linha por data: gráfico e KPIs somam todos os shoppings do mesmo jeito
+                    self.consolidado = consolidar_por_data(df)
+                    self.particao = FrameParticionado(df, 'shopping')
+                # Só o frame particionado fica guardado (cada shopping é uma fatia dele)
+                df = self.particao.frame
+        self.df = df
+
+        self._calculadoras: Dict[Any, Optional[IncrementalWBRCalculator]] = {}
+        self._calculadoras_lock = threading.Lock()
+
+        self.nbytes = int(df.memory_usage(deep=True).sum())
+        if self.consolidado is not None:
+            self.nbytes += int(self.consolidado.memory_usage(deep=True).sum())
+
+    def slice(self, date_reference: Optional[pd.Timestamp] = None,
+              shopping_filter: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Retorna as linhas de janeiro do ano anterior até a referência, como fetch_wbr_data
+
+        Args:
+            date_reference: Data de referência (default: hoje)
+            shopping_filter: Filtro de shopping
+
+        Returns:
+            Frame preparado (data crescente, somente leitura) ou None se a janela não cobre o período.
+            Sem filtro de shopping, a série consolidada (date, metric_value) com uma linha por data
+        """
+        ref = _normalizar_referencia(date_reference)
+        start = pd.Timestamp(year=ref.year - 1, month=1, day=1)
+        if start < self.inicio:
+            return None
+
+        df = self._serie(shopping_filter)
+        if df.empty:
+            return df
+
+        # Busca binária sobre o índice ordenado: sem varrer a tabela inteira.
+        # A fatia preserva o contrato do frame preparado: nada a copiar nem reordenar
+        i = df.index.searchsorted(start, side='left')
+        j = df.index.searchsorted(ref, side='right')
+        return df.iloc[i:j]
+
+    def cobre(self, date_reference: Optional[pd.Timestamp] = None) -> bool:
+        """Indica se a janela tem todas as linhas de que a referência precisa (desde janeiro do ano anterior)"""
+        ref = _normalizar_referencia(date_reference)
+        return pd.Timestamp(year=ref.year - 1, month=1, day=1) >= self.inicio
+
+    def calculadora(self, shopping_filter: Optional[str] = None) -> Optional[IncrementalWBRCalculator]:
+        """
+        Calculadora incremental de KPIs do shopping (ou da série consolidada), criada uma vez
+
+        Args:
+            shopping_filter: Filtro de shopping
+
+        Returns:
+            IncrementalWBRCalculator compartilhado ou None se não há linhas para o filtro
+        """
+        chave = shopping_filter or None
+        calc = self._calculadoras.get(chave)
+        if calc is not None or chave in self._calculadoras:
+            return calc
+
+        with self._calculadoras_lock:
+            if chave not in self._calculadoras:
+                serie = self._serie(shopping_filter)
+                calc = None
+                if not serie.empty and 'metric_value' in serie.columns:
+                    with timed('build_kpi_index'):
+                        calc = IncrementalWBRCalculator(serie, serie['date'].iloc[-1])
+                self._calculadoras[chave] = calc
+            return self._calculadoras[chave]
+
+    def _serie(self, shopping_filter: Optional[str] = None) -> pd.DataFrame:
+        """Partição do shopping, série consolidada ("Todos") ou o frame inteiro"""
+        if self.particao is None:
+            return self.df
+        if shopping_filter:
+            return self.particao.fatia(shopping_filter)
+        return self.consolidado
+
+
+def _normalizar_referencia(date_reference: Optional[pd.Timestamp] = None) -> pd.Timestamp:
+    """Data de referência à meia-noite (default: hoje)"""
+    return pd.Timestamp(date_reference if date_reference is not None else pd.Timestamp.today()).normalize()
+
 
 
 @st.cache_resource
 def get_data_service():
-    """Cria DataService uma única vez com cache de recurso"""
-    return DataService()
+    """Cria DataService uma única vez com cache de recurso (e o pré-aquecimento, se WBR_WARMUP=true)"""
+    service = DataService()
+    if warmup_enabled():
+        start_warmup_thread(service)
+    return service
 
 
 class DataService:
@@ -22,6 +167,10 @@ class DataService:
         self.db_client = get_database_client()
         self.db_type = get_database_type()
         self.tables_config = get_table_config()
+        # Cache local em Parquet (WBR_LOCAL_CACHE=true, requer pyarrow)
+        self.local_store = ParquetTableStore(self.db_client) if local_store_enabled() else None
+        # Resolvido aqui (thread do script) para poder ser usado nas threads de carga paralela
+        self.query_cache = get_query_cache()
 
     @st.cache_data(ttl=3600, show_spinner=False)
     def get_available_date_range(_self) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
@@ -123,13 +272,17 @@ class DataService:
             print(f"DEBUG: Using default shopping list due to: {str(e)}")
             return ["SCIB", "SBGP", "SBI"]
 
-    @st.cache_data(ttl=300, show_spinner=False)
-    def load_table_data(_self, table_name: str, config: Dict[str, Any],
+    def load_table_data(self, table_name: str, config: Dict[str, Any],
                        date_reference: Optional[pd.Timestamp] = None,
                        shopping_filter: Optional[str] = None) -> Optional[pd.DataFrame]:
         """
         Carrega dados do banco de dados para uma tabela específica
 
+        Usa o cache compartilhado entre sessões: acessos simultâneos à mesma
+        (tabela, shopping, data de referência) disparam uma única query. Com
+        WBR_SUPERSET_WINDOW (padrão), a tabela é buscada uma vez na janela completa
+        e trocar a data de referência vira só um fatiamento em memória.
+
         Args:
             table_name: Nome da tabela
             config: Configuração da tabela
@@ -140,15 +293,311 @@ class DataService:
             DataFrame com os dados já filtrados ou None em caso de erro
         """
         try:
+            return self._load_table_data(table_name, config, date_reference, shopping_filter)
+        except Exception as e:
+            st.error(f"Erro ao carregar {config.get('titulo', table_name)}: {str(e)}")
+            return None
+
+    def load_tables_parallel(self, tables_config: Dict[str, Dict[str, Any]],
+                             date_reference: Optional[pd.Timestamp] = None,
+                             shopping_filter: Optional[str] = None,
+                             max_workers: Optional[int] = None) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Carrega várias tabelas ao mesmo tempo (latência = tabela mais lenta, não a soma)
+
+        Args:
+            tables_config: Dicionário {tabela: configuração}
+            date_reference: Data de referência para filtro
+            shopping_filter: Filtro de shopping
+            max_workers: Máximo de buscas simultâneas (default: DB_MAX_PARALLEL_LOADS ou 5, o pool_size)
+
+        Returns:
+            Dicionário {tabela: DataFrame ou None em caso de erro}, na ordem de tables_config
+        """
+        if not tables_config:
+            return {}
+
+        if max_workers is None:
+            max_workers = int(os.getenv("DB_MAX_PARALLEL_LOADS", "5"))
+        max_workers = max(1, min(max_workers, len(tables_config)))
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="load_table") as executor:
+            futures = {
+                table_name: executor.submit(
+                    self._load_table_data, table_name, config, date_reference, shopping_filter
+                )
+                for table_name, config in tables_config.items()
+            }
+
+        # Erros exibidos na thread do script (st.* não funciona nas threads do pool)
+        data = {}
+        for table_name, future in futures.items():
+            try:
+                data[table_name] = future.result()
+            except Exception as e:
+                config = tables_config[table_name]
+                st.error(f"Erro ao carregar {config.get('titulo', table_name)}: {str(e)}")
+                data[table_name] = None
+
+        return data
+
+    def _load_table_data(self, table_name: str, config: Dict[str, Any],
+                         date_reference: Optional[pd.Timestamp] = None,
+                         shopping_filter: Optional[str] = None) -> pd.DataFrame:
+        """
+        Carrega uma tabela pelo cache compartilhado (propaga exceções)
+
+        Args:
+            table_name: Nome da tabela
+            config: Configuração da tabela
+            date_reference: Data de referência para filtro
+            shopping_filter: Filtro de shopping
+
+        Returns:
+            DataFrame com os dados já filtrados
+        """
+        # Medições da carga (banco, datas, fatiamento) saem com tabela e shopping
+        with timing_labels(table=table_name, shopping=shopping_filter):
+            return self._load_table_data_cached(table_name, config, date_reference, shopping_filter)
+
+    def _load_table_data_cached(self, table_name: str, config: Dict[str, Any],
+                                date_reference: Optional[pd.Timestamp] = None,
+                                shopping_filter: Optional[str] = None) -> pd.DataFrame:
+        janela = self._get_table_window(table_name, config, date_reference)
+        with timed('window_slice'):
+            return janela.slice(_normalizar_referencia(date_reference), shopping_filter)
+
+    def warm_table_window(self, table_name: str, config: Dict[str, Any],
+                          date_reference: Optional[pd.Timestamp] = None) -> TableWindow:
+        """
+        Busca de novo a janela da tabela e a guarda como entrada aquecida do cache compartilhado
+
+        Usado pelo pré-aquecimento: a entrada só começa a contar o TTL na primeira
+        leitura (ver SharedQueryCache.warm). Propaga exceções.
+
+        Args:
+            table_name: Nome da tabela
+            config: Configuração da tabela
+            date_reference: Data de referência que será consultada
+
+        Returns:
+            TableWindow que cobre a data de referência
+        """
+        with timing_labels(table=table_name):
+            return self._get_table_window(table_name, config, date_reference, aquecer=True)
+
+    def _get_table_window(self, table_name: str, config: Dict[str, Any],
+                          date_reference: Optional[pd.Timestamp] = None,
+                          aquecer: bool = False) -> TableWindow:
+        """
+        TableWindow do cache compartilhado que cobre a data de referência (propaga exceções)
+
+        Args:
+            table_name: Nome da tabela
+            config: Configuração da tabela
+            date_reference: Data de referência
+            aquecer: Busca de novo e guarda como entrada aquecida (pré-aquecimento)
+
+        Returns:
+            Janela completa (WBR_SUPERSET_WINDOW) ou a janela buscada para esta referência
+        """
+        carregar = self.query_cache.warm if aquecer else self.query_cache.get_or_load
+        if superset_window_enabled():
+            janela = carregar(
+                make_cache_key('wbr_window', table_name),
+                lambda: self._fetch_table_window(table_name, config)
+            )
+            if janela.cobre(date_reference):
+                return janela
+
+        # Todos os shoppings numa única busca por data de referência; o shopping é só um fatiamento
+        ref = _normalizar_referencia(date_reference)
+        return carregar(
+            make_cache_key('wbr', table_name, None, date_reference),
+            lambda: TableWindow(
+                self._fetch_table_data(table_name, config, date_reference),
+                pd.Timestamp(year=ref.year - 1, month=1, day=1)
+            )
+        )
+
+    def get_kpi_calculator(self, table_name: str, config: Dict[str, Any],
+                           date_reference: Optional[pd.Timestamp] = None,
+                           shopping_filter: Optional[str] = None) -> Optional[IncrementalWBRCalculator]:
+        """
+        Calculadora incremental de KPIs da tabela/shopping, compartilhada entre sessões
+
+        A calculadora fica na TableWindow do cache: KPIs (.at(ref)) e semanas móveis
+        (.trailing_weeks(week_ending=ref)) de qualquer data coberta pela janela saem
+        de somas prefixadas, sem carregar nem fatiar de novo.
+
+        Args:
+            table_name: Nome da tabela
+            config: Configuração da tabela
+            date_reference: Data de referência que será consultada
+            shopping_filter: Filtro de shopping
+
+        Returns:
+            IncrementalWBRCalculator ou None se não há dados (ou em caso de erro)
+        """
+        try:
+            with timing_labels(table=table_name, shopping=shopping_filter):
+                janela = self._get_table_window(table_name, config, date_reference)
+                return janela.calculadora(shopping_filter)
+        except Exception as e:
+            logger.warning(f"Calculadora de KPIs indisponível para {table_name}: {e}")
+            return None
+
+    def _fetch_table_window(self, table_name: str, config: Dict[str, Any]) -> TableWindow:
+        """
+        Busca a janela completa de uma tabela (todos os shoppings)
+
+        Args:
+            table_name: Nome da tabela
+            config: Configuração da tabela
+
+        Returns:
+            TableWindow de janeiro de dois anos antes da última data disponível até hoje
+        """
+        inicio = inicio_janela_completa(self.db_client, config)
+
+        df = None
+        if self.local_store is not None:
+            df = self.local_store.load(table_name, config, date_start=inicio)
+        if df is None:
+            df = fetch_data_generic(
+                client=self.db_client,
+                config=config,
+                year_filter=None,
+                date_start=inicio
+            )
+
+        return TableWindow(df, inicio)
+
+    def _fetch_table_data(self, table_name: str, config: Dict[str, Any],
+                          date_reference: Optional[pd.Timestamp] = None,
+                          shopping_filter: Optional[str] = None) -> pd.DataFrame:
+        """
+        Busca os dados de uma tabela (cache local em Parquet ou banco)
+
+        Args:
+            table_name: Nome da tabela
+            config: Configuração da tabela
+            date_reference: Data de referência para filtro
+            shopping_filter: Filtro de shopping
+
+        Returns:
+            Frame preparado com os dados já filtrados
+        """
+        df = None
+        # Cache local: só busca no banco as linhas novas desde a última atualização
+        if self.local_store is not None:
+            df = self.local_store.load(
+                table_name,
+                config,
+                date_reference=date_reference,
+                shopping_filter=shopping_filter
+            )
+
+        if df is None:
             # Usa a função de busca genérica da factory com filtros
             df = fetch_data_generic(
-                client=_self.db_client,
+                client=self.db_client,
                 config=config,
                 year_filter=None,
                 shopping_filter=shopping_filter,
                 date_reference=date_reference
             )
-            return df
+
+        # Preparado uma vez aqui; o pipeline WBR usa o frame sem copiar nem converter datas
+        if df is not None and not df.empty:
+            with timed('parse_dates'):
+                df = preparar_frame(df)
+        return df
+
+    def process_wbr_batch(self, tables_config: Dict[str, Dict[str, Any]],
+                          data: Dict[str, Optional[pd.DataFrame]],
+                          data_referencia: Optional[pd.Timestamp] = None,
+                          shopping_filter: Optional[str] = None,
+                          metodo_semana: str = 'iso') -> Dict[str, Dict[str, Any]]:
+        """
+        Processa os blocos WBR de todas as tabelas em lote
+
+        Args:
+            tables_config: Dicionário {tabela: configuração}
+            data: DataFrames por tabela (saída de load_tables_parallel; vazio com pushdown)
+            data_referencia: Data de referência
+            shopping_filter: Filtro de shopping
+            metodo_semana: 'iso' ou 'travelling'
+
+        Returns:
+            Dicionário {tabela: dados processados}; vazio se não houver data de referência
+        """
+        # Pushdown: semanas/meses agregados no banco (WBR_AGGREGATION_PUSHDOWN=true); data é ignorado
+        if aggregation_pushdown_enabled():
+            processed = {}
+            for table_name, config in tables_config.items():
+                dados = self.load_table_aggregated(
+                    table_name,
+                    config,
+                    date_reference=data_referencia,
+                    shopping_filter=shopping_filter,
+                    metodo_semana=metodo_semana
+                )
+                if dados:
+                    processed[table_name] = dados
+            return processed
+
+        frames = [
+            df[['date', 'metric_value']].assign(table=table_name)
+            for table_name, df in data.items()
+            if df is not None and not df.empty
+        ]
+
+        # Sem data de referência cada tabela usa sua própria última data: mantém o cálculo individual
+        if data_referencia is None or not frames:
+            return {}
+
+        try:
+            with timed('processar_dados_wbr', table='lote', shopping=shopping_filter):
+                resultado = processar_dados_wbr_multi(
+                    pd.concat(frames, ignore_index=True),
+                    data_referencia,
+                    keys=['table'],
+                    metodo_semana=metodo_semana
+                )
+        except Exception:
+            # Em caso de falha, cada gráfico recalcula (e reporta) individualmente
+            logger.exception("Falha no processamento WBR em lote; cada gráfico será recalculado")
+            return {}
+
+        return {chave[0]: dados for chave, dados in resultado.items()}
+
+    @st.cache_data(ttl=300, show_spinner=False)
+    def load_table_aggregated(_self, table_name: str, config: Dict[str, Any],
+                              date_reference: Optional[pd.Timestamp] = None,
+                              shopping_filter: Optional[str] = None,
+                              metodo_semana: str = 'iso') -> Dict[str, Any]:
+        """
+        Carrega semanas/meses de uma tabela já agregados no banco (pushdown)
+
+        Args:
+            table_name: Nome da tabela
+            config: Configuração da tabela
+            date_reference: Data de referência (default: última data disponível)
+            shopping_filter: Filtro de shopping
+            metodo_semana: 'iso' ou 'travelling'
+
+        Returns:
+            Dicionário no formato de processar_dados_wbr ou vazio em caso de erro
+        """
+        try:
+            return fetch_wbr_aggregated_generic(
+                client=_self.db_client,
+                config=config,
+                shopping_filter=shopping_filter,
+                date_reference=date_reference,
+                metodo_semana=metodo_semana
+            )
         except Exception as e:
-            st.error(f"Erro ao carregar {config.get('titulo', table_name)}: {str(e)}")
-            return None
\ No newline at end of file
+            st.error(f"Erro ao agregar {config.get('titulo', table_name)}: {str(e)}")
+            return {}
@@ -0,0 +1,180 @@
+"""
+Cache das figuras Plotly prontas, chaveado pelo conteúdo dos dados processados
+
+A figura é guardada como objeto (já validado na montagem): st.plotly_chart recebe
+um go.Figure e só o serializa, sem a revalidação que um dict dispararia a cada rerun
+(o Streamlit não aceita o JSON pronto). Como o objeto é compartilhado entre sessões,
+ele nunca sai deste módulo: render_wbr_figure o exibe e warm_wbr_figure só o monta.
+"""
+import hashlib
+import os
+from decimal import Decimal
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from src.core.wbr import montar_figura_wbr
+from src.services.query_cache import SharedQueryCache
+from src.utils.timing import timed
+
+
+def hash_conteudo(valor: Any) -> str:
+    """
+    Hash estável do conteúdo dos dados processados (dicts, DataFrames, Series e escalares)
+
+    Dois resultados de processar_dados_wbr com os mesmos valores geram o mesmo hash,
+    independentemente de terem sido calculados em reruns ou sessões diferentes.
+
+    Args:
+        valor: Dados processados (ver processar_dados_wbr)
+
+    Returns:
+        Digest hexadecimal
+    """
+    h = hashlib.blake2b(digest_size=16)
+
+    def _update(v: Any):
+        if isinstance(v, dict):
+            h.update(b'{')
+            for chave in sorted(v, key=str):
+                h.update(str(chave).encode())
+                _update(v[chave])
+            h.update(b'}')
+        elif isinstance(v, (list, tuple)):
+            h.update(b'[')
+            for item in v:
+                _update(item)
+            h.update(b']')
+        elif isinstance(v, pd.DataFrame):
+            h.update(b'DF')
+            h.update(repr([(str(c), str(t)) for c, t in v.dtypes.items()]).encode())
+            h.update(pd.util.hash_pandas_object(v, index=True).to_numpy().tobytes())
+        elif isinstance(v, pd.Series):
+            h.update(b'S')
+            h.update(f"{v.name}:{v.dtype}".encode())
+            h.update(pd.util.hash_pandas_object(v, index=True).to_numpy().tobytes())
+        elif isinstance(v, np.ndarray):
+            h.update(f"A{v.dtype}{v.shape}".encode())
+            h.update(np.ascontiguousarray(v).tobytes())
+        elif isinstance(v, (pd.Timestamp, np.generic, Decimal)):
+            h.update(f"{type(v).__name__}:{v}".encode())
+        else:
+            h.update(f"{type(v).__name__}:{v!r}".encode())
+
+    _update(valor)
+    return h.hexdigest()
+
+
+def make_figure_key(dados: Any, titulo: str, unidade: str,
+                    data_referencia: Any, metodo_semana: str) -> Tuple:
+    """
+    Chave do cache de figuras: conteúdo dos dados + parâmetros de renderização
+
+    Args:
+        dados: Dados processados usados no gráfico
+        titulo: Título do gráfico
+        unidade: Unidade de medida
+        data_referencia: Data de referência
+        metodo_semana: 'iso' ou 'travelling'
+
+    Returns:
+        Tupla hashável
+    """
+    if data_referencia is not None:
+        data_referencia = pd.Timestamp(data_referencia).isoformat()
+    return ('figure', hash_conteudo(dados), titulo, unidade, data_referencia, metodo_semana)
+
+
+@st.cache_resource
+def get_figure_cache() -> SharedQueryCache:
+    """Cria o cache de figuras uma única vez por processo (LRU, compartilhado entre sessões)"""
+    return SharedQueryCache(
+        max_entries=int(os.getenv("FIGURE_CACHE_MAX_ENTRIES", "64")),
+        max_bytes=int(os.getenv("FIGURE_CACHE_MAX_MB", "64")) * 1024 * 1024,
+        # A chave é o próprio conteúdo: a figura só muda se os dados mudarem
+        ttl_seconds=float(os.getenv("FIGURE_CACHE_TTL_SECONDS", "86400"))
+    )
+
+
+# Estimativa de memória da figura, sem serializá-la: cada valor dos arrays dos traces
+# é um objeto Python (float/str/Timestamp) mais a referência na tupla do Plotly
+_BYTES_POR_VALOR = 64
+_BYTES_POR_TRACE = 2 * 1024
+# Layout e metadados (o template é compartilhado entre as figuras, ver wbr_charts_modular)
+_BYTES_LAYOUT = 16 * 1024
+_ARRAYS_DO_TRACE = ('x', 'y', 'text', 'customdata', 'hovertext')
+
+
+def _estimar_bytes(figura: go.Figure) -> int:
+    """Tamanho aproximado da figura em memória, pelo número de valores dos traces"""
+    valores = 0
+    for trace in figura.data:
+        for nome in _ARRAYS_DO_TRACE:
+            valor = trace[nome] if nome in trace else None
+            if valor is not None and not isinstance(valor, str) and hasattr(valor, '__len__'):
+                valores += len(valor)
+    return _BYTES_LAYOUT + len(figura.data) * _BYTES_POR_TRACE + valores * _BYTES_POR_VALOR
+
+
+class FiguraCacheada:
+    """Figura Plotly do cache, com o tamanho estimado para o limite de bytes do LRU"""
+
+    __slots__ = ('figura', 'nbytes')
+
+    def __init__(self, figura: go.Figure):
+        self.figura = figura
+        self.nbytes = _estimar_bytes(figura)
+
+
+def _figura_wbr(dados: Dict[str, Any], titulo: str, unidade: str,
+                data_referencia: pd.Timestamp, metodo_semana: str, aquecer: bool = False) -> go.Figure:
+    """Figura WBR compartilhada do cache (montada só se não estiver nele); não sai deste módulo"""
+    cache = get_figure_cache()
+    carregar = cache.warm if aquecer else cache.get_or_load
+    return carregar(
+        make_figure_key(dados, titulo, unidade, data_referencia, metodo_semana),
+        lambda: FiguraCacheada(montar_figura_wbr(dados, titulo, unidade, data_referencia))
+    ).figura
+
+
+def render_wbr_figure(dados: Dict[str, Any], titulo: str, unidade: str,
+                      data_referencia: pd.Timestamp, metodo_semana: str, **kwargs) -> None:
+    """
+    Exibe a figura WBR com st.plotly_chart, montando-a só se não estiver no cache
+
+    A figura é compartilhada entre sessões, por isso não é devolvida ao chamador:
+    st.plotly_chart só a lê (to_dict faz a própria cópia antes de serializar).
+    Um go.Figure é serializado sem revalidação; um dict seria revalidado a cada rerun.
+
+    Args:
+        dados: Dados processados (ver preparar_dados_wbr)
+        titulo: Título do gráfico
+        unidade: Unidade de medida
+        data_referencia: Data de referência
+        metodo_semana: 'iso' ou 'travelling'
+        **kwargs: Repassados para st.plotly_chart (width, key, ...)
+    """
+    figura = _figura_wbr(dados, titulo, unidade, data_referencia, metodo_semana)
+    with timed('plotly_chart'):
+        st.plotly_chart(figura, **kwargs)
+
+
+def warm_wbr_figure(dados: Dict[str, Any], titulo: str, unidade: str,
+                    data_referencia: pd.Timestamp, metodo_semana: str) -> None:
+    """
+    Monta a figura WBR no cache sem exibi-la (pré-aquecimento)
+
+    Usa as mesmas chaves de render_wbr_figure; a entrada aquecida só começa a
+    expirar quando for exibida pela primeira vez (ver SharedQueryCache.warm).
+
+    Args:
+        dados: Dados processados (ver preparar_dados_wbr)
+        titulo: Título do gráfico
+        unidade: Unidade de medida
+        data_referencia: Data de referência
+        metodo_semana: 'iso' ou 'travelling'
+    """
+    _figura_wbr(dados, titulo, unidade, data_referencia, metodo_semana, aquecer=True)
@@ -1,8 +1,9 @@
 """
 Serviço de filtros - Aplicação de filtros em DataFrames
 """
-from typing import Optional
+from typing import Optional, Union
 import pandas as pd
+from src.core.prepared_frame import FrameParticionado, frame_preparado
 
 
 class FilterService:
@@ -10,7 +11,7 @@ class FilterService:
 
     @staticmethod
     def apply_filters(
-        df: pd.DataFrame,
+        df: Union[pd.DataFrame, FrameParticionado],
         date_start: Optional[pd.Timestamp] = None,
         date_end: Optional[pd.Timestamp] = None,
         year_filter: Optional[int] = None,
@@ -20,7 +21,8 @@ class FilterService:
         Aplica filtros ao dataframe
 
         Args:
-            df: DataFrame a ser filtrado
+            df: DataFrame a ser filtrado ou FrameParticionado (ex: TableWindow.particao);
+                com a partição o filtro de shopping é uma fatia por posição, sem varrer a tabela
             date_start: Data inicial do período
             date_end: Data final do período
             year_filter: Filtro de ano (usado se datas não especificadas)
@@ -29,16 +31,16 @@ class FilterService:
         Returns:
             DataFrame filtrado
         """
+        if isinstance(df, FrameParticionado):
+            df = FilterService.apply_shopping_filter(df, shopping_filter)
+            shopping_filter = None
+
         if df is None or df.empty:
             return df
 
-        # Aplica filtro de intervalo de datas
+        # Aplica filtro de intervalo de datas (sem alterar df, que pode vir do cache compartilhado)
         if date_start and date_end:
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-                df = df[(df['date'] >= date_start) & (df['date'] <= date_end)]
-            elif isinstance(df.index, pd.DatetimeIndex):
-                df = df[(df.index >= date_start) & (df.index <= date_end)]
+            df = FilterService._filtrar_periodo(df, date_start, date_end)
 
         # Aplica filtro de ano (se nenhum intervalo de datas especificado)
         elif year_filter:
@@ -74,33 +76,46 @@ class FilterService:
             return df
 
         if date_start and date_end:
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-                df = df[(df['date'] >= date_start) & (df['date'] <= date_end)]
-            elif isinstance(df.index, pd.DatetimeIndex):
-                df = df[(df.index >= date_start) & (df.index <= date_end)]
+            df = FilterService._filtrar_periodo(df, date_start, date_end)
 
         return df
 
     @staticmethod
     def apply_shopping_filter(
-        df: pd.DataFrame,
+        df: Union[pd.DataFrame, FrameParticionado],
         shopping: Optional[str] = None
     ) -> pd.DataFrame:
         """
         Aplica filtro de shopping ao DataFrame
 
         Args:
-            df: DataFrame a ser filtrado
+            df: DataFrame a ser filtrado ou FrameParticionado (fatia por posição)
             shopping: Nome do shopping
 
         Returns:
             DataFrame filtrado por shopping
         """
+        if isinstance(df, FrameParticionado):
+            return df.fatia(shopping) if shopping else df.frame
+
         if df is None or df.empty or not shopping:
             return df
 
         if 'shopping' in df.columns:
             df = df[df['shopping'] == shopping]
 
-        return df
\ No newline at end of file
+        return df
+
+    @staticmethod
+    def _filtrar_periodo(df: pd.DataFrame, date_start: pd.Timestamp, date_end: pd.Timestamp) -> pd.DataFrame:
+        """Linhas entre as datas; num frame preparado é uma busca binária no índice (fatia sem cópia)"""
+        if frame_preparado(df):
+            i = df.index.searchsorted(pd.Timestamp(date_start), side='left')
+            j = df.index.searchsorted(pd.Timestamp(date_end), side='right')
+            return df.iloc[i:j]
+        if 'date' in df.columns:
+            datas = pd.to_datetime(df['date'])
+            return df[((datas >= date_start) & (datas <= date_end)).to_numpy()]
+        if isinstance(df.index, pd.DatetimeIndex):
+            return df[(df.index >= date_start) & (df.index <= date_end)]
+        return df
@@ -7,6 +7,8 @@ import streamlit as st
 import os
 from src.clients.database.supabase_postgres import SupabaseClient
 from src.services.filter_service import FilterService
+from src.services.query_cache import get_query_cache, make_cache_key
+from src.utils.timing import timed, timing_labels
 
 
 class InstagramService:
@@ -33,9 +35,8 @@ class InstagramService:
         """Verifica se está conectado ao Supabase"""
         return self.connected
 
-    @st.cache_data(ttl=300, show_spinner=False)
     def load_engagement_data(
-        _self,
+        self,
         date_start: str,
         date_end: str,
         shopping_filter: Optional[str] = None
@@ -51,20 +52,27 @@ class InstagramService:
         Returns:
             DataFrame com dados de engajamento
         """
-        if not _self.connected or not _self.supabase_client:
+        if not self.connected or not self.supabase_client:
             return pd.DataFrame()
 
         try:
-            df = _self.supabase_client.get_engagement_data(
-                date_start=date_start,
-                date_end=date_end,
-                shopping_filter=shopping_filter
-            )
+            # Cache compartilhado entre sessões (uma única query por chave em andamento)
+            key = make_cache_key('instagram_engagement', 'instagram', shopping_filter, date_end, date_start)
+            with timing_labels(table='instagram_engagement', shopping=shopping_filter):
+                df = get_query_cache().get_or_load(
+                    key,
+                    lambda: self.supabase_client.get_engagement_data(
+                        date_start=date_start,
+                        date_end=date_end,
+                        shopping_filter=shopping_filter
+                    )
+                )
 
             if not df.empty:
-                df['data'] = pd.to_datetime(df['data'])
+                with timed('parse_dates', table='instagram_engagement', shopping=shopping_filter):
+                    df['data'] = pd.to_datetime(df['data'])
                 # Aplicar filtros adicionais se necessário
-                df = _self.filter_service.apply_filters(
+                df = self.filter_service.apply_filters(
                     df,
                     date_start=pd.Timestamp(date_start),
                     date_end=pd.Timestamp(date_end),
@@ -76,9 +84,8 @@ class InstagramService:
             st.error(f"Erro ao carregar dados de engajamento: {str(e)}")
             return pd.DataFrame()
 
-    @st.cache_data(ttl=300, show_spinner=False)
     def load_post_count_data(
-        _self,
+        self,
         date_start: str,
         date_end: str,
         shopping_filter: Optional[str] = None
@@ -94,22 +101,29 @@ class InstagramService:
         Returns:
             DataFrame com contagem de posts
         """
-        if not _self.connected or not _self.supabase_client:
+        if not self.connected or not self.supabase_client:
             return pd.DataFrame()
 
         try:
-            df = _self.supabase_client.get_post_count_data(
-                date_start=date_start,
-                date_end=date_end,
-                shopping_filter=shopping_filter
-            )
+            # Cache compartilhado entre sessões (uma única query por chave em andamento)
+            key = make_cache_key('instagram_post_count', 'instagram', shopping_filter, date_end, date_start)
+            with timing_labels(table='instagram_post_count', shopping=shopping_filter):
+                df = get_query_cache().get_or_load(
+                    key,
+                    lambda: self.supabase_client.get_post_count_data(
+                        date_start=date_start,
+                        date_end=date_end,
+                        shopping_filter=shopping_filter
+                    )
+                )
 
             if not df.empty:
-                df['data'] = pd.to_datetime(df['data'])
+                with timed('parse_dates', table='instagram_post_count', shopping=shopping_filter):
+                    df['data'] = pd.to_datetime(df['data'])
                 # Renomeia colunas para compatibilidade
                 df.columns = ['shopping', 'data', 'total_posts']
                 # Aplicar filtros adicionais
-                df = _self.filter_service.apply_filters(
+                df = self.filter_service.apply_filters(
                     df,
                     date_start=pd.Timestamp(date_start),
                     date_end=pd.Timestamp(date_end),
@@ -121,6 +135,43 @@ class InstagramService:
             st.error(f"Erro ao carregar contagem de posts: {str(e)}")
             return pd.DataFrame()
 
+    def warm_cache(
+        self,
+        date_start: str,
+        date_end: str,
+        shopping_filter: Optional[str] = None
+    ) -> None:
+        """
+        Busca engajamento e contagem de posts e os guarda como entradas aquecidas
+
+        Mesmas chaves de load_engagement_data e load_post_count_data; usado pelo
+        pré-aquecimento, fora de uma execução do script (propaga exceções em vez
+        de exibi-las com st.error).
+
+        Args:
+            date_start: Data inicial (formato YYYY-MM-DD)
+            date_end: Data final (formato YYYY-MM-DD)
+            shopping_filter: Filtro de shopping opcional
+        """
+        if not self.connected or not self.supabase_client:
+            return
+
+        cache = get_query_cache()
+        consultas = (
+            ('instagram_engagement', self.supabase_client.get_engagement_data),
+            ('instagram_post_count', self.supabase_client.get_post_count_data)
+        )
+        for tipo, buscar in consultas:
+            with timing_labels(table=tipo, shopping=shopping_filter):
+                cache.warm(
+                    make_cache_key(tipo, 'instagram', shopping_filter, date_end, date_start),
+                    lambda: buscar(
+                        date_start=date_start,
+                        date_end=date_end,
+                        shopping_filter=shopping_filter
+                    )
+                )
+
     def get_shopping_colors(self) -> Dict[str, str]:
         """
         Retorna mapeamento de cores para cada shopping
@@ -0,0 +1,277 @@
+"""
+Cache local colunar (Parquet) das tabelas WBR com atualização incremental
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+import pandas as pd
+
+from src.clients.database.factory import fetch_data_generic, inicio_janela_completa, qualified_table_name
+from src.clients.database.schema import normalizar_tipos_wbr
+from src.config.settings import DATA_DIR
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Partição usada quando a tabela não tem coluna de shopping
+SEM_SHOPPING = '_todos'
+
+
+def local_store_enabled() -> bool:
+    """Verifica se o cache local em Parquet está habilitado e disponível"""
+    return PYARROW_AVAILABLE and os.getenv("WBR_LOCAL_CACHE", "false").lower() == "true"
+
+
+class ParquetTableStore:
+    """
+    Armazena as tabelas WBR em disco, uma partição Parquet por shopping e mês:
+
+        <raiz>/<tabela>/shopping=<shopping>/<AAAA-MM>.parquet
+
+    A primeira carga busca desde janeiro de dois anos antes da última data (a mesma
+    janela completa usada pelo DataService); as seguintes buscam só
+    as linhas a partir de max(data em cache) menos uma janela de re-sincronização
+    e regravam apenas os meses afetados. As leituras usam memory-map.
+    """
+
+    def __init__(self, client, root: Optional[Path] = None,
+                 resync_days: Optional[int] = None,
+                 refresh_seconds: Optional[int] = None):
+        """
+        Args:
+            client: Cliente de banco (SupabaseClient)
+            root: Diretório raiz do cache (default: WBR_LOCAL_CACHE_DIR ou data/cache)
+            resync_days: Dias re-buscados antes da última data em cache (default: 3)
+            refresh_seconds: Intervalo mínimo entre atualizações incrementais (default: 300)
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for the local cache. Install with: pip install pyarrow")
+
+        self.client = client
+        self.root = Path(root or os.getenv("WBR_LOCAL_CACHE_DIR", DATA_DIR / "cache"))
+        self.resync_days = resync_days if resync_days is not None else int(os.getenv("WBR_LOCAL_CACHE_RESYNC_DAYS", "3"))
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else int(os.getenv("WBR_LOCAL_CACHE_REFRESH_SECONDS", "300"))
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def load(self, table_name: str, config: Dict[str, Any],
+             date_reference: Optional[pd.Timestamp] = None,
+             shopping_filter: Optional[str] = None,
+             date_start: Optional[pd.Timestamp] = None) -> Optional[pd.DataFrame]:
+        """
+        Retorna os dados da janela WBR (janeiro do ano anterior até a referência)
+
+        Args:
+            table_name: Nome lógico da tabela ('pessoas', 'veiculos', 'vendas')
+            config: Configuração da tabela
+            date_reference: Data de referência (default: hoje)
+            shopping_filter: Filtro de shopping
+            date_start: Data inicial (default: 1º de janeiro do ano anterior à referência)
+
+        Returns:
+            DataFrame no formato de fetch_wbr_data ou None se o cache não cobre a janela
+        """
+        ref = pd.Timestamp(date_reference or pd.Timestamp.today()).normalize()
+        start = pd.Timestamp(date_start) if date_start is not None else pd.Timestamp(year=ref.year - 1, month=1, day=1)
+
+        meta = self.refresh(table_name, config)
+        if meta is None or pd.Timestamp(meta['inicio']) > start:
+            return None
+
+        df = self._read(table_name, start, ref, shopping_filter)
+        # Mesma chave do relatório de tipos usada por fetch_data_generic
+        df = normalizar_tipos_wbr(df, qualified_table_name(config))
+        logger.info(f"Local cache: {len(df)} rows for {table_name} ({start.date()} - {ref.date()})")
+        return df
+
+    def refresh(self, table_name: str, config: Dict[str, Any], force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Atualiza o cache de uma tabela de forma incremental
+
+        Args:
+            table_name: Nome lógico da tabela
+            config: Configuração da tabela
+            force: Ignora o intervalo mínimo entre atualizações
+
+        Returns:
+            Metadados do cache (inicio, fim, atualizado_em) ou None em caso de erro
+        """
+        with self._lock_for(table_name):
+            meta = self._read_meta(table_name)
+            if meta and not force and time.time() - meta['atualizado_em'] < self.refresh_seconds:
+                return meta
+
+            try:
+                if meta and meta.get('fim'):
+                    # Incremental: re-sincroniza os últimos dias para pegar correções
+                    since = pd.Timestamp(meta['fim']) - pd.Timedelta(days=self.resync_days)
+                    inicio = meta['inicio']
+                else:
+                    since = inicio_janela_completa(self.client, config)
+                    inicio = since.strftime('%Y-%m-%d')
+
+                # Erro do banco vira exceção: um DataFrame vazio aqui significa "sem linhas novas"
+                df = fetch_data_generic(
+                    client=self.client,
+                    config=config,
+                    date_start=since,
+                    raise_errors=True
+                )
+                if df is None or (df.empty and not meta):
+                    # Carga inicial vazia: não grava metadados, a próxima chamada tenta de novo
+                    logger.warning(f"Local cache: nenhuma linha para {table_name} desde {since.date()}")
+                    return meta
+
+                fim = self._write(table_name, df, since)
+                meta = {
+                    'inicio': inicio,
+                    'fim': (fim or pd.Timestamp(meta['fim'] if meta else since)).strftime('%Y-%m-%d'),
+                    'atualizado_em': time.time()
+                }
+                self._write_meta(table_name, meta)
+                logger.info(f"Local cache: refreshed {table_name} with {len(df)} rows since {since.date()}")
+                return meta
+
+            except Exception as e:
+                logger.error(f"Erro ao atualizar cache local de {table_name}: {str(e)}")
+                return meta
+
+    def clear(self, table_name: Optional[str] = None):
+        """
+        Remove o cache de uma tabela (ou de todas)
+
+        Args:
+            table_name: Nome lógico da tabela (default: todas)
+        """
+        import shutil
+
+        alvo = self.root / table_name if table_name else self.root
+        if alvo.exists():
+            shutil.rmtree(alvo)
+
+    # ------------------------------------------------------------------
+    # Leitura / escrita das partições
+    # ------------------------------------------------------------------
+
+    def _lock_for(self, table_name: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(table_name, threading.Lock())
+
+    def _partitions(self, table_name: str, start: pd.Timestamp, end: pd.Timestamp,
+                    shopping_filter: Optional[str] = None) -> List[Path]:
+        """Lista os arquivos de partição que cobrem [start, end]"""
+        meses = {p.strftime('%Y-%m') for p in pd.period_range(start, end, freq='M')}
+        base = self.root / table_name
+        if shopping_filter:
+            pastas = [base / f"shopping={shopping_filter}"]
+        else:
+            pastas = sorted(base.glob("shopping=*"))
+        return [
+            arquivo
+            for pasta in pastas if pasta.is_dir()
+            for arquivo in sorted(pasta.glob("*.parquet"))
+            if arquivo.stem in meses
+        ]
+
+    def _read(self, table_name: str, start: pd.Timestamp, end: pd.Timestamp,
+              shopping_filter: Optional[str] = None) -> pd.DataFrame:
+        arquivos = self._partitions(table_name, start, end, shopping_filter)
+        if not arquivos:
+            return pd.DataFrame(columns=['date', 'metric_value'])
+
+        tabela = pa.concat_tables(
+            [pq.read_table(arquivo, memory_map=True) for arquivo in arquivos],
+            promote_options='default'
+        )
+        df = tabela.to_pandas()
+        df = df[(df['date'] >= start) & (df['date'] <= end)]
+
+        # Tabelas sem coluna de shopping voltam no mesmo formato de fetch_wbr_data
+        if (df['shopping'] == SEM_SHOPPING).all():
+            df = df.drop(columns=['shopping'])
+
+        return df.sort_values('date', ascending=False, kind='stable').reset_index(drop=True)
+
+    def _write(self, table_name: str, df: pd.DataFrame, since: pd.Timestamp) -> Optional[pd.Timestamp]:
+        """
+        Regrava os meses afetados: mantém as linhas anteriores a `since` e substitui o resto
+
+        Returns:
+            Maior data presente nos dados novos (ou None se vazio)
+        """
+        df = df.copy()
+        if df.empty:
+            return None
+
+        df['date'] = pd.to_datetime(df['date'])
+        # float64 em todas as partições evita conflito de schema (int vs float) na leitura
+        df['metric_value'] = pd.to_numeric(df['metric_value'], errors='coerce').astype('float64')
+        if 'shopping' not in df.columns:
+            df['shopping'] = SEM_SHOPPING
+        # object antes do fillna: shopping pode vir como category (normalizar_tipos_wbr)
+        df['shopping'] = df['shopping'].astype(object).fillna(SEM_SHOPPING).astype(str)
+        df['_mes'] = df['date'].dt.strftime('%Y-%m')
+
+        # Meses tocados pela re-sincronização, mesmo que venham vazios do banco
+        meses = {p.strftime('%Y-%m') for p in pd.period_range(since, df['date'].max(), freq='M')}
+        base = self.root / table_name
+        shoppings = set(df['shopping']) | {p.name.split('=', 1)[1] for p in base.glob("shopping=*")}
+
+        for shopping in shoppings:
+            pasta = base / f"shopping={shopping}"
+            novos_shopping = df[df['shopping'] == shopping]
+            for mes in meses:
+                novos = novos_shopping[novos_shopping['_mes'] == mes].drop(columns=['_mes'])
+                arquivo = pasta / f"{mes}.parquet"
+
+                if arquivo.exists():
+                    antigos = pq.read_table(arquivo).to_pandas()
+                    antigos = antigos[antigos['date'] < since]
+                    novos = pd.concat([antigos, novos], ignore_index=True) if not antigos.empty else novos
+
+                if novos.empty:
+                    if arquivo.exists():
+                        arquivo.unlink()
+                    continue
+
+                pasta.mkdir(parents=True, exist_ok=True)
+                # Escrita atômica: grava em arquivo temporário e renomeia
+                temporario = arquivo.with_suffix('.parquet.tmp')
+                pq.write_table(pa.Table.from_pandas(novos, preserve_index=False), temporario)
+                os.replace(temporario, arquivo)
+
+        return df['date'].max()
+
+    def _meta_path(self, table_name: str) -> Path:
+        return self.root / table_name / "_meta.json"
+
+    def _read_meta(self, table_name: str) -> Optional[Dict[str, Any]]:
+        caminho = self._meta_path(table_name)
+        if not caminho.exists():
+            return None
+        try:
+            return json.loads(caminho.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, table_name: str, meta: Dict[str, Any]):
+        caminho = self._meta_path(table_name)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_suffix('.json.tmp')
+        temporario.write_text(json.dumps(meta))
+        os.replace(temporario, caminho)
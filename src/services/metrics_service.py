@@ -4,8 +4,9 @@ Serviço de métricas - Cálculo de KPIs e métricas
 from typing import Dict, Any, Optional
 import pandas as pd
 import streamlit as st
-from src.core.wbr_metrics import calcular_kpis
+from src.core.wbr_metrics import calcular_kpis, IncrementalWBRCalculator
 from src.core.wbr import calcular_metricas_wbr
+from src.utils.timing import timed
 
 
 class MetricsService:
@@ -14,7 +15,8 @@ class MetricsService:
     @staticmethod
     def calculate_kpis(
         df: pd.DataFrame,
-        data_referencia: pd.Timestamp
+        data_referencia: pd.Timestamp,
+        calculadora: Optional[IncrementalWBRCalculator] = None
     ) -> Dict[str, Any]:
         """
         Calcula KPIs principais
@@ -22,10 +24,19 @@ class MetricsService:
         Args:
             df: DataFrame com os dados
             data_referencia: Data de referência para cálculos
+            calculadora: Calculadora incremental da tabela (DataService.get_kpi_calculator);
+                quando informada, os KPIs saem de .at(data_referencia) sem recalcular as janelas
 
         Returns:
             Dicionário com KPIs calculados
         """
+        if calculadora is not None:
+            try:
+                with timed('kpis'):
+                    return calculadora.at(data_referencia)
+            except Exception as e:
+                st.error(f"Erro ao calcular KPIs: {str(e)}")
+
         if df is None or df.empty:
             return {
                 'yoy_pct': 0,
@@ -37,7 +48,8 @@ class MetricsService:
             }
 
         try:
-            return calcular_kpis(df, data_referencia=data_referencia)
+            with timed('kpis'):
+                return calcular_kpis(df, data_referencia=data_referencia)
         except Exception as e:
             st.error(f"Erro ao calcular KPIs: {str(e)}")
             return {
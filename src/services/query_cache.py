@@ -0,0 +1,243 @@
+"""
+Cache compartilhado de resultados de query - único por processo, com single-flight
+"""
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(kind: str, table: str, shopping: Optional[str] = None,
+                   date_reference: Any = None, *extra: Any) -> Tuple:
+    """
+    Normaliza a chave do cache: (tipo, tabela, shopping, data de referência, ...)
+
+    Args:
+        kind: Tipo de consulta (ex: 'wbr', 'instagram_engagement')
+        table: Nome lógico da tabela
+        shopping: Filtro de shopping ("Todos"/vazio viram None)
+        date_reference: Data de referência (str, date ou Timestamp) normalizada para YYYY-MM-DD
+        *extra: Componentes adicionais da chave
+
+    Returns:
+        Tupla hashável
+    """
+    if not shopping or shopping == "Todos":
+        shopping = None
+
+    if date_reference is not None and not (isinstance(date_reference, float) and pd.isna(date_reference)):
+        date_reference = pd.Timestamp(date_reference).strftime('%Y-%m-%d')
+    else:
+        date_reference = None
+
+    return (kind, table, shopping, date_reference) + tuple(extra)
+
+
+def _estimate_size(value: Any) -> int:
+    """Estima o tamanho em bytes de um valor cacheado"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    # Objetos que informam o próprio tamanho (ex.: TableWindow)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+# Validade das entradas aquecidas até a primeira leitura
+_AQUECIDA = math.inf
+
+
+class _Flight:
+    """Busca em andamento para uma chave (compartilhada entre os chamadores)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SharedQueryCache:
+    """
+    Cache LRU de resultados de query compartilhado entre todas as sessões.
+
+    - Single-flight: só uma busca por chave em andamento; os demais chamadores
+      esperam o mesmo resultado em vez de repetir a query.
+    - Eviction por número de entradas, por bytes totais e por TTL.
+    - Entradas aquecidas (warm) só começam a contar o TTL na primeira leitura.
+    - Contadores de hits, misses, esperas em voo e evictions.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 512 * 1024 * 1024,
+                 ttl_seconds: float = 300):
+        """
+        Args:
+            max_entries: Número máximo de entradas
+            max_bytes: Tamanho máximo total (estimado) em bytes
+            ttl_seconds: Tempo de vida de cada entrada
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Retorna o valor em cache ou executa `loader` uma única vez para a chave
+
+        Args:
+            key: Chave normalizada (ver make_cache_key)
+            loader: Função sem argumentos que busca o valor; exceções não são cacheadas
+
+        Returns:
+            Valor (DataFrames são devolvidos como cópia)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires = entry
+                agora = time.monotonic()
+                if expires > agora:
+                    if expires == _AQUECIDA:
+                        # Primeira leitura de uma entrada aquecida: começa a contar o TTL
+                        self._entries[key] = (value, size, agora + self.ttl_seconds)
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._copy(value)
+                self._remove(key)
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.misses += 1
+            else:
+                self.waits += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._copy(flight.value)
+
+        try:
+            flight.value = loader()
+            self._store(key, flight.value)
+            return self._copy(flight.value)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def warm(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Executa `loader` e guarda o valor como entrada aquecida (pré-aquecimento)
+
+        Substitui a entrada atual da chave, já que cada aquecimento traz dados novos.
+        A entrada não expira enquanto não for lida: o TTL começa na primeira leitura,
+        então o que foi aquecido de madrugada ainda é hit no horário comercial.
+        Continua sujeita à eviction por número de entradas e bytes.
+
+        Args:
+            key: Chave normalizada (ver make_cache_key)
+            loader: Função sem argumentos que busca o valor; exceções são propagadas
+
+        Returns:
+            Valor (DataFrames são devolvidos como cópia)
+        """
+        value = loader()
+        self._store(key, value, expires=_AQUECIDA)
+        return self._copy(value)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Remove uma entrada (ou todas)
+
+        Args:
+            key: Chave a remover (default: limpa o cache)
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif key in self._entries:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna contadores e ocupação do cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'waits': self.waits,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'in_flight': len(self._flights)
+            }
+
+    def _store(self, key: Hashable, value: Any, expires: Optional[float] = None):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            logger.info(f"Query cache: value for {key} ({size} bytes) exceeds max_bytes, not cached")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if expires is None:
+                expires = time.monotonic() + self.ttl_seconds
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+
+            # LRU: remove as entradas menos usadas até caber nos limites
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        # Cada sessão recebe sua cópia para não alterar o valor compartilhado
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return value.copy()
+        return value
+
+
+@st.cache_resource
+def get_query_cache() -> SharedQueryCache:
+    """Cria o cache compartilhado uma única vez por processo"""
+    return SharedQueryCache(
+        max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "128")),
+        max_bytes=int(os.getenv("QUERY_CACHE_MAX_MB", "512")) * 1024 * 1024,
+        ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+    )
@@ -0,0 +1,284 @@
+"""
+Pré-aquecimento dos caches antes do horário comercial
+
+Carrega, para a data de referência padrão da sidebar (última data com dados),
+todas as combinações de tabela, shopping (incluindo "Todos") e método de semana:
+janelas das tabelas no cache compartilhado, blocos WBR, figuras Plotly e os
+DataFrames de engajamento/posts do Instagram. Assim o primeiro acesso do dia
+encontra os caches no mesmo estado do décimo.
+
+As entradas aquecidas só começam a contar o TTL na primeira leitura (ver
+SharedQueryCache.warm): o aquecimento de madrugada continua valendo quando o
+horário comercial começa, qualquer que seja QUERY_CACHE_TTL_SECONDS. A rotina
+roda fora de uma execução do script e por isso não chama os métodos do
+DataService com st.cache_data: data de referência, período e shoppings saem
+das próprias janelas aquecidas.
+
+Dentro do servidor Streamlit roda numa thread em segundo plano iniciada por
+get_data_service (WBR_WARMUP=true); fora dele, via scripts/warmup_caches.py.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from src.clients.database.factory import qualified_table_name
+from src.config.database import get_table_config
+from src.core.wbr import preparar_dados_wbr
+from src.services.figure_cache import warm_wbr_figure
+from src.utils.timing import timed, timing_labels
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_enabled() -> bool:
+    """Verifica se a thread de pré-aquecimento deve ser iniciada (default: não)"""
+    return os.getenv("WBR_WARMUP", "false").lower() == "true"
+
+
+def warmup_times() -> List[str]:
+    """Horários diários (HH:MM, hora local) do pré-aquecimento, de WBR_WARMUP_TIMES"""
+    return [h.strip() for h in os.getenv("WBR_WARMUP_TIMES", "06:30").split(",") if h.strip()]
+
+
+def warmup_methods() -> List[str]:
+    """Métodos de semana pré-calculados, de WBR_WARMUP_WEEK_METHODS"""
+    return [m.strip() for m in os.getenv("WBR_WARMUP_WEEK_METHODS", "iso,travelling").split(",") if m.strip()]
+
+
+def next_run(agora: datetime, horarios: Sequence[str]) -> datetime:
+    """
+    Próximo horário agendado a partir de agora
+
+    Args:
+        agora: Momento atual
+        horarios: Horários diários no formato HH:MM
+
+    Returns:
+        Data e hora da próxima execução
+    """
+    candidatos = []
+    for horario in horarios:
+        hora, minuto = (int(parte) for parte in horario.split(":"))
+        candidato = agora.replace(hour=hora, minute=minuto, second=0, microsecond=0)
+        if candidato <= agora:
+            candidato += timedelta(days=1)
+        candidatos.append(candidato)
+    return min(candidatos)
+
+
+def run_warmup(data_service, metodos: Optional[Sequence[str]] = None,
+               shoppings: Optional[Sequence[Optional[str]]] = None,
+               instagram: bool = True) -> Dict[str, Any]:
+    """
+    Pré-carrega os caches para a data de referência padrão do dashboard
+
+    Args:
+        data_service: DataService usado pelo dashboard (mesmo cache compartilhado)
+        metodos: Métodos de semana (default: WBR_WARMUP_WEEK_METHODS)
+        shoppings: Shoppings, com None para "Todos" (default: os das janelas aquecidas)
+        instagram: Também carrega engajamento e posts do Instagram
+
+    Returns:
+        Resumo com data_referencia, combinacoes, figuras, instagram, erros e segundos
+    """
+    inicio = time.perf_counter()
+    metodos = list(metodos or warmup_methods())
+    resumo: Dict[str, Any] = {'data_referencia': None, 'combinacoes': 0, 'figuras': 0,
+                              'instagram': 0, 'erros': [], 'segundos': 0.0}
+
+    with timed('warmup'):
+        tables_config = get_table_config()
+        data_referencia = _ultima_data(data_service.db_client, tables_config)
+        if data_referencia is None:
+            resumo['erros'].append("Sem data disponível nas tabelas")
+            return resumo
+        resumo['data_referencia'] = data_referencia
+
+        janelas = {}
+        for table_name, config in tables_config.items():
+            try:
+                janelas[table_name] = data_service.warm_table_window(table_name, config, data_referencia)
+            except Exception as e:
+                resumo['erros'].append(f"{config.get('titulo', table_name)}: {e}")
+
+        # Mesmo início que a sidebar usa por padrão
+        data_inicio = pd.Timestamp(f'{data_referencia.year - 1}-01-01')
+        min_date = _primeira_data(janelas)
+        if min_date is not None and data_inicio < min_date:
+            data_inicio = min_date
+
+        if shoppings is None:
+            shoppings = [None] + _shoppings(janelas)
+
+        instagram_service = _instagram_service() if instagram else None
+
+        for shopping in shoppings:
+            try:
+                resumo['figuras'] += _warmup_shopping(
+                    data_service, tables_config, janelas, data_referencia, shopping, metodos
+                )
+                resumo['combinacoes'] += len(metodos)
+            except Exception as e:
+                resumo['erros'].append(f"{shopping or 'Todos'}: {e}")
+
+            if instagram_service is not None:
+                try:
+                    instagram_service.warm_cache(
+                        data_inicio.strftime('%Y-%m-%d'), data_referencia.strftime('%Y-%m-%d'), shopping
+                    )
+                    resumo['instagram'] += 1
+                except Exception as e:
+                    resumo['erros'].append(f"Instagram {shopping or 'Todos'}: {e}")
+
+    resumo['segundos'] = time.perf_counter() - inicio
+    logger.info(
+        f"Pré-aquecimento de {data_referencia.date()}: {resumo['combinacoes']} combinações, "
+        f"{resumo['figuras']} figuras, {resumo['instagram']} Instagram em {resumo['segundos']:.1f}s "
+        f"({len(resumo['erros'])} erros)"
+    )
+    return resumo
+
+
+def _ultima_data(db_client, tables_config: Dict[str, Dict[str, Any]]) -> Optional[pd.Timestamp]:
+    """Última data com dados entre as tabelas (até hoje): a referência padrão da sidebar"""
+    datas = []
+    for config in tables_config.values():
+        ultima = db_client.get_max_date(
+            table_name=qualified_table_name(config),
+            date_col=config['date_col'],
+            shopping_col=config.get('shopping_col')
+        )
+        if ultima is not None:
+            datas.append(pd.Timestamp(ultima).normalize())
+    return max(datas) if datas else None
+
+
+def _primeira_data(janelas: Dict[str, Any]) -> Optional[pd.Timestamp]:
+    """Primeira data com dados desde janeiro do ano anterior a hoje, como o mínimo da sidebar"""
+    datas = []
+    for janela in janelas.values():
+        serie = janela.slice()
+        if serie is not None and not serie.empty:
+            datas.append(serie['date'].iloc[0])
+    return min(datas) if datas else None
+
+
+def _shoppings(janelas: Dict[str, Any]) -> List[str]:
+    """Shoppings presentes nas partições das janelas"""
+    shoppings = set()
+    for janela in janelas.values():
+        if janela.particao is not None:
+            shoppings.update(janela.particao.posicoes)
+    return sorted(shoppings)
+
+
+def _warmup_shopping(data_service, tables_config: Dict[str, Dict[str, Any]],
+                     janelas: Dict[str, Any], data_referencia: pd.Timestamp,
+                     shopping: Optional[str], metodos: Sequence[str]) -> int:
+    """Fatia as janelas de um shopping e monta as figuras de cada método (retorna o nº de figuras)"""
+    # Import tardio: data_service importa este módulo para iniciar a thread
+    from src.services.data_service import aggregation_pushdown_enabled
+
+    data = {}
+    for table_name, janela in janelas.items():
+        with timing_labels(table=table_name, shopping=shopping):
+            # Calculadora de KPIs fica na janela aquecida (página de métricas avançadas)
+            janela.calculadora(shopping)
+            data[table_name] = janela.slice(data_referencia, shopping)
+
+    # Com pushdown os blocos WBR vêm de load_table_aggregated (st.cache_data, com TTL
+    # próprio), que não roda fora do script: só as janelas e as calculadoras são aquecidas
+    if aggregation_pushdown_enabled():
+        return 0
+
+    figuras = 0
+    for metodo in metodos:
+        # Mesmo caminho do dashboard: lote primeiro, gráfico individual como fallback
+        processed = data_service.process_wbr_batch(
+            tables_config, data, data_referencia, shopping, metodo
+        )
+        for table_name, config in tables_config.items():
+            df = data.get(table_name)
+            if df is None or df.empty:
+                continue
+            with timing_labels(table=config['table'], shopping=shopping):
+                dados, data_ref = preparar_dados_wbr(
+                    df,
+                    data_referencia=data_referencia,
+                    metodo_semana=metodo,
+                    dados_processados=processed.get(table_name)
+                )
+                warm_wbr_figure(
+                    dados, f"{config['icon']} {config['titulo']}", config['unidade'], data_ref, metodo
+                )
+            figuras += 1
+    return figuras
+
+
+def _instagram_service():
+    """InstagramService conectado ou None (sem SUPABASE_DATABASE_URL)"""
+    from src.services.instagram_service import InstagramService
+
+    service = InstagramService()
+    return service if service.is_connected() else None
+
+
+class WarmupScheduler(threading.Thread):
+    """Thread em segundo plano que roda o pré-aquecimento nos horários agendados"""
+
+    def __init__(self, data_service, horarios: Optional[Sequence[str]] = None,
+                 on_start: bool = True):
+        """
+        Args:
+            data_service: DataService compartilhado do processo
+            horarios: Horários diários HH:MM (default: WBR_WARMUP_TIMES)
+            on_start: Também roda logo ao iniciar
+        """
+        super().__init__(name="wbr_warmup", daemon=True)
+        self.data_service = data_service
+        self.horarios = list(horarios or warmup_times())
+        self.on_start = on_start
+        self._stop_event = threading.Event()
+
+    def run(self):
+        if self.on_start:
+            self._run_once()
+        while True:
+            espera = (next_run(datetime.now(), self.horarios) - datetime.now()).total_seconds()
+            if self._stop_event.wait(max(espera, 0)):
+                return
+            self._run_once()
+
+    def stop(self):
+        """Interrompe a thread antes da próxima execução"""
+        self._stop_event.set()
+
+    def _run_once(self):
+        try:
+            run_warmup(self.data_service)
+        except Exception as e:
+            logger.error(f"Erro no pré-aquecimento: {str(e)}")
+
+
+def start_warmup_thread(data_service) -> WarmupScheduler:
+    """
+    Inicia a thread de pré-aquecimento (chamado uma vez por processo em get_data_service)
+
+    Args:
+        data_service: DataService compartilhado do processo
+
+    Returns:
+        Thread iniciada
+    """
+    scheduler = WarmupScheduler(
+        data_service,
+        on_start=os.getenv("WBR_WARMUP_ON_START", "true").lower() == "true"
+    )
+    scheduler.start()
+    logger.info(f"Pré-aquecimento agendado para {', '.join(scheduler.horarios)}")
+    return scheduler
@@ -5,10 +5,12 @@ from .sidebar import SidebarComponent
 from .charts import ChartComponent
 from .metrics import MetricsComponent
 from .data_preview import DataPreviewComponent
+from .performance import PerformancePanelComponent
 
 __all__ = [
     'SidebarComponent',
     'ChartComponent',
     'MetricsComponent',
-    'DataPreviewComponent'
+    'DataPreviewComponent',
+    'PerformancePanelComponent'
 ]
\ No newline at end of file
@@ -3,8 +3,10 @@ Componente de gráficos
 """
 import streamlit as st
 import pandas as pd
-from typing import Dict, Any
-from src.core.wbr import gerar_grafico_wbr
+from typing import Dict, Any, Optional
+from src.core.wbr import preparar_dados_wbr
+from src.services.figure_cache import render_wbr_figure
+from src.utils.timing import timing_labels
 
 
 class ChartComponent:
@@ -15,43 +17,49 @@ class ChartComponent:
         config: Dict[str, Any],
         df: pd.DataFrame,
         data_referencia: pd.Timestamp,
-        metodo_semana: str = 'iso'
+        metodo_semana: str = 'iso',
+        dados_processados: Optional[Dict[str, Any]] = None,
+        shopping: Optional[str] = None
     ):
         """
         Renderiza gráfico WBR para uma configuração específica
 
         Args:
             config: Configuração da tabela/gráfico
-            df: DataFrame com os dados
+            df: DataFrame com os dados (None com pushdown: só dados_processados)
             data_referencia: Data de referência para o gráfico
             metodo_semana: 'iso' ou 'travelling' para tipo de cálculo semanal
+            dados_processados: Blocos WBR já calculados para esta tabela (opcional)
+            shopping: Shopping filtrado (rótulo das medições de tempo)
         """
-        if df is None or df.empty:
+        tem_linhas = df is not None and not df.empty
+        if not tem_linhas and dados_processados is None:
             st.warning(f"Sem dados disponíveis para {config['titulo']}")
             return
 
         try:
-            # Gera gráfico WBR
-            fig = gerar_grafico_wbr(
-                df=df,
-                coluna_data='date',
-                coluna_pessoas='metric_value',
-                titulo=f"{config['icon']} {config['titulo']}",
-                unidade=config['unidade'],
-                data_referencia=data_referencia,
-                metodo_semana=metodo_semana
-            )
-
-            # Exibe gráfico
-            st.plotly_chart(
-                fig,
-                width="stretch",
-                key=f"chart_{config['table']}"
-            )
-
-            # Opcional: Mostra prévia dos dados
-            with st.expander("📋 Ver dados brutos"):
-                self._render_data_preview(df)
+            with timing_labels(table=config['table'], shopping=shopping):
+                dados, data_ref = preparar_dados_wbr(
+                    df,
+                    coluna_data='date',
+                    coluna_pessoas='metric_value',
+                    data_referencia=data_referencia,
+                    metodo_semana=metodo_semana,
+                    dados_processados=dados_processados
+                )
+                titulo = f"{config['icon']} {config['titulo']}"
+
+                # Figura em cache: reruns com os mesmos dados não remontam o gráfico
+                render_wbr_figure(
+                    dados, titulo, config['unidade'], data_ref, metodo_semana,
+                    width="stretch",
+                    key=f"chart_{config['table']}"
+                )
+
+            # Opcional: Mostra prévia dos dados (não há linhas diárias com pushdown)
+            if tem_linhas:
+                with st.expander("📋 Ver dados brutos"):
+                    self._render_data_preview(df)
 
         except Exception as e:
             st.error(f"Erro ao gerar gráfico: {str(e)}")
@@ -64,7 +72,7 @@ class ChartComponent:
             df: DataFrame com os dados
         """
         # Seja resiliente se 'date' for o índice
-        display_df = df.reset_index()
+        display_df = df.reset_index(drop='date' in df.columns)
 
         # Se reset_index criou uma coluna 'index' e 'date' não existe, renomeia
         if 'date' not in display_df.columns and 'index' in display_df.columns:
@@ -155,4 +163,4 @@ class ChartComponent:
         }
 
         # Chama render_chart para manter padrão visual
-        self.render_chart(config, df_chart, data_referencia, metodo_semana)
\ No newline at end of file
+        self.render_chart(config, df_chart, data_referencia, metodo_semana, shopping=shopping_filter)
\ No newline at end of file
@@ -46,7 +46,8 @@ class DataPreviewComponent:
 
         # Se 'date' for o índice, reseta
         if display_df.index.name == 'date' or isinstance(display_df.index, pd.DatetimeIndex):
-            display_df = display_df.reset_index()
+            # Frames preparados já têm a coluna 'date' e o índice só a espelha
+            display_df = display_df.reset_index(drop='date' in display_df.columns)
 
         # Formata colunas de data
         for col in display_df.columns:
@@ -57,7 +58,7 @@ class DataPreviewComponent:
                     pass
 
         # Formata colunas numéricas
-        numeric_cols = display_df.select_dtypes(include=['float64', 'int64']).columns
+        numeric_cols = display_df.select_dtypes(include='number').columns
         for col in numeric_cols:
             if 'value' in col.lower() or 'total' in col.lower():
                 display_df[col] = display_df[col].apply(lambda x: f"{x:,.0f}")
@@ -3,7 +3,9 @@ Componente de exibição de métricas
 """
 import streamlit as st
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from src.core.wbr_metrics import IncrementalWBRCalculator
+from src.core.wbr_utility import nan_to_none, wow_array, yoy_array
 from src.services.metrics_service import MetricsService
 
 
@@ -114,7 +116,8 @@ class MetricsComponent:
         self,
         df: pd.DataFrame,
         data_referencia: pd.Timestamp,
-        titulo: str = "Análise WBR Avançada"
+        titulo: str = "Análise WBR Avançada",
+        calculadora: Optional[IncrementalWBRCalculator] = None
     ):
         """
         Renderiza métricas WBR avançadas
@@ -123,6 +126,8 @@ class MetricsComponent:
             df: DataFrame com os dados
             data_referencia: Data de referência
             titulo: Título da seção
+            calculadora: Calculadora incremental da tabela; quando informada, as
+                semanas móveis saem de somas prefixadas na data de referência
         """
         if df is None or df.empty:
             st.info("Carregue dados primeiro para ver as métricas WBR avançadas")
@@ -188,31 +193,72 @@ class MetricsComponent:
                 )
 
             # Mostra comparação de semanas
-            self._render_week_comparison(metrics_result)
+            self._render_week_comparison(metrics_result, calculadora, data_referencia)
         else:
             error_msg = metrics_result.get('error', 'Erro desconhecido')
             st.warning(f"Não foi possível calcular métricas avançadas: {error_msg}")
 
-    def _render_week_comparison(self, metrics_result: Dict[str, Any]):
+    def _render_week_comparison(
+        self,
+        metrics_result: Dict[str, Any],
+        calculadora: Optional[IncrementalWBRCalculator] = None,
+        data_referencia: Optional[pd.Timestamp] = None
+    ):
         """
         Renderiza comparação de semanas anteriores
 
         Args:
             metrics_result: Resultado do cálculo de métricas
+            calculadora: Calculadora incremental da tabela (opcional)
+            data_referencia: Data de referência (usada com a calculadora)
         """
         st.subheader("📅 Comparação de Semanas")
         tab1, tab2 = st.tabs(["Ano Atual", "Ano Anterior"])
 
+        trailing = metrics_result.get('trailing_weeks', {})
+        cy_data = trailing.get('current_year', [])
+        py_data = trailing.get('previous_year', [])
+        comparacoes = metrics_result.get('weekly_comparisons', {}).get('metric_value', {})
+        if calculadora is not None and data_referencia is not None:
+            # Somas prefixadas: mesma janela de 6 semanas sem reagregar as linhas diárias
+            cy = calculadora.trailing_weeks(week_ending=data_referencia)
+            py = calculadora.trailing_weeks(previous_year=True, week_ending=data_referencia)
+            cy_data = self._weeks_records(cy)
+            py_data = self._weeks_records(py)
+            comparacoes = {
+                'wow_cy': nan_to_none(wow_array(cy)),
+                'wow_py': nan_to_none(wow_array(py)),
+                'yoy': nan_to_none(yoy_array(cy, py))
+            }
+
+        # Variações de todas as semanas (arredondadas só na exibição)
+        cy_data = self._with_changes(cy_data, WOW=comparacoes.get('wow_cy'), YOY=comparacoes.get('yoy'))
+        py_data = self._with_changes(py_data, WOW=comparacoes.get('wow_py'))
+
         with tab1:
-            cy_data = metrics_result.get('trailing_weeks', {}).get('current_year', [])
             if cy_data:
                 st.dataframe(pd.DataFrame(cy_data), width="stretch", hide_index=True)
             else:
                 st.info("Sem dados do ano atual")
 
         with tab2:
-            py_data = metrics_result.get('trailing_weeks', {}).get('previous_year', [])
             if py_data:
                 st.dataframe(pd.DataFrame(py_data), width="stretch", hide_index=True)
             else:
-                st.info("Sem dados do ano anterior")
\ No newline at end of file
+                st.info("Sem dados do ano anterior")
+
+    @staticmethod
+    def _with_changes(registros: list, **variacoes) -> list:
+        """Acrescenta colunas <nome>_% (uma variação por semana) aos registros da tabela"""
+        registros = [dict(registro) for registro in registros]
+        for nome, valores in variacoes.items():
+            if not valores or len(valores) != len(registros):
+                continue
+            for registro, valor in zip(registros, valores):
+                registro[f"{nome}_%"] = None if valor is None else round(valor, 1)
+        return registros
+
+    @staticmethod
+    def _weeks_records(semanas: pd.Series) -> list:
+        """Semanas móveis (série indexada pelo fim da semana) no formato de registros da tabela"""
+        return semanas.rename_axis('Date').reset_index().to_dict('records')
\ No newline at end of file
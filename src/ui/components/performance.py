@@ -0,0 +1,72 @@
+"""
+Componente do painel de desempenho (DEBUG_PERFORMANCE=true)
+"""
+import streamlit as st
+import pandas as pd
+from src.clients.database.schema import get_schema_report
+from src.utils.timing import get_timing_registry
+
+
+class PerformancePanelComponent:
+    """Painel na sidebar com p50/p95 por etapa das últimas execuções"""
+
+    def render(self):
+        """Renderiza o painel de tempos na sidebar"""
+        registry = get_timing_registry()
+
+        with st.sidebar:
+            st.markdown("### ⏱️ Tempos por etapa")
+
+            etapas = registry.stats()
+            if not etapas:
+                st.caption("Nenhuma medição ainda")
+                return
+
+            st.dataframe(
+                self._format(pd.DataFrame(etapas)[['stage', 'count', 'p50_ms', 'p95_ms', 'last_ms']]),
+                hide_index=True,
+                width="stretch"
+            )
+
+            with st.expander("Por tabela e shopping"):
+                detalhes = registry.stats(detailed=True)
+                if detalhes:
+                    st.dataframe(
+                        self._format(pd.DataFrame(detalhes)[
+                            ['stage', 'table', 'shopping', 'count', 'p50_ms', 'p95_ms', 'last_ms']
+                        ]),
+                        hide_index=True,
+                        width="stretch"
+                    )
+
+            with st.expander("Memória por tabela"):
+                relatorio = get_schema_report()
+                if relatorio:
+                    memoria = pd.DataFrame(relatorio.values())
+                    memoria[['bytes_before', 'bytes_after', 'bytes_saved']] /= 1024 * 1024
+                    st.dataframe(
+                        memoria[['table', 'rows', 'bytes_before', 'bytes_after', 'bytes_saved']].round(2).rename(columns={
+                            'table': 'Tabela', 'rows': 'Linhas', 'bytes_before': 'Antes (MB)',
+                            'bytes_after': 'Depois (MB)', 'bytes_saved': 'Economia (MB)'
+                        }),
+                        hide_index=True,
+                        width="stretch"
+                    )
+                else:
+                    st.caption("Nenhuma tabela carregada ainda")
+
+            if registry.jsonl_path:
+                st.caption(f"Exportando para {registry.jsonl_path}")
+
+            if st.button("Limpar medições", key="perf_reset"):
+                registry.reset()
+                st.rerun()
+
+    @staticmethod
+    def _format(df: pd.DataFrame) -> pd.DataFrame:
+        """Arredonda os tempos e troca os nomes das colunas"""
+        df = df.round({'p50_ms': 1, 'p95_ms': 1, 'last_ms': 1})
+        return df.rename(columns={
+            'stage': 'Etapa', 'table': 'Tabela', 'shopping': 'Shopping', 'count': 'N',
+            'p50_ms': 'p50 (ms)', 'p95_ms': 'p95 (ms)', 'last_ms': 'Última (ms)'
+        })
@@ -48,10 +48,18 @@ class AdvancedMetricsPage:
                 with tabs[idx]:
                     df = data.get(table_name)
                     if df is not None and not df.empty:
+                        # Semanas móveis da calculadora compartilhada (mudar a data não recalcula)
+                        calculadora = self.data_service.get_kpi_calculator(
+                            table_name,
+                            config,
+                            filters.get('data_referencia'),
+                            filters.get('shopping')
+                        )
                         self.metrics_component.render_advanced_metrics(
                             df,
                             filters.get('data_referencia'),
-                            f"{config['titulo']}"
+                            f"{config['titulo']}",
+                            calculadora=calculadora
                         )
                     else:
                         st.info(f"Sem dados de {config['titulo'].lower()} para análise")
@@ -75,15 +83,18 @@ class AdvancedMetricsPage:
         data = {}
 
         with st.spinner("Carregando dados para análise..."):
-            for table_name, config in self.tables_config.items():
-                df = self.data_service.load_table_data(table_name, config)
+            # Carrega as tabelas em paralelo, já na partição do shopping (sem varrer a tabela)
+            loaded = self.data_service.load_tables_parallel(
+                self.tables_config,
+                shopping_filter=filters.get('shopping')
+            )
 
+            for table_name, df in loaded.items():
                 if df is not None:
                     df_filtered = self.filter_service.apply_filters(
                         df,
                         date_start=filters.get('data_inicio'),
-                        date_end=filters.get('data_fim'),
-                        shopping_filter=filters.get('shopping')
+                        date_end=filters.get('data_fim')
                     )
                     data[table_name] = df_filtered
 
@@ -4,7 +4,7 @@ Página principal do Dashboard WBR
 import streamlit as st
 import pandas as pd
 from typing import Dict, Any, Optional
-from src.services.data_service import DataService
+from src.services.data_service import DataService, aggregation_pushdown_enabled
 from src.services.filter_service import FilterService
 from src.ui.components.charts import ChartComponent
 from src.ui.components.metrics import MetricsComponent
@@ -62,15 +62,27 @@ class DashboardPage:
         st.markdown("---")
 
 
-        # Carrega e processa dados
-        data = self._load_and_process_data(filters)
+        if aggregation_pushdown_enabled():
+            # Pushdown: só as semanas/meses agregados no banco, sem buscar as linhas diárias
+            data = {}
+            with st.spinner("Carregando dados..."):
+                processed = self._process_wbr_batch(data, filters)
+            if not processed:
+                st.error("Erro ao carregar dados. Verifique a conexão com o banco de dados.")
+                return
+        else:
+            # Carrega e processa dados
+            data = self._load_and_process_data(filters)
 
-        if not data:
-            st.error("Erro ao carregar dados. Verifique a conexão com o banco de dados.")
-            return
+            if not data:
+                st.error("Erro ao carregar dados. Verifique a conexão com o banco de dados.")
+                return
+
+            # Calcula semanas/meses de todas as tabelas numa única passada agrupada
+            processed = self._process_wbr_batch(data, filters)
 
         # Renderiza sempre layout vertical (um abaixo do outro)
-        self._render_vertical_layout(data, filters)
+        self._render_vertical_layout(data, filters, processed)
 
         # Rodapé
         st.markdown("---")
@@ -86,42 +98,66 @@ class DashboardPage:
         Returns:
             Dicionário com DataFrames processados
         """
-        data = {}
-
         with st.spinner("Carregando dados..."):
-            # Carrega dados de cada tabela já filtrados na query
-            for table_name, config in self.tables_config.items():
-                # Carrega dados já filtrados pela query SQL
-                df = self.data_service.load_table_data(
-                    table_name,
-                    config,
-                    date_reference=filters.get('data_referencia'),
-                    shopping_filter=filters.get('shopping')
-                )
-
-                # Não precisa mais filtrar em Python, dados já vêm filtrados
-                data[table_name] = df
+            # Carrega as tabelas em paralelo, já filtradas na query
+            data = self.data_service.load_tables_parallel(
+                self.tables_config,
+                date_reference=filters.get('data_referencia'),
+                shopping_filter=filters.get('shopping')
+            )
 
         return data
 
-    def _render_vertical_layout(self, data: Dict[str, pd.DataFrame], filters: Dict[str, Any]):
+    def _process_wbr_batch(
+        self,
+        data: Dict[str, pd.DataFrame],
+        filters: Dict[str, Any]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Processa os blocos WBR de todas as tabelas em lote
+
+        Args:
+            data: DataFrames por tabela
+            filters: Filtros aplicados
+
+        Returns:
+            Dicionário {tabela: dados processados}; vazio se não houver data de referência
+        """
+        return self.data_service.process_wbr_batch(
+            self.tables_config,
+            data,
+            data_referencia=filters.get('data_referencia'),
+            shopping_filter=filters.get('shopping'),
+            metodo_semana=filters.get('metodo_semana', 'iso')
+        )
+
+    def _render_vertical_layout(
+        self,
+        data: Dict[str, pd.DataFrame],
+        filters: Dict[str, Any],
+        processed: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
         """
         Renderiza layout vertical (um abaixo do outro)
 
         Args:
             data: Dados processados
             filters: Filtros aplicados
+            processed: Blocos WBR pré-calculados por tabela (opcional)
         """
+        processed = processed or {}
         for table_name, config in self.tables_config.items():
             st.subheader(f"{config['icon']} {config['titulo']}")
 
             df = data.get(table_name)
-            if df is not None and not df.empty:
+            if (df is not None and not df.empty) or table_name in processed:
                 self.chart_component.render_chart(
                     config,
                     df,
                     filters.get('data_referencia'),
-                    filters.get('metodo_semana', 'iso')
+                    filters.get('metodo_semana', 'iso'),
+                    dados_processados=processed.get(table_name),
+                    shopping=filters.get('shopping')
                 )
             else:
                 st.warning(f"Nenhum dado de {config['titulo'].lower()} encontrado")
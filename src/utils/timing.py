@@ -0,0 +1,173 @@
+"""
+Medição de tempo por etapa (busca no banco, parsing de datas, processamento WBR,
+KPIs, montagem e serialização dos gráficos).
+
+Os tempos ficam em memória do processo, numa janela móvel por etapa e por
+(etapa, tabela, shopping), com p50/p95. Opcionalmente cada medição é gravada em
+JSON lines (PERF_TIMINGS_JSONL=caminho/arquivo.jsonl).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator, contextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rótulos que identificam uma medição além da etapa
+LABELS = ('table', 'shopping')
+
+
+class TimingRegistry:
+    """Janelas móveis de duração por etapa, compartilhadas entre sessões e threads"""
+
+    def __init__(self, window: int = 200, jsonl_path: Optional[str] = None):
+        """
+        Args:
+            window: Número de medições mantidas por chave
+            jsonl_path: Arquivo JSON lines para exportar cada medição (opcional)
+        """
+        self.window = window
+        self.jsonl_path = jsonl_path
+        self._samples: Dict[Tuple, Deque[float]] = {}
+        self._last: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, **labels: Any):
+        """
+        Registra uma medição
+
+        Args:
+            stage: Nome da etapa (ex: 'db_fetch', 'processar_dados_wbr')
+            seconds: Duração em segundos
+            **labels: table, shopping (opcionais)
+        """
+        total = (stage,) + (None,) * len(LABELS)
+        detail = (stage,) + tuple(labels.get(label) for label in LABELS)
+        with self._lock:
+            for key in {total, detail}:
+                samples = self._samples.get(key)
+                if samples is None:
+                    samples = self._samples[key] = deque(maxlen=self.window)
+                samples.append(seconds)
+                self._last[key] = seconds
+
+        if self.jsonl_path:
+            self._export(stage, seconds, labels)
+
+    def stats(self, detailed: bool = False) -> List[Dict[str, Any]]:
+        """
+        Resumo por etapa (ou por etapa, tabela e shopping)
+
+        Args:
+            detailed: Inclui as chaves com tabela/shopping em vez de só o total da etapa
+
+        Returns:
+            Lista de dicionários com stage, table, shopping, count, p50_ms, p95_ms, last_ms,
+            da etapa mais lenta (p95) para a mais rápida
+        """
+        with self._lock:
+            items = [(key, np.array(samples), self._last[key]) for key, samples in self._samples.items()]
+
+        rows = []
+        for key, samples, last in items:
+            is_total = all(value is None for value in key[1:])
+            if detailed == is_total:
+                continue
+            p50, p95 = np.percentile(samples, [50, 95])
+            rows.append({
+                'stage': key[0],
+                **dict(zip(LABELS, key[1:])),
+                'count': len(samples),
+                'p50_ms': float(p50) * 1000,
+                'p95_ms': float(p95) * 1000,
+                'last_ms': last * 1000
+            })
+        return sorted(rows, key=lambda row: -row['p95_ms'])
+
+    def reset(self):
+        """Descarta todas as medições"""
+        with self._lock:
+            self._samples.clear()
+            self._last.clear()
+
+    def _export(self, stage: str, seconds: float, labels: Dict[str, Any]):
+        record = {'ts': time.time(), 'stage': stage, 'ms': seconds * 1000,
+                  'thread': threading.current_thread().name}
+        record.update({key: str(value) for key, value in labels.items() if value is not None})
+        try:
+            with self._lock, open(self.jsonl_path, 'a') as arquivo:
+                arquivo.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar tempos em {self.jsonl_path}: {e}")
+
+
+# Único por processo (as threads de carga paralela não têm contexto do Streamlit)
+_registry = TimingRegistry(
+    window=int(os.getenv("PERF_TIMINGS_WINDOW", "200")),
+    jsonl_path=os.getenv("PERF_TIMINGS_JSONL") or None
+)
+
+
+_context = threading.local()
+
+
+def get_timing_registry() -> TimingRegistry:
+    """Retorna o registro de tempos do processo"""
+    return _registry
+
+
+@contextmanager
+def timing_labels(**labels: Any):
+    """
+    Define rótulos (table, shopping) herdados pelas medições feitas dentro do bloco,
+    na mesma thread, sem precisar repassá-los às funções do core
+
+    Uso:
+        with timing_labels(table='pessoas', shopping='SCIB'):
+            gerar_grafico_wbr(...)   # medições internas saem com table/shopping
+    """
+    previous = getattr(_context, 'labels', {})
+    _context.labels = {**previous, **labels}
+    try:
+        yield
+    finally:
+        _context.labels = previous
+
+
+class timed(ContextDecorator):
+    """
+    Mede a duração de um bloco ou função e registra no TimingRegistry
+
+    Uso:
+        with timed('db_fetch', table='pessoas', shopping='SCIB'):
+            ...
+
+        @timed('processar_dados_wbr')
+        def processar(...):
+            ...
+    """
+
+    def __init__(self, stage: str, **labels: Any):
+        self.stage = stage
+        self.labels = labels
+        self._starts = threading.local()
+
+    def __enter__(self):
+        # Pilha por thread: o mesmo decorador pode estar ativo em várias threads
+        stack = getattr(self._starts, 'stack', None)
+        if stack is None:
+            stack = self._starts.stack = []
+        stack.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._starts.stack.pop()
+        labels = {**getattr(_context, 'labels', {}), **self.labels}
+        _registry.record(self.stage, seconds, **labels)
+        return False
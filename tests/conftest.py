@@ -0,0 +1,61 @@
+"""
+Fixtures compartilhadas dos testes
+"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Mesmo layout dos scripts: importa src.* a partir da raiz do repositório
+RAIZ = Path(__file__).parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def _porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope='session')
+def postgres_url(tmp_path_factory):
+    """
+    URL de um Postgres descartável para os testes de SQL
+
+    Usa TEST_DATABASE_URL quando definida; senão sobe um cluster temporário com
+    initdb/pg_ctl do PATH. Sem nenhum dos dois (ou sem driver), o teste é pulado.
+    """
+    pytest.importorskip('psycopg2', reason="psycopg2 não instalado")
+
+    url = os.getenv('TEST_DATABASE_URL')
+    if url:
+        yield url
+        return
+
+    initdb, pg_ctl = shutil.which('initdb'), shutil.which('pg_ctl')
+    if not initdb or not pg_ctl:
+        pytest.skip("Postgres indisponível: defina TEST_DATABASE_URL ou instale initdb/pg_ctl")
+
+    base = tmp_path_factory.mktemp('postgres')
+    dados = base / 'data'
+    criado = subprocess.run(
+        [initdb, '-D', str(dados), '-U', 'postgres', '--auth=trust'],
+        capture_output=True, text=True
+    )
+    if criado.returncode != 0:
+        pytest.skip(f"initdb falhou: {criado.stderr.strip()}")
+
+    porta = _porta_livre()
+    subprocess.run(
+        [pg_ctl, '-D', str(dados), '-l', str(base / 'postgres.log'), '-w',
+         '-o', f"-p {porta} -k {base} -c listen_addresses=127.0.0.1", 'start'],
+        check=True, capture_output=True
+    )
+    try:
+        yield f"postgresql://postgres@127.0.0.1:{porta}/postgres"
+    finally:
+        subprocess.run([pg_ctl, '-D', str(dados), '-m', 'immediate', 'stop'], capture_output=True)
@@ -0,0 +1,67 @@
+"""
+Cache de figuras WBR: montagem única por conteúdo, sem serializar no miss e sem expor a figura compartilhada
+"""
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+import pytest
+
+from benchmarks.synthetic import gerar_fluxo
+from src.core.wbr import preparar_dados_wbr
+from src.services import figure_cache
+
+REFERENCIA = pd.Timestamp('2025-06-15')
+
+
+@pytest.fixture
+def dados():
+    df = gerar_fluxo(n_shoppings=1, anos=2, fim=REFERENCIA)
+    dados, _ = preparar_dados_wbr(df, data_referencia=REFERENCIA, metodo_semana='iso')
+    return dados
+
+
+@pytest.fixture
+def exibidas(monkeypatch):
+    figure_cache.get_figure_cache().invalidate()
+    figuras = []
+    monkeypatch.setattr(figure_cache.st, 'plotly_chart', lambda figura, **kwargs: figuras.append((figura, kwargs)))
+    return figuras
+
+
+def test_figura_montada_uma_vez_e_exibida_nos_reruns(dados, exibidas, monkeypatch):
+    montagens = []
+    montar = figure_cache.montar_figura_wbr
+
+    def _montar(*args):
+        montagens.append(args)
+        return montar(*args)
+
+    monkeypatch.setattr(figure_cache, 'montar_figura_wbr', _montar)
+
+    figure_cache.warm_wbr_figure(dados, 'Fluxo', 'pessoas', REFERENCIA, 'iso')
+    for _ in range(3):
+        figure_cache.render_wbr_figure(dados, 'Fluxo', 'pessoas', REFERENCIA, 'iso', key='chart_fluxo')
+
+    assert len(montagens) == 1
+    assert len(exibidas) == 3
+    assert all(isinstance(figura, go.Figure) and kwargs == {'key': 'chart_fluxo'} for figura, kwargs in exibidas)
+
+
+def test_miss_nao_serializa_a_figura(dados, exibidas, monkeypatch):
+    def _to_json(*args, **kwargs):
+        raise AssertionError("a figura não deve ser serializada para estimar o tamanho")
+
+    monkeypatch.setattr(pio, 'to_json', _to_json)
+    figure_cache.warm_wbr_figure(dados, 'Fluxo', 'pessoas', REFERENCIA, 'travelling')
+
+    assert figure_cache.get_figure_cache().stats()['bytes'] > 0
+
+
+def test_estimativa_de_tamanho_acompanha_o_numero_de_pontos(dados):
+    figura = figure_cache.montar_figura_wbr(dados, 'Fluxo', 'pessoas', REFERENCIA)
+    vazia = go.Figure()
+
+    json_bytes = len(pio.to_json(figura, validate=False))
+    assert figure_cache._estimar_bytes(vazia) < figure_cache._estimar_bytes(figura)
+    # Mesma ordem de grandeza do JSON enviado ao navegador
+    assert json_bytes / 2 < figure_cache._estimar_bytes(figura) < json_bytes * 10
@@ -0,0 +1,153 @@
+"""
+Índices recomendados para as tabelas WBR e queries usadas pelo assistente de índices
+"""
+import importlib.util
+
+import pandas as pd
+import pytest
+
+from conftest import RAIZ
+from src.clients.sql.index_queries import IndexQueries
+
+CONFIG = {
+    'schema': 'wbr_teste',
+    'table': 'fluxo',
+    'date_col': 'data',
+    'metric_col': 'valor',
+    'shopping_col': 'shopping'
+}
+
+
+def _check_database():
+    spec = importlib.util.spec_from_file_location('check_database', RAIZ / 'scripts' / 'check_database.py')
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def _indices_do_plano(plano: dict) -> set:
+    nomes = set()
+
+    def _walk(node):
+        if node.get('Index Name'):
+            nomes.add(node['Index Name'])
+        for filho in node.get('Plans', []):
+            _walk(filho)
+
+    _walk(plano['Plan'])
+    return nomes
+
+
+def test_indices_wbr_com_shopping():
+    indices = IndexQueries().get_wbr_indexes({'fluxo': CONFIG})
+
+    assert [indice['columns'] for indice in indices] == ['data, shopping', 'shopping, data']
+    assert all('CONCURRENTLY' in indice['sql'] for indice in indices)
+
+
+def test_indices_wbr_sem_shopping():
+    indices = IndexQueries().get_wbr_indexes({'fluxo': dict(CONFIG, shopping_col=None)})
+
+    assert [indice['columns'] for indice in indices] == ['data']
+
+
+def test_indice_por_data_nao_confunde_com_shopping_data():
+    data_shopping, shopping_data = IndexQueries().get_wbr_indexes({'fluxo': CONFIG})
+    existentes = [{
+        'schema': 'wbr_teste', 'table': 'fluxo', 'name': 'outro_nome',
+        'indexdef': 'CREATE INDEX outro_nome ON wbr_teste.fluxo USING btree (shopping, data)'
+    }]
+
+    assert IndexQueries.find_existing(data_shopping, existentes) is None
+    assert IndexQueries.find_existing(shopping_data, existentes) == 'outro_nome'
+
+
+def test_dashboard_queries_usa_inicio_da_janela_completa(monkeypatch):
+    from src.clients.database.supabase_postgres import SupabaseClient
+    from src.clients.sql.instagram_queries import InstagramQueries
+    from src.clients.sql.instagram_rollups import InstagramRollupQueries
+    from src.clients.sql.wbr_queries import WBRQueries
+
+    monkeypatch.setenv('WBR_SUPERSET_WINDOW', 'true')
+    client = SupabaseClient.__new__(SupabaseClient)
+    client.wbr_queries = WBRQueries()
+    client.instagram_queries = InstagramQueries()
+    client.instagram_rollups = InstagramRollupQueries()
+    # Carga atrasada: a última data é de um ano anterior ao atual
+    client.get_max_date = lambda **kwargs: pd.Timestamp('2023-12-31')
+
+    inicio = '2021-01-01'
+    wbr = [params for rotulo, _, params in _check_database().dashboard_queries(client)
+           if rotulo.startswith('fetch_wbr_data')]
+
+    assert wbr
+    assert all(str(params['date_start']) == inicio for params in wbr)
+
+
+@pytest.fixture
+def tabela_wbr(postgres_url):
+    """Tabela WBR de 3 shoppings e 4 anos num Postgres descartável, com os índices recomendados"""
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(postgres_url)
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text('DROP SCHEMA IF EXISTS wbr_teste CASCADE'))
+        conn.execute(text('CREATE SCHEMA wbr_teste'))
+        conn.execute(text('CREATE TABLE wbr_teste.fluxo (data date, valor integer, shopping text)'))
+        conn.execute(text("""
+            INSERT INTO wbr_teste.fluxo
+            SELECT d::date, (random() * 1000)::int, s
+            FROM generate_series(CURRENT_DATE - INTERVAL '4 years', CURRENT_DATE, INTERVAL '1 day') AS d,
+                 unnest(ARRAY['SCIB', 'SBGP', 'SBI']) AS s
+        """))
+        for indice in IndexQueries().get_wbr_indexes({'fluxo': CONFIG}):
+            conn.execute(text(indice['sql']))
+        conn.execute(text('ANALYZE wbr_teste.fluxo'))
+    try:
+        yield engine
+    finally:
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text('DROP SCHEMA wbr_teste CASCADE'))
+        engine.dispose()
+
+
+def _plano(engine, sql_query: str, params: dict) -> dict:
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        # Tabela pequena: sem isso o planner prefere Seq Scan mesmo com índice adequado
+        conn.execute(text('SET enable_seqscan = off'))
+        plano = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql_query}"), params).scalar()
+    return plano[0]
+
+
+def test_query_da_janela_usa_indice_por_data(tabela_wbr):
+    from src.clients.sql.wbr_queries import WBRQueries
+
+    inicio = pd.Timestamp(year=pd.Timestamp.today().year - 2, month=1, day=1).strftime('%Y-%m-%d')
+    sql_query, params = WBRQueries().get_wbr_data_query(
+        table_name='wbr_teste.fluxo', date_col='data', metric_col='valor',
+        shopping_col='shopping', date_start=inicio
+    )
+
+    assert _indices_do_plano(_plano(tabela_wbr, sql_query, params)) == {'idx_fluxo_data_shopping'}
+
+
+def test_filtro_por_shopping_usa_indice_shopping_data(tabela_wbr):
+    sql_query = """
+    SELECT MAX(data) FROM "wbr_teste"."fluxo"
+    WHERE data <= CURRENT_DATE AND shopping = :shopping
+    """
+
+    assert _indices_do_plano(_plano(tabela_wbr, sql_query, {'shopping': 'SBI'})) == {'idx_fluxo_shopping_data'}
+
+
+def test_indices_criados_sao_reconhecidos(tabela_wbr):
+    from sqlalchemy import text
+
+    index_queries = IndexQueries()
+    with tabela_wbr.connect() as conn:
+        existentes = [dict(row._mapping) for row in conn.execute(text(index_queries.get_existing_indexes_sql()))]
+
+    for indice in index_queries.get_wbr_indexes({'fluxo': CONFIG}):
+        assert IndexQueries.find_existing(indice, existentes) == indice['name']
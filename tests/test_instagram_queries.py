@@ -0,0 +1,78 @@
+"""
+Queries do Instagram e da WBR: datas e shopping como parâmetros, um texto SQL por caso (com/sem filtro)
+"""
+import datetime
+import gc
+import re
+import weakref
+
+import pytest
+from sqlalchemy import text
+
+from src.clients.sql.instagram_queries import InstagramQueries
+from src.clients.sql.instagram_rollups import InstagramRollupQueries
+from src.clients.sql.wbr_queries import WBRQueries
+
+BUILDERS = [
+    (InstagramQueries, 'get_post_count_query'),
+    (InstagramQueries, 'get_engagement_query'),
+    (InstagramQueries, 'get_engagement_daily_query'),
+    (InstagramRollupQueries, 'get_post_count_query'),
+    (InstagramRollupQueries, 'get_engagement_query'),
+]
+
+
+def _parametros_da_query(sql: str) -> set:
+    return set(re.findall(r'(?<!:):(\w+)', sql))
+
+
+@pytest.mark.parametrize('classe, metodo', BUILDERS)
+def test_datas_sao_parametros_da_query(classe, metodo):
+    sql, params = getattr(classe(), metodo)(date_start='2024-01-01', date_end='2024-03-31', shopping_filter='SCIB')
+
+    assert params == {
+        'date_start': datetime.date(2024, 1, 1),
+        'date_end': datetime.date(2024, 3, 31),
+        'shopping': 'SCIB'
+    }
+    assert _parametros_da_query(sql) == set(params)
+    assert '{{' not in sql
+    # Todos os parâmetros existem no texto (o backend COPY os renderiza com bindparams)
+    text(sql).bindparams(**params)
+
+
+@pytest.mark.parametrize('classe, metodo', BUILDERS)
+def test_sem_filtro_a_query_nao_tem_parametro_de_shopping(classe, metodo):
+    queries = classe()
+    sem_filtro, params = getattr(queries, metodo)()
+    com_filtro, _ = getattr(queries, metodo)(shopping_filter='SBI')
+
+    assert 'IS NULL OR' not in sem_filtro and 'IS NULL OR' not in com_filtro
+    assert 'shopping' not in params and ':shopping' not in sem_filtro
+    assert params == {'date_start': None, 'date_end': None}
+    assert ':shopping' in com_filtro
+    # Período só conta com as duas datas
+    assert getattr(queries, metodo)(date_start='2024-01-01')[1] == params
+
+
+@pytest.mark.parametrize('classe, metodo', BUILDERS)
+def test_texto_sql_reaproveitado_entre_instancias(classe, metodo):
+    primeiro, _ = getattr(classe(), metodo)(shopping_filter='SCIB')
+    segundo, _ = getattr(classe(), metodo)(shopping_filter='SBGP')
+
+    assert primeiro is getattr(classe(), metodo)(shopping_filter='SCIB')[0]
+    assert primeiro != segundo
+
+
+@pytest.mark.parametrize('classe', [InstagramQueries, InstagramRollupQueries, WBRQueries])
+def test_cache_de_sql_nao_mantem_a_instancia_viva(classe):
+    queries = classe()
+    if classe is WBRQueries:
+        queries.get_wbr_data_query('schema.tabela')
+    else:
+        queries.get_post_count_query()
+    referencia = weakref.ref(queries)
+
+    del queries
+    gc.collect()
+    assert referencia() is None
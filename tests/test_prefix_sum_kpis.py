@@ -0,0 +1,123 @@
+"""
+KPIs por somas prefixadas (PrefixSumIndex) contra somas ingênuas com máscara booleana
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gerar_fluxo
+from src.core.wbr_metrics import IncrementalWBRCalculator, PrefixSumIndex, calcular_kpis
+
+REFERENCIAS = ['2024-02-29', '2024-03-31', '2025-02-28', '2025-03-01', '2025-07-09']
+
+
+@pytest.fixture(scope='module')
+def fluxo() -> pd.DataFrame:
+    return gerar_fluxo(n_shoppings=2, anos=3, fim=pd.Timestamp('2025-12-31'))
+
+
+def _soma(df: pd.DataFrame, inicio, fim) -> float:
+    datas = pd.to_datetime(df['date']).dt.normalize()
+    return float(df.loc[(datas >= inicio) & (datas <= fim), 'metric_value'].sum())
+
+
+def _pct(atual, anterior):
+    return (atual / anterior - 1) * 100 if anterior != 0 else 0
+
+
+def _kpis_ingenuos(df: pd.DataFrame, ref: pd.Timestamp) -> dict:
+    semana = _soma(df, ref - timedelta(days=6), ref)
+    anterior = _soma(df, ref - timedelta(days=13), ref - timedelta(days=7))
+    ref_py = ref - timedelta(days=364)
+    semana_py = _soma(df, ref_py - timedelta(days=6), ref_py)
+
+    # Períodos PY terminam no mesmo dia do ano anterior (29/02 -> 28/02)
+    fim_py = ref.replace(year=ref.year - 1, day=28) if (ref.month, ref.day) == (2, 29) else ref.replace(year=ref.year - 1)
+    trimestre = ((ref.month - 1) // 3) * 3 + 1
+    inicios = {
+        'mtd': ref.replace(day=1),
+        'qtd': ref.replace(month=trimestre, day=1),
+        'ytd': ref.replace(month=1, day=1)
+    }
+    periodos = {
+        nome: (_soma(df, inicio, ref), _soma(df, inicio.replace(year=ref.year - 1), fim_py))
+        for nome, inicio in inicios.items()
+    }
+
+    return {
+        'ultima_semana': semana,
+        'var_semanal': _pct(semana, anterior),
+        'wow_abs': semana - anterior,
+        'yoy_semanal': _pct(semana, semana_py),
+        'mtd_atual': periodos['mtd'][0],
+        'mtd_pct': _pct(*periodos['mtd']),
+        'trimestre_atual': periodos['qtd'][0],
+        'yoy_trimestral': _pct(*periodos['qtd']),
+        'ano_atual': periodos['ytd'][0],
+        'yoy_anual': _pct(*periodos['ytd'])
+    }
+
+
+def _assert_kpis(obtidos: dict, esperados: dict):
+    for chave, valor in esperados.items():
+        assert obtidos[chave] == pytest.approx(valor, rel=1e-9), chave
+
+
+@pytest.mark.parametrize('horario', [False, True])
+def test_range_sum_igual_a_mascara(horario):
+    df = gerar_fluxo(n_shoppings=2, anos=2, horario=horario, fim=pd.Timestamp('2025-03-10'))
+    indice = PrefixSumIndex(df, 'date', ['metric_value'])
+
+    intervalos = [
+        ('2024-02-23', '2024-02-29'),
+        ('2024-02-29', '2024-02-29'),
+        ('2025-03-10', '2025-03-10'),
+        ('2025-03-11', '2025-03-20'),  # depois dos dados
+        ('2020-01-01', '2023-12-31'),  # antes dos dados
+        ('2020-01-01', '2030-01-01'),  # tudo
+    ]
+    for inicio, fim in intervalos:
+        assert indice.range_sum('metric_value', inicio, fim) == pytest.approx(_soma(df, inicio, fim))
+
+    inicios, fins = zip(*intervalos)
+    np.testing.assert_allclose(
+        indice.range_sum('metric_value', list(inicios), list(fins)),
+        [_soma(df, inicio, fim) for inicio, fim in intervalos]
+    )
+
+
+def test_trailing_weeks_igual_a_mascara(fluxo):
+    indice = PrefixSumIndex(fluxo, 'date', ['metric_value'])
+    ref = pd.Timestamp('2024-03-06')
+
+    esperado = [
+        _soma(fluxo, fim - timedelta(days=6), fim)
+        for fim in (ref - timedelta(days=7 * i) for i in range(5, -1, -1))
+    ]
+    np.testing.assert_allclose(indice.trailing_weeks('metric_value', ref), esperado)
+
+
+@pytest.mark.parametrize('ref', REFERENCIAS)
+def test_calculadora_incremental_igual_a_mascara(fluxo, ref):
+    ref = pd.Timestamp(ref)
+    calculadora = IncrementalWBRCalculator(fluxo, fluxo['date'].max(), exact_decimal=False)
+
+    _assert_kpis(calculadora.at(ref), _kpis_ingenuos(fluxo, ref))
+
+
+@pytest.mark.parametrize('ref', REFERENCIAS)
+def test_calcular_kpis_igual_a_mascara(fluxo, ref):
+    ref = pd.Timestamp(ref)
+
+    _assert_kpis(calcular_kpis(fluxo, ref, exact_decimal=False), _kpis_ingenuos(fluxo, ref))
+
+
+def test_shift_week_ending_igual_a_at(fluxo):
+    calculadora = IncrementalWBRCalculator(fluxo, '2025-03-05', exact_decimal=False)
+    outra = IncrementalWBRCalculator(fluxo, '2025-03-05', exact_decimal=False)
+
+    for semanas in (-1, -52, 3):
+        kpis = calculadora.shift_week_ending(semanas)
+        assert kpis == outra.at(calculadora.week_ending)
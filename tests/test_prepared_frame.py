@@ -0,0 +1,75 @@
+"""
+Contrato do frame preparado: ordenado, indexado por data e somente leitura sem opções globais do pandas
+"""
+import pandas as pd
+import pytest
+
+from src.core.prepared_frame import consolidar_por_data, frame_preparado, preparar_frame
+
+
+@pytest.fixture
+def bruto() -> pd.DataFrame:
+    # Mesma ordem da query (ORDER BY data DESC), dois shoppings por data
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2024-03-02', '2024-03-02', '2024-03-01', '2024-03-01']),
+        'metric_value': [4, 3, 2, 1],
+        'shopping': pd.Categorical(['SBI', 'SCIB', 'SBI', 'SCIB'])
+    })
+
+
+def test_importar_nao_altera_opcoes_globais_do_pandas(monkeypatch):
+    import importlib
+
+    import src.core.prepared_frame as modulo
+
+    def _set_option(*args, **kwargs):
+        raise AssertionError(f"pd.set_option{args} chamado ao importar prepared_frame")
+
+    monkeypatch.setattr(pd, 'set_option', _set_option)
+    importlib.reload(modulo)
+
+
+def test_frame_preparado_e_somente_leitura(bruto):
+    df = preparar_frame(bruto)
+
+    assert frame_preparado(df)
+    assert df['metric_value'].tolist() == [1, 2, 3, 4]
+    with pytest.raises(ValueError, match='read-only'):
+        df.loc[df.index[0], 'metric_value'] = 99
+    with pytest.raises(ValueError, match='read-only'):
+        df['metric_value'].to_numpy()[0] = 99
+
+    # A entrada continua gravável e intacta; substituir colunas numa cópia é permitido
+    bruto.loc[0, 'metric_value'] = 40
+    assert df['metric_value'].tolist() == [1, 2, 3, 4]
+    assert df.assign(metric_value=0)['metric_value'].sum() == 0
+
+
+def test_escrita_na_fatia_nao_chega_ao_frame_preparado(bruto):
+    df = preparar_frame(bruto)
+    fatia = df.iloc[1:3]
+
+    try:
+        fatia.iloc[0, fatia.columns.get_loc('metric_value')] = 99
+    except ValueError as e:
+        # Sem Copy-on-Write a fatia é uma view dos arrays não graváveis
+        assert 'read-only' in str(e)
+    assert df['metric_value'].tolist() == [1, 2, 3, 4]
+
+
+def test_consolidado_e_somente_leitura(bruto):
+    consolidado = consolidar_por_data(bruto)
+
+    assert consolidado['metric_value'].tolist() == [3, 7]
+    with pytest.raises(ValueError, match='read-only'):
+        consolidado.loc[consolidado.index[0], 'metric_value'] = 0
+
+
+def test_coluna_object_e_copiada_e_mede_memoria(bruto):
+    # Shopping sem tipos compactos (object): copiado, mas gravável para as rotinas do pandas 2
+    bruto = bruto.assign(shopping=bruto['shopping'].astype(object))
+    df = preparar_frame(bruto)
+
+    assert df.memory_usage(deep=True).sum() > 0
+    bruto.loc[0, 'shopping'] = 'SBGP'
+    assert df['shopping'].tolist() == ['SCIB', 'SBI', 'SCIB', 'SBI']
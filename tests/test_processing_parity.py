@@ -0,0 +1,152 @@
+"""
+Paridade de processar_dados_wbr com a implementação original (uma máscara por semana/mês)
+
+A referência abaixo é a versão anterior às somas por intervalo, reduzida ao que
+produz os números: mesmas janelas CY/PY, mesmo tratamento de 29/02.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gerar_fluxo
+from src.core.processing import (planejar_intervalos_wbr, processar_dados_wbr,
+                                 processar_dados_wbr_agregados)
+
+
+def _py(data: pd.Timestamp, ano_anterior: int) -> pd.Timestamp:
+    try:
+        return data.replace(year=ano_anterior)
+    except ValueError:
+        return pd.Timestamp(year=ano_anterior, month=data.month, day=min(data.day, 28))
+
+
+def _soma(df_work: pd.DataFrame, inicio: pd.Timestamp, fim: pd.Timestamp) -> float:
+    mask = (df_work.index >= inicio) & (df_work.index <= fim)
+    return df_work.loc[mask, 'metric_value'].sum() if mask.any() else 0
+
+
+def _semanas_travelling(df_work, data_referencia):
+    ano_anterior = data_referencia.year - 1
+    cy, py = {}, {}
+    for i in range(5, -1, -1):
+        fim = data_referencia - timedelta(days=7 * i)
+        inicio = fim - timedelta(days=6)
+        cy[fim] = _soma(df_work, inicio, fim)
+        # O original levava o fim para o dia 28 do mês quando só o início caía em 29/02
+        # (semana de 29 dias); a referência usa a mesma regra das semanas ISO
+        inicio_py, fim_py = _py(inicio, ano_anterior), _py(fim, ano_anterior)
+        py[fim_py] = _soma(df_work, inicio_py, fim_py)
+    return pd.Series(cy), pd.Series(py), False
+
+
+def _semanas_iso(df_work, data_referencia):
+    ano_anterior = data_referencia.year - 1
+    periodo = data_referencia.to_period('W-SUN')
+    semana_parcial = data_referencia < periodo.end_time
+    fim_semana = data_referencia if semana_parcial else periodo.end_time
+    inicio_semana_atual = periodo.start_time if semana_parcial else fim_semana - timedelta(days=6)
+
+    recorte = df_work[(df_work.index > fim_semana - timedelta(weeks=6)) & (df_work.index <= fim_semana)]
+    cy = recorte.resample('W-SUN')['metric_value'].sum().tail(6)
+
+    py = {}
+    for i in range(6):
+        if i == 5 and semana_parcial:
+            inicio, fim = inicio_semana_atual, data_referencia
+        else:
+            fim = fim_semana - timedelta(weeks=5 - i)
+            inicio = fim - timedelta(days=6)
+        inicio_py, fim_py = _py(inicio, ano_anterior), _py(fim, ano_anterior)
+        py[fim_py] = _soma(df_work, inicio_py, fim_py)
+    return cy, pd.Series(py), semana_parcial
+
+
+def _meses(df_work, data_referencia):
+    ano_atual, ano_anterior = data_referencia.year, data_referencia.year - 1
+
+    recorte = df_work[(df_work.index >= pd.Timestamp(year=ano_atual, month=1, day=1))
+                      & (df_work.index <= data_referencia)]
+    cy = recorte.resample('MS')['metric_value'].sum().reindex(
+        pd.date_range(start=pd.Timestamp(year=ano_atual, month=1, day=1), periods=12, freq='MS')
+    ).astype(float)
+    passados = cy.index.month <= data_referencia.month
+    cy[passados] = cy[passados].fillna(0)
+
+    py = {}
+    for mes in range(1, 13):
+        inicio = pd.Timestamp(year=ano_anterior, month=mes, day=1)
+        if mes == data_referencia.month:
+            fim = _py(data_referencia, ano_anterior)
+        elif mes < data_referencia.month:
+            fim = inicio + pd.offsets.MonthEnd(0)
+        else:
+            py[inicio] = np.nan
+            continue
+        py[inicio] = _soma(df_work, inicio, fim)
+
+    mes_parcial = data_referencia < data_referencia.replace(day=1) + pd.offsets.MonthEnd(1)
+    return cy, pd.Series(py, dtype=float), mes_parcial
+
+
+def _referencia(df: pd.DataFrame, data_referencia: pd.Timestamp, metodo_semana: str) -> dict:
+    df_work = df.assign(date=pd.to_datetime(df['date'])).set_index('date').sort_index()
+    semanas = _semanas_travelling if metodo_semana == 'travelling' else _semanas_iso
+    semanas_cy, semanas_py, semana_parcial = semanas(df_work, data_referencia)
+    meses_cy, meses_py, mes_parcial = _meses(df_work, data_referencia)
+    return {
+        'semanas_cy': semanas_cy, 'semanas_py': semanas_py,
+        'meses_cy': meses_cy, 'meses_py': meses_py,
+        'semana_parcial': semana_parcial, 'mes_parcial_cy': mes_parcial,
+        'ano_atual': data_referencia.year, 'ano_anterior': data_referencia.year - 1
+    }
+
+
+@pytest.fixture(scope='module')
+def fluxo() -> pd.DataFrame:
+    # 2023-2025 cobre um ano bissexto como CY (2024) e como PY (2025 -> 2024)
+    return gerar_fluxo(n_shoppings=2, anos=3, fim=pd.Timestamp('2025-12-31'))
+
+
+def _assert_serie(obtida, esperada: pd.Series):
+    obtida = obtida['metric_value'] if isinstance(obtida, pd.DataFrame) else obtida
+    assert list(pd.DatetimeIndex(obtida.index)) == list(esperada.index)
+    np.testing.assert_allclose(obtida.to_numpy(dtype=float), esperada.to_numpy(dtype=float), equal_nan=True)
+
+
+@pytest.mark.parametrize('metodo_semana', ['iso', 'travelling'])
+@pytest.mark.parametrize('data_referencia', [
+    '2024-02-29',  # 29/02 como referência: PY cai em 28/02/2023
+    '2024-03-03',  # semana ISO completa que contém 29/02
+    '2024-03-06',  # semanas travelling com fim em 29/02
+    '2025-03-01',  # PY atravessa 29/02/2024
+    '2025-01-03',  # semanas CY atravessando a virada do ano
+    '2025-06-15',
+])
+def test_paridade_com_implementacao_original(fluxo, metodo_semana, data_referencia):
+    data_referencia = pd.Timestamp(data_referencia)
+    obtido = processar_dados_wbr(fluxo, data_referencia, metodo_semana=metodo_semana)
+    esperado = _referencia(fluxo, data_referencia, metodo_semana)
+
+    for chave in ('semanas_cy', 'semanas_py', 'meses_cy', 'meses_py'):
+        _assert_serie(obtido[chave], esperado[chave])
+    for chave in ('semana_parcial', 'mes_parcial_cy', 'ano_atual', 'ano_anterior'):
+        assert obtido[chave] == esperado[chave], chave
+
+
+@pytest.mark.parametrize('metodo_semana', ['iso', 'travelling'])
+@pytest.mark.parametrize('data_referencia', ['2024-02-29', '2025-03-01'])
+def test_agregacao_no_banco_igual_ao_pandas(fluxo, metodo_semana, data_referencia):
+    # Simula o pushdown: soma/contagem de cada intervalo planejado, como faria o SQL
+    datas = pd.to_datetime(fluxo['date'])
+    somas = {}
+    for inicio, fim in planejar_intervalos_wbr(data_referencia, metodo_semana):
+        mask = (datas >= inicio) & (datas <= fim)
+        somas[(inicio, fim)] = (fluxo.loc[mask, 'metric_value'].sum(), int(mask.sum()))
+
+    agregado = processar_dados_wbr_agregados(somas, data_referencia, metodo_semana=metodo_semana)
+    esperado = processar_dados_wbr(fluxo, data_referencia, metodo_semana=metodo_semana)
+
+    for chave in ('semanas_cy', 'semanas_py', 'meses_cy', 'meses_py'):
+        pd.testing.assert_frame_equal(agregado[chave], esperado[chave], check_dtype=False, check_freq=False)
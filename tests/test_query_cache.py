@@ -0,0 +1,130 @@
+"""
+SharedQueryCache: single-flight entre threads, eviction LRU/bytes/TTL e contadores
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from src.services.query_cache import SharedQueryCache, make_cache_key
+
+THREADS = 16
+
+
+class _Valor:
+    """Valor que informa o próprio tamanho, como TableWindow"""
+
+    def __init__(self, nbytes: int):
+        self.nbytes = nbytes
+
+
+def _concorrente(cache: SharedQueryCache, chave, loader):
+    # Barreira: todas as threads chamam get_or_load ao mesmo tempo
+    barreira = threading.Barrier(THREADS)
+
+    def _chamar():
+        barreira.wait()
+        return cache.get_or_load(chave, loader)
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        futuros = [pool.submit(_chamar) for _ in range(THREADS)]
+    return futuros
+
+
+def test_single_flight_executa_loader_uma_vez():
+    cache = SharedQueryCache()
+    chamadas = []
+
+    def loader():
+        chamadas.append(threading.get_ident())
+        time.sleep(0.05)
+        return pd.DataFrame({'metric_value': [1, 2, 3]})
+
+    resultados = [futuro.result() for futuro in _concorrente(cache, ('wbr', 'fluxo'), loader)]
+
+    assert len(chamadas) == 1
+    assert all(df['metric_value'].tolist() == [1, 2, 3] for df in resultados)
+    # Cada chamador recebe a própria cópia
+    assert len({id(df) for df in resultados}) == THREADS
+
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] + stats['waits'] == THREADS - 1
+    assert stats['in_flight'] == 0
+
+
+def test_erro_do_loader_chega_a_todos_e_nao_e_cacheado():
+    cache = SharedQueryCache()
+    chamadas = []
+
+    def loader():
+        chamadas.append(1)
+        time.sleep(0.05)
+        raise RuntimeError("banco fora do ar")
+
+    futuros = _concorrente(cache, ('wbr', 'fluxo'), loader)
+
+    for futuro in futuros:
+        with pytest.raises(RuntimeError, match="banco fora do ar"):
+            futuro.result()
+    assert len(chamadas) == 1
+    assert cache.stats()['entries'] == 0
+
+    assert cache.get_or_load(('wbr', 'fluxo'), lambda: 'ok') == 'ok'
+
+
+def test_chaves_diferentes_carregam_em_paralelo():
+    cache = SharedQueryCache()
+    barreira = threading.Barrier(2, timeout=5)
+
+    def loader(valor):
+        # Só passa se as duas buscas estiverem em andamento ao mesmo tempo
+        barreira.wait()
+        return valor
+
+    with ThreadPoolExecutor(2) as pool:
+        a = pool.submit(cache.get_or_load, 'a', lambda: loader('A'))
+        b = pool.submit(cache.get_or_load, 'b', lambda: loader('B'))
+        assert (a.result(), b.result()) == ('A', 'B')
+
+
+def test_eviction_lru_por_numero_de_entradas():
+    cache = SharedQueryCache(max_entries=2)
+    cache.get_or_load('a', lambda: 'A')
+    cache.get_or_load('b', lambda: 'B')
+    cache.get_or_load('a', lambda: pytest.fail("'a' deveria estar em cache"))  # 'a' vira a mais recente
+    cache.get_or_load('c', lambda: 'C')
+
+    assert cache.get_or_load('b', lambda: 'B2') == 'B2'  # 'b' era a menos usada
+    assert cache.stats()['evictions'] == 2  # 'b' ao entrar 'c', 'a' ao voltar 'b'
+
+
+def test_eviction_por_bytes():
+    cache = SharedQueryCache(max_bytes=100)
+    for chave in ('a', 'b'):
+        cache.get_or_load(chave, lambda: _Valor(40))
+    assert cache.stats()['bytes'] == 80
+
+    cache.get_or_load('c', lambda: _Valor(40))
+    stats = cache.stats()
+    assert (stats['entries'], stats['bytes'], stats['evictions']) == (2, 80, 1)
+
+    # Maior que o limite: é devolvido, mas não entra no cache nem remove as outras
+    grande = cache.get_or_load('grande', lambda: _Valor(101))
+    assert grande.nbytes == 101
+    assert cache.stats()['entries'] == 2
+
+
+def test_ttl_expirado_recarrega():
+    cache = SharedQueryCache(ttl_seconds=0)
+    cache.get_or_load('a', lambda: 'A')
+
+    assert cache.get_or_load('a', lambda: 'A2') == 'A2'
+    assert cache.stats()['misses'] == 2
+
+
+def test_make_cache_key_normaliza_shopping_e_data():
+    assert make_cache_key('wbr', 'fluxo', 'Todos', pd.Timestamp('2024-02-29 10:30')) == \
+        make_cache_key('wbr', 'fluxo', None, '2024-02-29')
@@ -0,0 +1,38 @@
+"""
+Relatório de tipos compactos: uma entrada por tabela, venha ela do banco ou do cache local em Parquet
+"""
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gerar_fluxo
+from src.clients.database import schema
+from src.clients.database.factory import fetch_data_generic
+
+pytest.importorskip('pyarrow')
+
+CONFIG = {'table': 'fluxo_de_pessoas', 'schema': 'mapa-do-bosque', 'date_col': 'data',
+          'metric_col': 'value', 'shopping_col': 'shopping'}
+
+
+class _Cliente:
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def get_max_date(self, **kwargs):
+        return self.df['date'].max()
+
+    def fetch_wbr_data(self, **kwargs):
+        return self.df
+
+
+def test_banco_e_cache_local_usam_a_mesma_chave(tmp_path, monkeypatch):
+    from src.services.local_store import ParquetTableStore
+
+    monkeypatch.setattr(schema, '_relatorio', {})
+    client = _Cliente(gerar_fluxo(n_shoppings=2, anos=2, fim=pd.Timestamp('2024-06-30')))
+
+    fetch_data_generic(client, CONFIG)
+    chaves_banco = set(schema.get_schema_report())
+    ParquetTableStore(client, root=tmp_path).load('pessoas', CONFIG, date_reference=pd.Timestamp('2024-06-30'))
+
+    assert chaves_banco == set(schema.get_schema_report()) == {'mapa-do-bosque.fluxo_de_pessoas'}
@@ -0,0 +1,126 @@
+"""
+Janela completa das tabelas WBR: início ancorado na última data, fallback por referência e partição por shopping
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gerar_fluxo
+from src.core.prepared_frame import frame_preparado, preparar_frame
+from src.services.data_service import DataService, TableWindow
+from src.services.filter_service import FilterService
+from src.services.query_cache import SharedQueryCache
+
+CONFIG = {'table': 'fluxo', 'schema': 'mapa', 'date_col': 'data', 'metric_col': 'value', 'shopping_col': 'shopping'}
+ULTIMA = pd.Timestamp('2023-12-31')
+
+
+class _Cliente:
+    """Cliente em memória com a interface usada por fetch_data_generic e inicio_janela_completa"""
+
+    def __init__(self, df: pd.DataFrame, ultima):
+        self.df = df
+        self.ultima = ultima
+        self.buscas = []
+
+    def get_max_date(self, **kwargs):
+        return self.ultima
+
+    def fetch_wbr_data(self, *, date_reference=None, date_start=None, **kwargs):
+        ref = pd.Timestamp(date_reference) if date_reference else pd.Timestamp.today().normalize()
+        inicio = pd.Timestamp(date_start) if date_start else pd.Timestamp(year=ref.year - 1, month=1, day=1)
+        self.buscas.append(inicio)
+        return self.df[(self.df['date'] >= inicio) & (self.df['date'] <= ref)]
+
+
+@pytest.fixture
+def servico(monkeypatch):
+    monkeypatch.setenv('WBR_SUPERSET_WINDOW', 'true')
+    service = DataService.__new__(DataService)
+    service.db_client = _Cliente(gerar_fluxo(n_shoppings=2, anos=4, fim=ULTIMA), ULTIMA)
+    service.local_store = None
+    service.query_cache = SharedQueryCache()
+    return service
+
+
+def test_janela_ancorada_na_ultima_data_disponivel(servico):
+    for ref in ('2023-12-31', '2023-06-15', '2022-01-01'):
+        df = servico._load_table_data('pessoas', CONFIG, pd.Timestamp(ref), 'S001')
+        assert df['date'].min() == pd.Timestamp(year=pd.Timestamp(ref).year - 1, month=1, day=1)
+
+    # Uma busca só, desde janeiro de dois anos antes da última data (e não de hoje)
+    assert servico.db_client.buscas == [pd.Timestamp('2021-01-01')]
+
+
+def test_referencia_antes_da_janela_busca_so_o_proprio_periodo(servico):
+    df = servico._load_table_data('pessoas', CONFIG, pd.Timestamp('2021-12-31'), 'S000')
+
+    assert servico.db_client.buscas == [pd.Timestamp('2021-01-01'), pd.Timestamp('2020-01-01')]
+    assert df['date'].max() == pd.Timestamp('2021-12-31')
+
+
+def test_sem_ultima_data_ancora_em_hoje(servico):
+    servico.db_client.ultima = None
+    janela = servico._fetch_table_window('pessoas', CONFIG)
+
+    assert janela.inicio == pd.Timestamp(year=pd.Timestamp.today().year - 2, month=1, day=1)
+
+
+@pytest.mark.parametrize('ref, coberta', [
+    ('2022-01-01', True),    # precisa de janeiro de 2021: primeiro dia da janela
+    ('2022-12-31', True),
+    ('2021-12-31', False),   # precisa de janeiro de 2020: fallback
+])
+def test_cobre_no_limite_da_janela(ref, coberta):
+    janela = TableWindow(gerar_fluxo(n_shoppings=1, anos=3, fim=ULTIMA), pd.Timestamp('2021-01-01'))
+
+    assert janela.cobre(pd.Timestamp(ref)) is coberta
+    assert (janela.slice(pd.Timestamp(ref)) is not None) is coberta
+
+
+@pytest.fixture(scope='module')
+def tres_shoppings() -> pd.DataFrame:
+    # Ordem da query (ORDER BY data DESC), shoppings intercalados
+    return gerar_fluxo(n_shoppings=3, anos=3, fim=ULTIMA)
+
+
+def _por_mascara(df: pd.DataFrame, shopping: str) -> pd.DataFrame:
+    return df[df['shopping'] == shopping].sort_values('date', kind='stable').reset_index(drop=True)
+
+
+def test_particoes_sao_fatias_de_um_unico_frame(tres_shoppings):
+    janela = TableWindow(tres_shoppings, pd.Timestamp('2021-01-01'))
+    base = janela.particao.frame['metric_value'].to_numpy()
+
+    for shopping in ('S000', 'S001', 'S002'):
+        fatia = janela.particao.fatia(shopping)
+        assert frame_preparado(fatia) and frame_preparado(janela.slice(ULTIMA, shopping))
+        assert np.shares_memory(fatia['metric_value'].to_numpy(), base)
+        pd.testing.assert_frame_equal(fatia.reset_index(drop=True), _por_mascara(tres_shoppings, shopping))
+
+    assert janela.slice(ULTIMA, 'S999').empty
+    # Frame particionado + consolidado (um terço das linhas), sem cópias por shopping
+    preparado = preparar_frame(tres_shoppings).memory_usage(deep=True).sum()
+    assert janela.nbytes < 1.5 * preparado
+
+
+def test_particao_e_somente_leitura(tres_shoppings):
+    janela = TableWindow(tres_shoppings, pd.Timestamp('2021-01-01'))
+    fatia = janela.slice(ULTIMA, 'S001')
+
+    with pytest.raises(ValueError, match='read-only'):
+        fatia['metric_value'].to_numpy()[0] = -1
+    assert (janela.particao.frame['metric_value'] >= 0).all()
+
+
+def test_filter_service_usa_a_particao(tres_shoppings):
+    particao = TableWindow(tres_shoppings, pd.Timestamp('2021-01-01')).particao
+    inicio, fim = pd.Timestamp('2022-03-01'), pd.Timestamp('2022-05-31')
+
+    filtrado = FilterService.apply_filters(particao, date_start=inicio, date_end=fim, shopping_filter='S002')
+
+    esperado = _por_mascara(tres_shoppings, 'S002')
+    esperado = esperado[(esperado['date'] >= inicio) & (esperado['date'] <= fim)].reset_index(drop=True)
+    assert np.shares_memory(filtrado['metric_value'].to_numpy(), particao.frame['metric_value'].to_numpy())
+    pd.testing.assert_frame_equal(filtrado.reset_index(drop=True), esperado)
+    assert FilterService.apply_shopping_filter(particao, 'S999').empty
@@ -0,0 +1,100 @@
+"""
+Pré-aquecimento: entradas aquecidas valem até a primeira leitura e a rotina não passa pelo st.cache_data
+"""
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import gerar_fluxo
+from src.config.database import get_table_config
+from src.services import figure_cache, query_cache
+from src.services.data_service import DataService
+from src.services.query_cache import SharedQueryCache
+from src.services.warmup import run_warmup
+
+ULTIMA = pd.Timestamp('2024-06-28')
+HORA = 3600
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio monotônico do cache, controlado pelo teste (segundos)"""
+    agora = [1000.0]
+    monkeypatch.setattr(query_cache, 'time', SimpleNamespace(monotonic=lambda: agora[0]))
+    return agora
+
+
+class _Cliente:
+    """Cliente em memória com get_max_date e fetch_wbr_data"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.buscas = 0
+
+    def get_max_date(self, **kwargs):
+        return self.df['date'].max()
+
+    def fetch_wbr_data(self, *, date_reference=None, date_start=None, **kwargs):
+        self.buscas += 1
+        ref = pd.Timestamp(date_reference) if date_reference else pd.Timestamp.today().normalize()
+        inicio = pd.Timestamp(date_start) if date_start else pd.Timestamp(year=ref.year - 1, month=1, day=1)
+        return self.df[(self.df['date'] >= inicio) & (self.df['date'] <= ref)]
+
+
+def test_entrada_aquecida_so_expira_depois_da_primeira_leitura(relogio):
+    cache = SharedQueryCache(ttl_seconds=300)
+    cache.warm('aquecida', lambda: 'madrugada')
+    cache.get_or_load('comum', lambda: 'madrugada')
+
+    relogio[0] += 2.5 * HORA  # 06:30 -> 09:00
+    assert cache.get_or_load('aquecida', lambda: 'banco') == 'madrugada'
+    assert cache.get_or_load('comum', lambda: 'banco') == 'banco'
+
+    # A primeira leitura inicia o TTL normal
+    relogio[0] += 301
+    assert cache.get_or_load('aquecida', lambda: 'banco') == 'banco'
+
+
+def test_aquecer_substitui_a_entrada_atual():
+    cache = SharedQueryCache()
+    cache.get_or_load('chave', lambda: 'ontem')
+
+    assert cache.warm('chave', lambda: 'hoje') == 'hoje'
+    assert cache.get_or_load('chave', lambda: 'banco') == 'hoje'
+
+
+@pytest.mark.parametrize('superset', ['true', 'false'])
+def test_warmup_ainda_e_hit_no_horario_comercial(relogio, monkeypatch, superset):
+    monkeypatch.setenv('WBR_SUPERSET_WINDOW', superset)
+    monkeypatch.setenv('WBR_AGGREGATION_PUSHDOWN', 'false')
+
+    # Fora de uma execução do script: nenhum método com st.cache_data
+    def _proibido(*args, **kwargs):
+        raise AssertionError("o pré-aquecimento não deve usar st.cache_data")
+
+    for metodo in ('get_available_date_range', 'get_available_shoppings', 'load_table_aggregated'):
+        monkeypatch.setattr(DataService, metodo, _proibido)
+
+    service = DataService.__new__(DataService)
+    service.db_client = _Cliente(gerar_fluxo(n_shoppings=2, anos=3, fim=ULTIMA))
+    service.local_store = None
+    service.query_cache = SharedQueryCache(ttl_seconds=300)
+    figure_cache.get_figure_cache().invalidate()
+
+    resumo = run_warmup(service, metodos=['iso'], instagram=False)
+
+    assert resumo['erros'] == [] and resumo['data_referencia'] == ULTIMA
+    # Todos + S000 + S001, três tabelas cada
+    assert resumo['combinacoes'] == 3 and resumo['figuras'] == 9
+    buscas = service.db_client.buscas
+
+    relogio[0] += 2.5 * HORA
+    hits = service.query_cache.stats()['hits']
+    for table_name, config in get_table_config().items():
+        for shopping in (None, 'S000', 'S001'):
+            df = service._load_table_data(table_name, config, ULTIMA, shopping)
+            assert df['date'].max() == ULTIMA
+
+    assert service.db_client.buscas == buscas
+    assert service.query_cache.stats()['hits'] == hits + 9
@@ -0,0 +1,66 @@
+"""
+fetch_wbr_buckets pelo mesmo caminho de leitura das demais queries (_read_sql: db_fetch e backend COPY)
+"""
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.clients.database.supabase_postgres import SupabaseClient
+from src.core.processing import planejar_intervalos_wbr
+from src.utils.timing import get_timing_registry
+
+REFERENCIA = pd.Timestamp('2024-02-29')
+
+
+@pytest.fixture
+def cliente():
+    client = SupabaseClient.__new__(SupabaseClient)
+    client.engine = SimpleNamespace(dialect=postgresql.psycopg2.dialect())
+    return client
+
+
+def _buscar(client, **kwargs):
+    return client.fetch_wbr_buckets(
+        table_name='mapa-do-bosque.fluxo_de_pessoas',
+        intervalos=planejar_intervalos_wbr(REFERENCIA, 'iso'),
+        **kwargs
+    )
+
+
+def test_buckets_usam_read_sql(cliente, monkeypatch):
+    chamadas = []
+
+    def _read_sql(sql_query, params=None):
+        chamadas.append((sql_query, params))
+        return pd.DataFrame({'idx': [0], 'soma': [10.0], 'linhas': [7]})
+
+    monkeypatch.setattr(cliente, '_read_sql', _read_sql)
+    df = _buscar(cliente, shopping_filter='SCIB')
+
+    assert df['soma'].tolist() == [10.0]
+    (sql, params), = chamadas
+    assert 'GROUP BY b.idx' in sql
+    assert params['shopping'] == 'SCIB' and 'i0' in params and 'janela_fim' in params
+
+
+def test_buckets_pelo_backend_copy(cliente, monkeypatch):
+    monkeypatch.setenv('SUPABASE_FETCH_BACKEND', 'copy')
+    copias = []
+
+    def _copy_to(copy_sql, destino):
+        copias.append(copy_sql)
+        destino.write(b"idx,shopping,soma,linhas\n0,SCIB,10,7\n1,SBI,20,7\n")
+
+    monkeypatch.setattr(cliente, '_copy_to', _copy_to)
+    registro = get_timing_registry()
+    registro.reset()
+
+    df = _buscar(cliente, group_by_shopping=True)
+
+    assert df.to_dict('list') == {'idx': [0, 1], 'shopping': ['SCIB', 'SBI'], 'soma': [10, 20], 'linhas': [7, 7]}
+    # COPY não aceita bind: limites renderizados como literais
+    assert copias[0].startswith('COPY (') and ':i0' not in copias[0]
+    assert "'2024-02-29 00:00:00'" in copias[0]
+    assert any(linha['stage'] == 'db_fetch' for linha in registro.stats())
@@ -0,0 +1,60 @@
+"""
+Figura WBR montada por dicionários (criar_figura_wbr_dict) contra o montador anterior com go.Figure
+"""
+import copy
+import json
+
+import pandas as pd
+import plotly.io as pio
+import pytest
+
+import wbr_charts_anterior
+from benchmarks.synthetic import gerar_fluxo
+from src.core import wbr_charts_modular
+from src.core.wbr import preparar_dados_wbr
+
+
+@pytest.fixture(scope='module')
+def historicos():
+    completo = gerar_fluxo(n_shoppings=1, anos=3, fim=pd.Timestamp('2025-12-31'))
+    datas = pd.to_datetime(completo['date'])
+    # Histórico esparso: começa em março (sem ano anterior) e sem as quartas-feiras
+    esparso = completo[(datas >= '2025-03-10') & (datas.dt.dayofweek != 2)]
+    return {'completo': completo, 'esparso': esparso}
+
+
+def _spec(figura) -> dict:
+    """to_plotly_json() serializado pelo encoder do Plotly (arrays NumPy viram listas)"""
+    return json.loads(pio.to_json(figura.to_plotly_json(), validate=False))
+
+
+@pytest.mark.parametrize('metodo_semana', ['iso', 'travelling'])
+@pytest.mark.parametrize('historico, data_referencia', [
+    ('completo', '2025-06-15'),  # mês parcial
+    ('completo', '2025-06-30'),  # mês fechado
+    ('completo', '2025-01-05'),  # janeiro parcial, semanas atravessando o ano
+    ('completo', '2025-01-31'),  # janeiro fechado
+    ('esparso', '2025-05-20'),
+    ('esparso', '2025-03-12'),   # um único mês, parcial
+])
+def test_figura_identica_ao_montador_anterior(historicos, historico, data_referencia, metodo_semana):
+    dados, data_ref = preparar_dados_wbr(
+        historicos[historico], data_referencia=pd.Timestamp(data_referencia), metodo_semana=metodo_semana
+    )
+
+    anterior = wbr_charts_anterior.criar_grafico_wbr_modular(dados, 'Fluxo', 'pessoas', data_referencia=data_ref)
+    atual = wbr_charts_modular.criar_grafico_wbr_modular(dados, 'Fluxo', 'pessoas', data_referencia=data_ref)
+
+    assert _spec(atual) == _spec(anterior)
+
+
+def test_alterar_figura_ou_spec_nao_altera_template_em_cache(historicos):
+    dados, data_ref = preparar_dados_wbr(historicos['completo'], data_referencia=pd.Timestamp('2025-06-15'))
+    template = copy.deepcopy(wbr_charts_modular._template_dict('plotly_white'))
+
+    figura = wbr_charts_modular.criar_grafico_wbr_modular(dados, 'Fluxo', 'pessoas', data_referencia=data_ref)
+    figura.layout.template.layout.font.size = 99
+    spec, _, _ = wbr_charts_modular.criar_figura_wbr_dict(dados, 'Fluxo', 'pessoas', data_referencia=data_ref)
+    spec['layout']['template'] = {'layout': {'font': {'size': 1}}}
+
+    assert wbr_charts_modular._template_dict('plotly_white') == template